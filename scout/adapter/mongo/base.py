@@ -41,12 +41,15 @@ from .variant import VariantHandler
 from .user import UserHandler
 from .acmg import ACMGHandler
 from .index import IndexHandler
+from .load_state import LoadStateHandler
+from .causative import CausativeHandler
 
 log = logging.getLogger(__name__)
 
 class MongoAdapter(GeneHandler, CaseHandler, InstituteHandler, EventHandler,
                    HpoHandler, PanelHandler, QueryHandler, VariantHandler,
-                   UserHandler, ACMGHandler, IndexHandler):
+                   UserHandler, ACMGHandler, IndexHandler, LoadStateHandler,
+                   CausativeHandler):
 
     """Adapter for cummunication with a mongo database."""
 
@@ -76,6 +79,8 @@ class MongoAdapter(GeneHandler, CaseHandler, InstituteHandler, EventHandler,
         self.disease_term_collection = database.disease_term
         self.variant_collection = database.variant
         self.acmg_collection = database.acmg
+        self.load_state_collection = database.load_state
+        self.causative_collection = database.causative
 
     def __str__(self):
         return "MongoAdapter(db={0})".format(self.db)
\ No newline at end of file
@@ -0,0 +1,221 @@
+"""
+cache.py
+
+In process caches that are shared by all adapters in a process.
+
+ReferenceCache keeps maps that are expensive to build. Each entry is stored
+with a fingerprint of the collection it was built from, a stale entry is
+rebuilt when the fingerprint changes. Entries can also be invalidated
+explicitly.
+
+LRUCache keeps a limited number of small entries that are looked up often.
+The entries expire after a while, since the database can be updated by other
+processes.
+"""
+import collections
+import logging
+import threading
+import time
+
+LOG = logging.getLogger(__name__)
+
+
+def collection_fingerprint(collection, query=None, date_key=None):
+    """Return a cheap fingerprint of the documents in a collection
+
+    The fingerprint is the number of documents together with the newest
+    object id, which holds the time when the latest document was inserted.
+    Documents that are replaced keep their id, so for collections where
+    every write sets an update date the latest date is added with date_key.
+
+    Args:
+        collection(pymongo.Collection)
+        query(dict)
+        date_key(str): Field with the date when a document was updated
+
+    Returns:
+        fingerprint(tuple): (<nr documents>(int), <latest _id>(ObjectId),
+                             <latest date>(datetime))
+    """
+    query = query or {}
+    nr_documents = collection.find(query).count()
+    latest_id = None
+    latest_date = None
+    if nr_documents:
+        res = collection.find(query, {'_id': 1}).sort('_id', -1).limit(1)
+        for document in res:
+            latest_id = document['_id']
+        if date_key:
+            res = collection.find(query, {date_key: 1}).sort(date_key, -1).limit(1)
+            for document in res:
+                latest_date = document.get(date_key)
+    return (nr_documents, latest_id, latest_date)
+
+
+class ReferenceCache(object):
+    """Versioned store of reference maps
+
+    Entries are keyed on database, name of the map and build.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        # Increased every time something is invalidated
+        self.version = 0
+
+    def get(self, database, name, build, fingerprint, build_function):
+        """Return a cached map, build it if it is missing or stale
+
+        Args:
+            database(str): Name of the database
+            name(str): Name of the map, e.g. 'hgncid_to_gene'
+            build(str): Genome build, None if the map does not depend on build
+            fingerprint(tuple): From collection_fingerprint
+            build_function(function): Called without arguments to build the map
+
+        Returns:
+            result(dict)
+        """
+        key = (database, name, build)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry['fingerprint'] == fingerprint:
+                LOG.debug("Using cached %s", name)
+                return entry['result']
+            version = self.version
+
+        result = build_function()
+        with self._lock:
+            # Do not store a result if it was invalidated while it was built
+            if version == self.version:
+                self._entries[key] = {
+                    'fingerprint': fingerprint,
+                    'result': result,
+                }
+        return result
+
+    def invalidate(self, database=None, names=None):
+        """Remove cached maps
+
+        Args:
+            database(str): Only remove maps from this database
+            names(iterable(str)): Only remove maps with these names, a single
+                                  name can be given as a string
+        """
+        if isinstance(names, str):
+            names = (names,)
+        with self._lock:
+            self.version += 1
+            for key in list(self._entries):
+                if database and key[0] != database:
+                    continue
+                if names and key[1] not in names:
+                    continue
+                LOG.debug("Invalidating cached %s, build %s", key[1], key[2])
+                del self._entries[key]
+
+
+class LRUCache(object):
+    """Least recently used store where the entries expire
+
+    The keys are tuples that start with the name of the database, or with
+    the path for entries that are read from a file. None is a value that can
+    be cached, e.g. for a gene that does not exist.
+
+    Invalidating a database increases its generation instead of going through
+    the entries, so that it is cheap to do after every insert. Entries from an
+    older generation are removed when they are looked up or evicted.
+    """
+
+    def __init__(self, max_size=20000, ttl=600):
+        """
+        Args:
+            max_size(int): Number of entries that are kept
+            ttl(float): Seconds that an entry is kept
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        # {<database>: <generation>}
+        self._generations = {}
+
+    def get_many(self, keys):
+        """Return the cached values of keys
+
+        Args:
+            keys(iterable(tuple))
+
+        Returns:
+            values(dict): {<key>: <value>}, missing and expired keys are left
+                          out
+        """
+        now = time.monotonic()
+        values = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires, generation, value = entry
+                if expires < now or generation != self._generations.get(key[0], 0):
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                values[key] = value
+        return values
+
+    def set_many(self, values):
+        """Store values, the least recently used entries are removed if full
+
+        Args:
+            values(dict): {<key>: <value>}
+        """
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for key, value in values.items():
+                generation = self._generations.get(key[0], 0)
+                self._entries[key] = (expires, generation, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, key, build_function):
+        """Return a cached value, build and store it if missing or expired
+
+        Args:
+            key(tuple)
+            build_function(function): Called without arguments to build the value
+        """
+        values = self.get_many([key])
+        if key in values:
+            return values[key]
+        generation = self._generations.get(key[0], 0)
+        value = build_function()
+        # Do not store a value if it was invalidated while it was built
+        if generation == self._generations.get(key[0], 0):
+            self.set_many({key: value})
+        return value
+
+    def invalidate(self, database=None):
+        """Remove cached entries
+
+        Args:
+            database(str): Only remove entries from this database or file
+        """
+        with self._lock:
+            if not database:
+                self._entries.clear()
+                return
+            self._generations[database] = self._generations.get(database, 0) + 1
+
+
+# One cache per process
+reference_cache = ReferenceCache()
+# Genes, disease terms and panel information for the variant views
+gene_info_cache = LRUCache()
+# Vcf headers and regions for the alignment viewer
+region_vcf_cache = LRUCache(max_size=200)
+# Snapshots of the case statistics for the dashboard
+case_stats_cache = LRUCache(max_size=10, ttl=300)
@@ -11,8 +11,44 @@ from scout.parse.variant.ids import parse_document_id
 
 from scout.exceptions import IntegrityError, ConfigError
 
+from .cache import case_stats_cache
+
 LOG = logging.getLogger(__name__)
 
+# Fields that are counted on the dashboard, cases where the list has more than
+# one item are counted
+CASE_LIST_COUNTERS = ('phenotype_terms', 'causatives', 'suspects', 'cohorts')
+
+
+def _list_counter(field):
+    """Return an aggregation expression that is 1 if a list has more than one item"""
+    return {'$cond': [{'$gt': [{'$size': {'$ifNull': ['$' + field, []]}}, 1]}, 1, 0]}
+
+
+CASE_STATISTICS_PIPELINE = [
+    {'$facet': {
+        'status': [
+            {'$group': {
+                '_id': {'owner': '$owner', 'status': '$status'},
+                'count': {'$sum': 1},
+            }},
+        ],
+        'analysis_types': [
+            {'$unwind': '$individuals'},
+            {'$group': {
+                '_id': {'owner': '$owner', 'analysis_type': '$individuals.analysis_type'},
+                'count': {'$sum': 1},
+            }},
+        ],
+        'lists': [
+            {'$group': dict(
+                [('_id', '$owner')] +
+                [(field, {'$sum': _list_counter(field)}) for field in CASE_LIST_COUNTERS]
+            )},
+        ],
+    }},
+]
+
 
 class CaseHandler(object):
     """Part of the pymongo adapter that handles cases and institutes"""
@@ -125,6 +161,54 @@ class CaseHandler(object):
         LOG.debug("Case updated")
         return updated_case
 
+    def case_statistics(self):
+        """Return the counters of the dashboard for each institute
+
+        The counters are computed with one aggregation over the cases. The
+        result is kept in case_stats_cache for five minutes, case events and
+        case loads, updates and deletes clear it.
+
+        Returns:
+            statistics(dict): {<institute_id>: {
+                                   'cases': int,
+                                   'status': {<status>: int},
+                                   'analysis_types': {<analysis_type>: int},
+                                   'phenotype_terms': int,
+                                   'causatives': int,
+                                   'suspects': int,
+                                   'cohorts': int,
+                               }}
+        """
+        return case_stats_cache.get((self.db.name, 'case_statistics'),
+                                    self._compute_case_statistics)
+
+    def _compute_case_statistics(self):
+        """Run the aggregation for case_statistics"""
+        LOG.debug("Computing case statistics")
+        result = next(iter(self.case_collection.aggregate(CASE_STATISTICS_PIPELINE)), {})
+
+        def institute_stats(institute_id):
+            if institute_id not in statistics:
+                statistics[institute_id] = dict(
+                    [('cases', 0), ('status', {}), ('analysis_types', {})] +
+                    [(field, 0) for field in CASE_LIST_COUNTERS]
+                )
+            return statistics[institute_id]
+
+        statistics = {}
+        for group in result.get('status', []):
+            stats = institute_stats(group['_id'].get('owner'))
+            stats['cases'] += group['count']
+            stats['status'][group['_id'].get('status')] = group['count']
+        for group in result.get('analysis_types', []):
+            stats = institute_stats(group['_id'].get('owner'))
+            stats['analysis_types'][group['_id'].get('analysis_type')] = group['count']
+        for group in result.get('lists', []):
+            stats = institute_stats(group['_id'])
+            for field in CASE_LIST_COUNTERS:
+                stats[field] = group[field]
+        return statistics
+
     def case(self, case_id=None, institute_id=None, display_name=None):
         """Fetches a single case from database
 
@@ -184,10 +268,15 @@ class CaseHandler(object):
             query['owner'] = institute_id
             query['display_name'] = display_name
 
+        case_obj = self.case_collection.find_one(query, {'_id': 1})
         result = self.case_collection.delete_one(query)
+        case_stats_cache.invalidate(self.db.name)
+        if case_obj:
+            self.delete_causatives(case_obj['_id'])
         return result
 
-    def load_case(self, config_data, update=False):
+    def load_case(self, config_data, update=False, batch_size=None, workers=None,
+                  resume=False):
         """Load a case into the database
 
         Check if the owner and the institute exists.
@@ -195,6 +284,10 @@ class CaseHandler(object):
         Args:
             config_data(dict): A dictionary with all the necessary information
             update(bool): If existing case should be updated
+            batch_size(int): Number of variants to insert at a time
+            workers(int): Number of processes that parse variants
+            resume(bool): Continue variant loads from their last checkpoint
+                          instead of loading the variants again
 
         Returns:
             case_obj(dict)
@@ -219,6 +312,8 @@ class CaseHandler(object):
 
         # Check if case exists in database
         existing_case = self.case(case_obj['_id'])
+        if existing_case and resume:
+            update = True
         if existing_case and not update:
             raise IntegrityError("Case %s already exists in database" % case_obj['_id'])
 
@@ -233,7 +328,14 @@ class CaseHandler(object):
                 if case_obj['vcf_files'].get(vcf_file['file_name']):
                     variant_type = vcf_file['variant_type']
                     category = vcf_file['category']
-                    if update:
+                    load_state = None
+                    if resume:
+                        # Variants of a load that finished or was of another
+                        # file are deleted and loaded again
+                        load_state = self.resumable_load_state(
+                            case_obj['_id'], variant_type, category,
+                            case_obj['vcf_files'][vcf_file['file_name']])
+                    if update and not load_state:
                         self.delete_variants(
                             case_id=case_obj['_id'],
                             variant_type=variant_type,
@@ -244,6 +346,9 @@ class CaseHandler(object):
                         variant_type=variant_type,
                         category=category,
                         rank_threshold=case_obj.get('rank_score_threshold', 0),
+                        batch_size=batch_size,
+                        workers=workers,
+                        resume=resume,
                     )
                 else:
                     LOG.debug("didn't find {}, skipping".format(vcf_file['file_name']))
@@ -268,7 +373,9 @@ class CaseHandler(object):
         if self.case(case_obj['_id']):
             raise IntegrityError("Case %s already exists in database" % case_obj['_id'])
 
-        return self.case_collection.insert_one(case_obj)
+        result = self.case_collection.insert_one(case_obj)
+        case_stats_cache.invalidate(self.db.name)
+        return result
 
     def update_case(self, case_obj):
         """Update a case in the database
@@ -326,6 +433,8 @@ class CaseHandler(object):
             },
             return_document = pymongo.ReturnDocument.AFTER
         )
+        self.update_causative_institutes(updated_case)
+        case_stats_cache.invalidate(self.db.name)
 
         LOG.info("Case updated")
         return updated_case
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+causative.py
+
+Index of the variants that are marked causative.
+
+The causatives are stored in the cases. To find the cases where the same
+variant is marked causative every case of an institute would have to be
+read, so each causative is also kept in the causative collection together
+with the institutes that can see it. The documents are updated when variants
+are marked and unmarked and when cases are shared.
+
+Databases from before the index have their causatives only in the cases. The
+index is built from the cases the first time it is used and found empty, or
+ahead of time with 'scout index'.
+
+A causative looks like:
+
+    {
+        '_id': str, # The document id of the variant
+        'case_id': str,
+        'institutes': list(str), # The collaborators of the case
+        'variant_id': str, # Positional id, the same in all cases
+        'simple_id': str, # <chrom>_<pos>_<ref>_<alt>
+        'display_name': str,
+        'hgnc_symbols': list(str),
+    }
+"""
+import logging
+
+from pymongo import ReplaceOne
+
+log = logging.getLogger(__name__)
+
+
+def build_causative(case_obj, variant_obj):
+    """Build the causative document of a variant that is marked causative
+
+    Args:
+        case_obj(dict)
+        variant_obj(dict)
+
+    Returns:
+        causative(dict)
+    """
+    return {
+        '_id': variant_obj['_id'],
+        'case_id': case_obj['_id'],
+        'institutes': case_obj.get('collaborators', [case_obj['owner']]),
+        'variant_id': variant_obj['variant_id'],
+        # display name without "_[variant_type]"
+        'simple_id': variant_obj['display_name'].rsplit('_', 1)[0],
+        'display_name': variant_obj['display_name'],
+        'hgnc_symbols': variant_obj.get('hgnc_symbols', []),
+    }
+
+
+class CausativeHandler(object):
+
+    """Methods to handle the index of causative variants in the mongo adapter"""
+
+    def add_causative(self, case_obj, variant_obj):
+        """Add a variant that is marked causative to the index
+
+        Args:
+            case_obj(dict)
+            variant_obj(dict)
+        """
+        causative = build_causative(case_obj, variant_obj)
+        self.causative_collection.replace_one({'_id': causative['_id']}, causative,
+                                              upsert=True)
+
+    def remove_causative(self, variant_obj):
+        """Remove a variant that is no longer causative from the index
+
+        Args:
+            variant_obj(dict)
+        """
+        self.causative_collection.delete_one({'_id': variant_obj['_id']})
+
+    def update_causative_institutes(self, case_obj):
+        """Let the current collaborators of a case see its causatives
+
+        Args:
+            case_obj(dict)
+        """
+        self.causative_collection.update_many(
+            {'case_id': case_obj['_id']},
+            {'$set': {'institutes': case_obj.get('collaborators', [case_obj['owner']])}}
+        )
+
+    def delete_causatives(self, case_id):
+        """Remove the causatives of a case from the index
+
+        Args:
+            case_id(str)
+        """
+        result = self.causative_collection.delete_many({'case_id': case_id})
+        log.debug("%s causatives deleted", result.deleted_count)
+
+    def institute_causatives(self, institute_id, query=None, projection=None):
+        """Return the causatives that an institute can see
+
+        Args:
+            institute_id(str)
+            query(dict): Further filters on the causatives
+            projection(dict)
+
+        Returns:
+            causatives(pymongo.Cursor)
+        """
+        self.check_causative_index()
+        causative_query = dict(query or {})
+        causative_query['institutes'] = institute_id
+        return self.causative_collection.find(causative_query, projection)
+
+    def check_causative_index(self):
+        """Build the index of causatives if it is empty but cases have causatives
+
+        This is checked once per adapter.
+        """
+        if getattr(self, '_causative_index_checked', False):
+            return
+        if (self.causative_collection.find_one({}, {'_id': 1}) is None and
+                self.case_collection.find_one({'causatives.0': {'$exists': True}},
+                                              {'_id': 1})):
+            log.warning("The causative index is empty, building it from the cases. "
+                        "Run 'scout index' to build it ahead of time")
+            self.index_causatives()
+        self._causative_index_checked = True
+
+    def index_causatives(self):
+        """Rebuild the index of causatives from the cases
+
+        Returns:
+            nr_causatives(int)
+        """
+        self.causative_collection.delete_many({})
+        nr_causatives = 0
+        cases = self.case_collection.find(
+            {'causatives.0': {'$exists': True}},
+            {'causatives': 1, 'collaborators': 1, 'owner': 1}
+        )
+        for case_obj in cases:
+            variants = self.variant_collection.find(
+                {'_id': {'$in': case_obj['causatives']}},
+                {'variant_id': 1, 'display_name': 1, 'hgnc_symbols': 1}
+            )
+            requests = [ReplaceOne({'_id': variant_obj['_id']},
+                                   build_causative(case_obj, variant_obj), upsert=True)
+                        for variant_obj in variants]
+            if requests:
+                self.causative_collection.bulk_write(requests, ordered=False)
+                nr_causatives += len(requests)
+        log.info("Indexed %s causatives", nr_causatives)
+        return nr_causatives
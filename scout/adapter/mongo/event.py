@@ -6,6 +6,8 @@ import pymongo
 
 from scout.constants import CASE_STATUSES, REV_ACMG_MAP
 
+from .cache import case_stats_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -62,6 +64,8 @@ class EventHandler(object):
         logger.debug("Saving Event")
         self.event_collection.insert_one(event)
         logger.debug("Event Saved")
+        # The case may have changed status, causatives, pins or cohorts
+        case_stats_cache.invalidate(self.db.name)
 
     def events(self, institute, case=None, variant_id=None, level=None,
                 comments=False, panel=None):
@@ -102,6 +106,34 @@ class EventHandler(object):
 
         return self.event_collection.find(query).sort('created_at', pymongo.DESCENDING)
 
+    def variants_comments(self, institute, variant_ids):
+        """Fetch the comments on many variants with one query
+
+        The comments are the same as from events with a variant_id and
+        comments=True.
+
+          Args:
+            institute (dict): A institute
+            variant_ids (iterable(str)): global variant ids
+
+          Returns:
+              dict: {<variant_id>: <list of comments, newest first>}
+        """
+        variant_ids = list(set(variant_ids))
+        comments = {variant_id: [] for variant_id in variant_ids}
+        if not variant_ids:
+            return comments
+        query = {
+            'institute': institute['_id'],
+            'category': 'variant',
+            'variant_id': {'$in': variant_ids},
+            'verb': 'comment',
+        }
+        for event in self.event_collection.find(query).sort('created_at',
+                                                            pymongo.DESCENDING):
+            comments[event['variant_id']].append(event)
+        return comments
+
     def user_events(self, user_obj=None):
         """Fetch all events by a specific user."""
         query = dict(user_id=user_obj['_id']) if user_obj else dict()
@@ -727,6 +759,7 @@ class EventHandler(object):
             },
             return_document = pymongo.ReturnDocument.AFTER
         )
+        self.add_causative(updated_case, variant)
 
         logger.info("Creating case event for marking {0}"\
                     " causative".format(variant['display_name']))
@@ -782,6 +815,7 @@ class EventHandler(object):
             },
             return_document = pymongo.ReturnDocument.AFTER
         )
+        self.remove_causative(variant)
 
         # mark the case as active again
         if len(updated_case.get('causatives', [])) == 0:
@@ -1023,6 +1057,7 @@ class EventHandler(object):
             },
             return_document = pymongo.ReturnDocument.AFTER
         )
+        self.update_causative_institutes(updated_case)
         logger.debug("Case updated")
         return updated_case
 
@@ -1060,6 +1095,7 @@ class EventHandler(object):
             },
             return_document = pymongo.ReturnDocument.AFTER
         )
+        self.update_causative_institutes(updated_case)
         logger.debug("Case updated")
         return updated_case
 
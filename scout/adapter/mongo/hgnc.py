@@ -1,7 +1,50 @@
 import logging
+import sys
+
+from .cache import (reference_cache, gene_info_cache, collection_fingerprint)
 
 logger = logging.getLogger(__name__)
 
+# The maps in the reference cache that are built from the genes
+GENE_MAPS = ('hgncid_to_gene', 'gene_lookup')
+
+# The gene fields that are used when building variants
+LOAD_GENE_FIELDS = ('hgnc_symbol', 'ensembl_id', 'description',
+                    'ar', 'ad', 'xd', 'xr', 'y')
+
+
+class GeneRecord(object):
+    """The parts of a hgnc gene that are needed to build variants
+
+    Supports the same lookups as a gene dictionary for these fields, so it can
+    be used in hgncid_to_gene when building variants.
+    """
+    __slots__ = LOAD_GENE_FIELDS
+
+    def __init__(self, gene_obj):
+        self.hgnc_symbol = sys.intern(gene_obj['hgnc_symbol'])
+        ensembl_id = gene_obj.get('ensembl_id')
+        self.ensembl_id = sys.intern(ensembl_id) if ensembl_id else ensembl_id
+        self.description = gene_obj.get('description')
+        self.ar = bool(gene_obj.get('ar'))
+        self.ad = bool(gene_obj.get('ad'))
+        self.xd = bool(gene_obj.get('xd'))
+        self.xr = bool(gene_obj.get('xr'))
+        self.y = bool(gene_obj.get('y'))
+
+    def __getitem__(self, key):
+        if key not in LOAD_GENE_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        if key not in LOAD_GENE_FIELDS:
+            return default
+        return getattr(self, key)
+
+    def __repr__(self):
+        return "GeneRecord(hgnc_symbol={0})".format(self.hgnc_symbol)
+
 
 class GeneHandler(object):
 
@@ -15,9 +58,27 @@ class GeneHandler(object):
         logger.debug("Loading gene %s, build %s into database" %
                      (gene_obj['hgnc_symbol'], gene_obj['build']))
         res = self.hgnc_collection.insert_one(gene_obj)
+        reference_cache.invalidate(self.db.name, GENE_MAPS)
+        gene_info_cache.invalidate(self.db.name)
         logger.debug("Gene saved")
         return res
 
+    def load_hgnc_bulk(self, gene_objs):
+        """Add a batch of gene objects with one unordered insert
+
+        Arguments:
+            gene_objs(list(dict))
+
+        Returns:
+            nr_inserted(int)
+        """
+        if not gene_objs:
+            return 0
+        res = self.hgnc_collection.insert_many(gene_objs, ordered=False)
+        reference_cache.invalidate(self.db.name, GENE_MAPS)
+        gene_info_cache.invalidate(self.db.name)
+        return len(res.inserted_ids)
+
     def hgnc_gene(self, hgnc_identifyer, build='37'):
         """Fetch a hgnc gene
 
@@ -41,6 +102,67 @@ class GeneHandler(object):
         gene_obj = self.hgnc_collection.find_one(query)
         return gene_obj
 
+    def hgnc_genes_by_id(self, hgnc_ids, build='37'):
+        """Fetch many hgnc genes with a dictionary of their transcripts
+
+            The genes are cached in the process, the genes that are not
+            cached are fetched with one query. The genes are shared between
+            callers and should not be changed.
+
+            Args:
+                hgnc_ids(iterable(int))
+                build(str)
+
+            Returns:
+                genes(dict): {<hgnc_id>: <gene_obj>}, None for genes that
+                             does not exist. The transcripts are in
+                             gene_obj['transcripts_dict'] by ensembl id
+        """
+        keys = {hgnc_id: (self.db.name, 'hgnc_gene', build, hgnc_id)
+                for hgnc_id in set(hgnc_ids)}
+        cached = gene_info_cache.get_many(keys.values())
+        genes = {hgnc_id: cached[key] for hgnc_id, key in keys.items() if key in cached}
+        missing = [hgnc_id for hgnc_id in keys if hgnc_id not in genes]
+        if not missing:
+            return genes
+
+        logger.debug("Fetching genes %s", ', '.join(str(hgnc_id) for hgnc_id in missing))
+        fetched = dict.fromkeys(missing)
+        res = self.hgnc_collection.find({'hgnc_id': {'$in': missing}, 'build': build})
+        for gene_obj in res:
+            # Keep the first gene, as hgnc_gene does
+            if fetched[gene_obj['hgnc_id']] is not None:
+                continue
+            gene_obj['transcripts_dict'] = {
+                transcript['ensembl_transcript_id']: transcript
+                for transcript in gene_obj.get('transcripts', [])
+            }
+            fetched[gene_obj['hgnc_id']] = gene_obj
+        gene_info_cache.set_many({keys[hgnc_id]: gene_obj for hgnc_id, gene_obj
+                                  in fetched.items()})
+        genes.update(fetched)
+        return genes
+
+    def hgnc_symbols(self, hgnc_ids, build='37'):
+        """Fetch the hgnc symbols of many genes with one query
+
+            Args:
+                hgnc_ids(iterable(int))
+                build(str)
+
+            Returns:
+                hgnc_symbols(dict): {<hgnc_id>: <hgnc_symbol>}, genes that
+                                    are not found are left out
+        """
+        hgnc_ids = list(set(hgnc_ids))
+        if not hgnc_ids:
+            return {}
+        res = self.hgnc_collection.find(
+            {'hgnc_id': {'$in': hgnc_ids}, 'build': build},
+            {'hgnc_id': 1, 'hgnc_symbol': 1}
+        )
+        return {gene_obj['hgnc_id']: gene_obj['hgnc_symbol'] for gene_obj in res}
+
     def hgnc_id(self, hgnc_symbol, build='37'):
         """Query the genes with a hgnc symbol and return the hgnc id
 
@@ -126,12 +248,17 @@ class GeneHandler(object):
         else:
             logger.info("Dropping the hgnc_gene collection")
             self.hgnc_collection.drop()
+        reference_cache.invalidate(self.db.name, GENE_MAPS)
+        gene_info_cache.invalidate(self.db.name)
 
     def hgncid_to_gene(self, build='37'):
         """Return a dictionary with hgnc_id as key and gene_obj as value
 
         The result will have ONE entry for each gene in the database.
         (For a specific build)
+        The dictionary is shared by all loads in the process and is only
+        rebuilt when the genes of the build have changed, it should not be
+        modified.
 
         Args:
             build(str):
@@ -140,12 +267,50 @@ class GeneHandler(object):
             hgnc_dict(dict): {<hgnc_id(int)>: <gene(dict)>}
 
         """
-        hgnc_dict = {}
-        logger.info("Building hgncid_to_gene")
-        for gene_obj in self.hgnc_collection.find({'build':build}):
-            hgnc_dict[gene_obj['hgnc_id']] = gene_obj
-        logger.info("All genes fetched")
-        return hgnc_dict
+        query = {'build': build}
+
+        def build_hgnc_dict():
+            hgnc_dict = {}
+            logger.info("Building hgncid_to_gene")
+            for gene_obj in self.hgnc_collection.find(query):
+                hgnc_dict[gene_obj['hgnc_id']] = gene_obj
+            logger.info("All genes fetched")
+            return hgnc_dict
+
+        fingerprint = collection_fingerprint(self.hgnc_collection, query)
+        return reference_cache.get(self.db.name, 'hgncid_to_gene', build,
+                                   fingerprint, build_hgnc_dict)
+
+    def gene_lookup(self, build='37'):
+        """Return a dictionary with hgnc_id as key and a GeneRecord as value
+
+        This is a slim version of hgncid_to_gene that is used when loading
+        variants. Only the fields that are needed to build the variants are
+        fetched, the transcripts and the rest of the gene are left in the
+        database.
+
+        Args:
+            build(str)
+
+        Returns:
+            gene_lookup(dict): {<hgnc_id(int)>: <GeneRecord>}
+        """
+        query = {'build': build}
+        projection = {field: 1 for field in LOAD_GENE_FIELDS}
+        projection['hgnc_id'] = 1
+        projection['_id'] = 0
+
+        def build_gene_lookup():
+            gene_lookup = {}
+            logger.info("Building gene lookup")
+            for gene_obj in self.hgnc_collection.find(query, projection):
+                gene_lookup[gene_obj['hgnc_id']] = GeneRecord(gene_obj)
+            logger.info("All genes fetched")
+            return gene_lookup
+
+        fingerprint = collection_fingerprint(self.hgnc_collection, query)
+        return reference_cache.get(self.db.name, 'gene_lookup', build,
+                                   fingerprint, build_gene_lookup)
 
     def hgncsymbol_to_gene(self):
         """Return a dictionary with hgnc_symbol as key and gene_obj as value
@@ -3,10 +3,12 @@ import logging
 
 import operator
 
-from pymongo.errors import DuplicateKeyError
+from pymongo.errors import (DuplicateKeyError, BulkWriteError)
 
 from scout.exceptions import IntegrityError
 
+from .cache import gene_info_cache
+
 log = logging.getLogger(__name__)
 
 
@@ -26,6 +28,24 @@ class HpoHandler(object):
             raise IntegrityError("Hpo term %s already exists in database".format(hpo_obj['_id']))
         log.debug("Hpo term saved")
 
+    def load_hpo_bulk(self, hpo_objs):
+        """Add a batch of hpo objects with one unordered insert
+
+        Arguments:
+            hpo_objs(list(dict))
+
+        Returns:
+            nr_inserted(int)
+        """
+        if not hpo_objs:
+            return 0
+        try:
+            res = self.hpo_term_collection.insert_many(hpo_objs, ordered=False)
+        except BulkWriteError as err:
+            raise IntegrityError("{0} hpo terms already exists in database".format(
+                len(err.details.get('writeErrors', []))))
+        return len(res.inserted_ids)
+
     def hpo_term(self, hpo_id):
         """Fetch a hpo term
 
@@ -103,6 +123,39 @@ class HpoHandler(object):
 
         return list(self.disease_term_collection.find(query))
 
+    def genes_disease_terms(self, hgnc_ids):
+        """Return the disease terms that overlaps each of many genes
+
+        The terms are cached in the process, the terms of the genes that are
+        not cached are fetched with one query.
+
+        Args:
+            hgnc_ids(iterable(int))
+
+        Returns:
+            dict: {<hgnc_id>: <list of disease terms>}
+        """
+        keys = {hgnc_id: (self.db.name, 'disease_terms', hgnc_id)
+                for hgnc_id in set(hgnc_ids)}
+        cached = gene_info_cache.get_many(keys.values())
+        disease_terms = {hgnc_id: cached[key] for hgnc_id, key in keys.items()
+                         if key in cached}
+        missing = [hgnc_id for hgnc_id in keys if hgnc_id not in disease_terms]
+        if not missing:
+            return disease_terms
+
+        log.debug("Fetching diseases for genes %s",
+                  ', '.join(str(hgnc_id) for hgnc_id in missing))
+        fetched = {hgnc_id: [] for hgnc_id in missing}
+        for disease_term in self.disease_term_collection.find({'genes': {'$in': missing}}):
+            for hgnc_id in disease_term.get('genes', []):
+                if hgnc_id in fetched:
+                    fetched[hgnc_id].append(disease_term)
+        gene_info_cache.set_many({keys[hgnc_id]: terms for hgnc_id, terms
+                                  in fetched.items()})
+        disease_terms.update(fetched)
+        return disease_terms
+
     def load_disease_term(self, disease_obj):
         """Load a disease term into the database
 
@@ -112,11 +165,32 @@ class HpoHandler(object):
         log.debug("Loading disease term %s into database", disease_obj['_id'])
         try:
             self.disease_term_collection.insert_one(disease_obj)
+            gene_info_cache.invalidate(self.db.name)
         except DuplicateKeyError as err:
             raise IntegrityError("Disease term %s already exists in database".format(disease_obj['_id']))
 
         log.debug("Disease term saved")
 
+    def load_disease_bulk(self, disease_objs):
+        """Add a batch of disease terms with one unordered insert
+
+        Args:
+            disease_objs(list(dict))
+
+        Returns:
+            nr_inserted(int)
+        """
+        if not disease_objs:
+            return 0
+        try:
+            res = self.disease_term_collection.insert_many(disease_objs, ordered=False)
+        except BulkWriteError as err:
+            raise IntegrityError("{0} disease terms already exists in database".format(
+                len(err.details.get('writeErrors', []))))
+        finally:
+            gene_info_cache.invalidate(self.db.name)
+        return len(res.inserted_ids)
+
     def generate_hpo_gene_list(self, *hpo_terms):
         """Generate a sorted list with namedtuples of hpogenes
 
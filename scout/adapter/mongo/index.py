@@ -30,23 +30,22 @@ class IndexHandler(object):
         return indexes
 
     def load_indexes(self):
-        """Add a hpo object
-
-        Arguments:
-            hpo_obj(dict)
-
-        """
+        """Create the indexes in INDEXES, existing indexes are replaced"""
         for collection_name in INDEXES:
-            existing_indexes = self.indexes(collection_name)
+            # The keys in INDEXES are the names of the collection attributes
+            collection = getattr(self, collection_name)
+            existing_indexes = collection.index_information()
             indexes = INDEXES[collection_name]
             for index in indexes:
                 index_name = index.document.get('name')
                 if index_name in existing_indexes:
                     log.info("Deleting old index: %s" % index_name)
-                    self.db[collection_name].drop_index(index_name)
+                    collection.drop_index(index_name)
             log.info("creating indexes: %s" % ', '.join([
                 index.document.get('name') for index in indexes
             ]))
-            self.db[collection_name].create_indexes(indexes)
+            collection.create_indexes(indexes)
+        # The query planner looks up the indexes again
+        self._collection_index_names = None
         
 
@@ -87,3 +87,16 @@ class InstituteHandler(object):
         logger.info("Fetching all institutes")
         return self.institute_collection.find()
 
+    def institutes_by_id(self, institute_ids):
+        """Fetch many institutes with one query
+
+            Args:
+                institute_ids(iterable(str))
+
+            Returns:
+                institutes(dict): {<institute_id>: <institute_obj>}, institutes
+                                  that does not exist are left out
+        """
+        res = self.institute_collection.find({'_id': {'$in': list(set(institute_ids))}})
+        return {institute_obj['_id']: institute_obj for institute_obj in res}
+
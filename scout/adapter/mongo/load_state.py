@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+load_state.py
+
+Checkpoints for variant loads.
+
+While the variants of a vcf are inserted the progress is stored in the
+load_state collection after every batch. If a load crashes the variants that
+were inserted are kept, and the load can be resumed from the last checkpoint.
+
+A load state looks like:
+
+    {
+        '_id': <case_id>_<variant_type>_<category>[_<region>],
+        'case_id': str,
+        'variant_type': str,
+        'category': str,
+        'variant_file': str,
+        'region': str, # '' if the whole vcf is loaded
+        'shards': list(str), # None if the vcf is not loaded in shards
+        'shards_done': list(str), # Shards that are completely inserted
+        'shard': str, # The shard or region that is being inserted
+        'nr_records': int, # Records of the shard that are handled
+        'chrom': str, # Chromosome of the last inserted variant
+        'position': int, # Position of the last inserted variant
+        'batch': int, # Number of inserted batches
+        'nr_inserted': int,
+        'status': str, # 'running' or 'done'
+        'updated_at': datetime,
+    }
+"""
+import logging
+
+from datetime import datetime
+
+log = logging.getLogger(__name__)
+
+
+def load_state_id(case_id, variant_type, category, region=''):
+    """Return the id of the load state for a type of variants in a case
+
+    Loads of a region have their own load state, so that they do not replace
+    the checkpoint of a load of the whole vcf.
+    """
+    parts = [case_id, variant_type, category]
+    if region:
+        parts.append(region)
+    return '_'.join(parts)
+
+
+class LoadStateHandler(object):
+
+    """Methods to handle variant load checkpoints in the mongo adapter"""
+
+    def load_state(self, case_id, variant_type='clinical', category='snv', region=''):
+        """Return the load state for a type of variants in a case
+
+        Args:
+            case_id(str)
+            variant_type(str)
+            category(str)
+            region(str): '' for loads of the whole vcf
+
+        Returns:
+            load_state(dict): None if no load has been started
+        """
+        return self.load_state_collection.find_one(
+            {'_id': load_state_id(case_id, variant_type, category, region)})
+
+    def resumable_load_state(self, case_id, variant_type, category, variant_file,
+                             region=''):
+        """Return the load state of a load that can be resumed
+
+        Only a load of the same file and region that has not finished can be
+        resumed.
+
+        Args:
+            case_id(str)
+            variant_type(str)
+            category(str)
+            variant_file(str)
+            region(str): '' for loads of the whole vcf
+
+        Returns:
+            load_state(dict): None if there is no load to resume
+        """
+        load_state = self.load_state(case_id, variant_type, category, region)
+        if (load_state and load_state['status'] == 'running' and
+                load_state['variant_file'] == variant_file and
+                load_state['region'] == region):
+            return load_state
+        return None
+
+    def load_states(self, case_id, status=None):
+        """Return the load states for a case
+
+        Args:
+            case_id(str)
+            status(str): Only return load states with this status
+
+        Returns:
+            load_states(pymongo.Cursor)
+        """
+        query = {'case_id': case_id}
+        if status:
+            query['status'] = status
+        return self.load_state_collection.find(query)
+
+    def save_load_state(self, load_state):
+        """Store a checkpoint of a variant load
+
+        Args:
+            load_state(dict)
+
+        Returns:
+            load_state(dict)
+        """
+        load_state['updated_at'] = datetime.now()
+        self.load_state_collection.find_one_and_replace(
+            {'_id': load_state['_id']},
+            load_state,
+            upsert=True,
+        )
+        return load_state
+
+    def delete_load_states(self, case_id, variant_type=None, category=None):
+        """Delete the load states of a case
+
+        Args:
+            case_id(str)
+            variant_type(str): Only delete load states of this variant type
+            category(str): Only delete load states of this category
+        """
+        query = {'case_id': case_id}
+        if variant_type:
+            query['variant_type'] = variant_type
+        if category:
+            query['category'] = category
+        result = self.load_state_collection.delete_many(query)
+        log.debug("%s load states deleted", result.deleted_count)
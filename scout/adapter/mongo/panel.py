@@ -17,6 +17,8 @@ from scout.utils.date import get_date
 
 from scout.exceptions import IntegrityError
 
+from .cache import (reference_cache, collection_fingerprint)
+
 LOG = logging.getLogger(__name__)
 
 
@@ -181,7 +183,9 @@ class PanelHandler(object):
                                  " exist in database".format(panel_name, panel_version))
         LOG.debug("Panel saved")
 
+        panel_obj['updated_at'] = dt.datetime.now()
         self.panel_collection.insert_one(panel_obj)
+        reference_cache.invalidate(self.db.name, ['gene_to_panels'])
 
     def panel(self, panel_id):
         """Fetch a gene panel by '_id'.
@@ -197,6 +201,24 @@ class PanelHandler(object):
         panel_obj = self.panel_collection.find_one({'_id': panel_id})
         return panel_obj
 
+    def panels_by_id(self, panel_ids):
+        """Fetch many gene panels by '_id' with one query
+
+        Args:
+            panel_ids (iterable(str, ObjectId))
+
+        Returns:
+            dict: {<panel_id>: <panel_obj>} with the ids as they were given,
+                  panels that are not found are left out
+        """
+        object_ids = {panel_id: (panel_id if isinstance(panel_id, ObjectId)
+                                 else ObjectId(panel_id))
+                      for panel_id in panel_ids}
+        res = self.panel_collection.find({'_id': {'$in': list(set(object_ids.values()))}})
+        panels = {panel_obj['_id']: panel_obj for panel_obj in res}
+        return {panel_id: panels[object_id] for panel_id, object_id in object_ids.items()
+                if object_id in panels}
+
     def delete_panel(self, panel_obj):
         """Delete a panel by '_id'.
 
@@ -207,6 +229,7 @@ class PanelHandler(object):
             res(pymongo.DeleteResult)
         """
         res = self.panel_collection.delete_one({'_id': panel_obj['_id']})
+        reference_cache.invalidate(self.db.name, ['gene_to_panels'])
         LOG.warning("Deleting panel %s, version %s" % (panel_obj['panel_name'], panel_obj['version']))
         return res
 
@@ -262,24 +285,33 @@ class PanelHandler(object):
     def gene_to_panels(self):
         """Fetch all gene panels and group them by gene
 
+            The result is cached in the process until the panels change and
+            should not be modified.
+
             Args:
                 adapter(MongoAdapter)
             Returns:
                 gene_dict(dict): A dictionary with gene as keys and a set of
                                  panel names as value
         """
-        LOG.info("Building gene to panels")
-        gene_dict = {}
-        for panel in self.gene_panels():
-            for gene in panel['genes']:
-                hgnc_id = gene['hgnc_id']
-                if hgnc_id in gene_dict:
-                    gene_dict[hgnc_id].add(panel['panel_name'])
-                else:
-                    gene_dict[hgnc_id] = set([panel['panel_name']])
-        LOG.info("Gene to panels done")
-
-        return gene_dict
+        def build_gene_dict():
+            LOG.info("Building gene to panels")
+            gene_dict = {}
+            for panel in self.gene_panels():
+                for gene in panel['genes']:
+                    hgnc_id = gene['hgnc_id']
+                    if hgnc_id in gene_dict:
+                        gene_dict[hgnc_id].add(panel['panel_name'])
+                    else:
+                        gene_dict[hgnc_id] = set([panel['panel_name']])
+            LOG.info("Gene to panels done")
+            return gene_dict
+
+        # Every write of a panel sets updated_at, also when the date is kept
+        fingerprint = collection_fingerprint(self.panel_collection,
+                                             date_key='updated_at')
+        return reference_cache.get(self.db.name, 'gene_to_panels', None,
+                                   fingerprint, build_gene_dict)
 
     def update_panel(self, panel_obj, version=None, date_obj=None):
         """Replace a existing gene panel with a new one
@@ -307,12 +339,14 @@ class PanelHandler(object):
         else:
             date = date_obj or dt.datetime.now()
         panel_obj['date'] = date
+        panel_obj['updated_at'] = dt.datetime.now()
 
         updated_panel = self.panel_collection.find_one_and_replace(
             {'_id': panel_obj['_id']},
             panel_obj,
             return_document=pymongo.ReturnDocument.AFTER
         )
+        reference_cache.invalidate(self.db.name, ['gene_to_panels'])
 
         return updated_panel
 
@@ -347,6 +381,9 @@ class PanelHandler(object):
             {
                 '$push': {
                     'pending': pending_action
+                },
+                '$set': {
+                    'updated_at': dt.datetime.now()
                 }
             },
             return_document=pymongo.ReturnDocument.AFTER
@@ -424,8 +461,10 @@ class PanelHandler(object):
 
         new_panel['genes'] = new_genes
         new_panel['version'] = panel_obj['version'] + 1
+        new_panel['updated_at'] = dt.datetime.now()
 
         self.panel_collection.insert_one(new_panel)
+        reference_cache.invalidate(self.db.name, ['gene_to_panels'])
 
         # archive the old panel
         panel_obj['is_archived'] = True
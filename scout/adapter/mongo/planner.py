@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+planner.py
+
+Rewrite the queries from build_query to shapes that mongo can answer with the
+indexes in scout.constants.INDEXES, and pick the index that fits a query best.
+
+build_query nests the filters in '$and' and '$or'. A filter like 'frequency
+below x or no frequency' is an '$or' with two branches, which mongo answers
+with one index scan per branch, or not at all with an index when the '$or'
+is nested. The same filter can be written on the field itself as
+{'$not': {'$gte': x}}, which matches missing values as well, and is an
+ordinary range on the index. That also matches null, strings and arrays, so
+it is only done for the fields in NUMERIC_KEYS.
+"""
+import logging
+
+log = logging.getLogger(__name__)
+
+# The operator that matches the values that the key operator does not match
+COMPLEMENT_OPERATORS = {
+    '$lt': '$gte',
+    '$lte': '$gt',
+    '$gt': '$lte',
+    '$gte': '$lt',
+}
+
+# Fields that build_variant only stores as an int or a float, and leaves out
+# when there is no value
+NUMERIC_KEYS = (
+    'thousand_genomes_frequency',
+    'exac_frequency',
+    'local_obs_old',
+    'clingen_ngi',
+    'cadd_score',
+    'length',
+)
+
+# Fields that only have a few different values within a case, an index that
+# only matches these after case_id does not narrow down a query much
+LOW_SELECTIVITY_KEYS = ('category', 'variant_type')
+
+
+def _missing_or_range(clauses):
+    """Rewrite an '$or' with a range and a missing value on the same field
+
+    [{field: {'$lt': x}}, {field: {'$exists': False}}] becomes
+    {field: {'$not': {'$gte': x}}}. A None value in place of '$exists' is
+    handled the same way. Only fields in NUMERIC_KEYS are rewritten.
+
+    Args:
+        clauses(list(dict)): The branches of an '$or'
+
+    Returns:
+        clause(dict): None if the branches can not be rewritten
+    """
+    if len(clauses) != 2:
+        return None
+    fields = set()
+    missing = False
+    range_condition = None
+    for clause in clauses:
+        if len(clause) != 1:
+            return None
+        field, condition = next(iter(clause.items()))
+        if field.startswith('$'):
+            return None
+        fields.add(field)
+        if condition is None or condition == {'$exists': False}:
+            missing = True
+        elif (isinstance(condition, dict) and len(condition) == 1 and
+              next(iter(condition)) in COMPLEMENT_OPERATORS):
+            range_condition = condition
+        else:
+            return None
+
+    if len(fields) != 1 or not (missing and range_condition):
+        return None
+    if next(iter(fields)) not in NUMERIC_KEYS:
+        return None
+    operator, value = next(iter(range_condition.items()))
+    return {fields.pop(): {'$not': {COMPLEMENT_OPERATORS[operator]: value}}}
+
+
+def _clauses(mongo_query):
+    """Split a query into clauses on one field each, nested '$and' are unpacked"""
+    for key, value in mongo_query.items():
+        if key == '$and':
+            for clause in value:
+                for sub_clause in _clauses(clause):
+                    yield sub_clause
+        elif key == '$or':
+            yield (_missing_or_range(value) or
+                   {'$or': [normalize_query(clause) for clause in value]})
+        else:
+            yield {key: value}
+
+
+def normalize_query(mongo_query):
+    """Rewrite a query so that as many filters as possible are on top level
+
+    The filters inside '$and' are moved to the top level and '$or' filters on
+    a range or a missing value of one field are rewritten to a range on that
+    field. Filters on a field that is already on top level are kept in a
+    top level '$and'.
+
+    Args:
+        mongo_query(dict)
+
+    Returns:
+        normalized_query(dict): A new query that matches the same variants
+    """
+    normalized_query = {}
+    repeated_clauses = []
+    for clause in _clauses(mongo_query):
+        key, value = next(iter(clause.items()))
+        if key in normalized_query:
+            repeated_clauses.append(clause)
+        else:
+            normalized_query[key] = value
+    if repeated_clauses:
+        normalized_query['$and'] = repeated_clauses
+    return normalized_query
+
+
+def _is_equality(condition):
+    """Check if a condition only matches exact values"""
+    if not isinstance(condition, dict):
+        return True
+    return bool(condition) and all(operator in ('$in', '$eq') for operator in condition)
+
+
+def index_keys(index):
+    """Return the names of the fields in a pymongo IndexModel"""
+    return list(index.document['key'].keys())
+
+
+def _index_score(keys, equality_keys, range_keys, sort_keys):
+    """Score how well an index fits a query
+
+    Fields with exact values should come first in the index, then the sort
+    fields and last the fields with ranges.
+
+    Returns:
+        score(tuple): Compared with other scores, higher is better
+    """
+    position = 0
+    nr_equality = 0
+    selectivity = 0
+    while position < len(keys) and keys[position] in equality_keys:
+        nr_equality += 1
+        if keys[position] not in LOW_SELECTIVITY_KEYS:
+            selectivity += 1
+        position += 1
+
+    sorted_by_index = 0
+    if sort_keys and keys[position:position + len(sort_keys)] == sort_keys:
+        sorted_by_index = 1
+        position += len(sort_keys)
+
+    nr_range = 0
+    while position < len(keys) and keys[position] in range_keys:
+        nr_range += 1
+        position += 1
+
+    return (selectivity, nr_equality, sorted_by_index, nr_range, -len(keys))
+
+
+def choose_index(mongo_query, sorting, indexes):
+    """Pick the index that fits a normalized query best
+
+    Args:
+        mongo_query(dict): From normalize_query
+        sorting(list(tuple)): [(<field>, <direction>), ...]
+        indexes(list(pymongo.IndexModel))
+
+    Returns:
+        index_name(str): None if no index starts with a field of the query
+    """
+    equality_keys = set()
+    range_keys = set()
+    for key, condition in mongo_query.items():
+        if key.startswith('$'):
+            continue
+        if _is_equality(condition):
+            equality_keys.add(key)
+        else:
+            range_keys.add(key)
+    sort_keys = [key for key, _ in sorting or []]
+
+    best_index = None
+    best_score = None
+    for index in indexes:
+        score = _index_score(index_keys(index), equality_keys, range_keys,
+                             sort_keys)
+        if score[1] == 0:
+            continue
+        if best_score is None or score > best_score:
+            best_index = index.document['name']
+            best_score = score
+    return best_index
+
+
+def _plan_indexes(plan):
+    """Return the names of the indexes that are used in a query plan"""
+    index_names = []
+    if plan.get('indexName'):
+        index_names.append(plan['indexName'])
+    for stage in [plan.get('inputStage')] + plan.get('inputStages', []):
+        if stage:
+            index_names.extend(_plan_indexes(stage))
+    return index_names
+
+
+def explain_summary(explanation):
+    """Summarize the output of explain on a query
+
+    Args:
+        explanation(dict): From pymongo.Cursor.explain()
+
+    Returns:
+        summary(dict): The stage and indexes of the winning plan, the number
+                       of documents that were examined and returned and the
+                       ratio between them
+    """
+    winning_plan = explanation.get('queryPlanner', {}).get('winningPlan', {})
+    stats = explanation.get('executionStats', {})
+    nr_examined = stats.get('totalDocsExamined', 0)
+    nr_returned = stats.get('nReturned', 0)
+    return {
+        'stage': winning_plan.get('stage'),
+        'indexes': _plan_indexes(winning_plan),
+        'docs_examined': nr_examined,
+        'returned': nr_returned,
+        'examined_ratio': nr_examined / nr_returned if nr_returned else float(nr_examined),
+    }
@@ -1,9 +1,67 @@
 import logging
 
+from scout.constants import INDEXES
+
+from .planner import (normalize_query, choose_index, explain_summary)
+
 logger = logging.getLogger(__name__)
 
 class QueryHandler(object):
 
+    def plan_query(self, mongo_query, sorting=None,
+                   collection_name='variant_collection'):
+        """Rewrite a query so that it can use the indexes and pick an index
+
+        The index is picked from the ones declared in INDEXES, and only if it
+        exists in the database.
+
+        Arguments:
+            mongo_query(dict): From build_query
+            sorting(list(tuple)): The sort order of the query
+            collection_name(str): Name of the collection in INDEXES
+
+        Returns:
+            planned_query(dict), hint(str): hint is None if no index fits
+        """
+        planned_query = normalize_query(mongo_query)
+        hint = choose_index(planned_query, sorting,
+                            INDEXES.get(collection_name, []))
+        if hint and hint not in self._index_names(collection_name):
+            logger.debug("Index %s does not exist, run 'scout index'", hint)
+            hint = None
+        logger.debug("planned query: %s, hint: %s", planned_query, hint)
+        return planned_query, hint
+
+    def _index_names(self, collection_name):
+        """Return the names of the indexes of a collection
+
+        The names are looked up once per adapter, load_indexes resets them.
+        """
+        index_names = getattr(self, '_collection_index_names', None)
+        if index_names is None:
+            index_names = self._collection_index_names = {}
+        if collection_name not in index_names:
+            collection = getattr(self, collection_name)
+            index_names[collection_name] = set(collection.index_information())
+        return index_names[collection_name]
+
+    def log_query_plan(self, cursor):
+        """Log the winning plan of a query and how many documents it examined
+
+        This runs the query an extra time so it is only done in debug mode.
+
+        Arguments:
+            cursor(pymongo.Cursor): A cursor that has not been iterated
+        """
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        summary = explain_summary(cursor.clone().explain())
+        logger.debug("Winning plan %s with indexes %s examined %s documents and "
+                     "returned %s (ratio %.1f)", summary['stage'],
+                     ', '.join(summary['indexes']) or 'none',
+                     summary['docs_examined'], summary['returned'],
+                     summary['examined_ratio'])
+
     def build_query(self, case_id, query=None, variant_ids=None, category='snv'):
         """Build a mongo query
 
@@ -83,6 +83,19 @@ class UserHandler(object):
         user_obj = self.user_collection.find_one({'_id': email})
 
         return user_obj
+
+    def users_by_email(self, emails):
+        """Fetch many users with one query
+
+            Args:
+                emails(iterable(str))
+
+            Returns:
+                users(dict): {<email>: <user_obj>}, users that does not exist
+                             are left out
+        """
+        res = self.user_collection.find({'_id': {'$in': list(set(emails))}})
+        return {user_obj['_id']: user_obj for user_obj in res}
     
     def delete_user(self, email):
         """Delete a user from the database
@@ -1,9 +1,13 @@
 # -*- coding: utf-8 -*-
 # stdlib modules
+import itertools
 import logging
+import multiprocessing
+import os
 import re
-import pathlib
-import tempfile
+import queue
+import time
+import warnings
 
 from datetime import datetime
 
@@ -17,17 +21,399 @@ from cyvcf2 import VCF
 from scout.parse.variant.headers import (parse_rank_results_header,
                                          parse_vep_header)
 from scout.parse.variant.rank_score import parse_rank_score
+from scout.parse.variant.csq import parse_csq_columns
 
 from scout.parse.variant import parse_variant
+from scout.parse.variant.coordinates import annotate_cytobands
 from scout.build import build_variant
 
-from scout.utils.coordinates import is_par
+from scout.constants import CHR_PATTERN
+from scout.utils.coordinates import (is_par, genomic_bin, overlapping_bins)
+from scout.utils.tabix import index_sequences
 
-from pymongo.errors import DuplicateKeyError
-from scout.exceptions import IntegrityError
+from pymongo import UpdateOne
+from pymongo.errors import (DuplicateKeyError, BulkWriteError)
+from scout.exceptions import (IntegrityError, VcfError)
+
+from .cache import (gene_info_cache, region_vcf_cache)
+from .load_state import load_state_id
 
 logger = logging.getLogger(__name__)
 
+# Number of variant documents that are sent to the database in one insert
+BATCH_SIZE = 5000
+# Number of overlapping variants that are returned at a time
+OVERLAPPING_LIMIT = 30
+# Region vcfs longer than this, in characters, are not cached
+REGION_VCF_CACHE_LIMIT = 1000000
+# Longest region, in bases, that is served to the alignment viewer
+REGION_VCF_MAX_SPAN = 10000000
+# Error code that mongo uses for duplicated keys
+DUPLICATE_KEY_ERROR = 11000
+# Number of batches of a shard that may wait to be inserted
+QUEUED_BATCHES = 2
+# Number of records that are filtered, parsed and built at a time
+PARSE_BATCH_SIZE = 1000
+
+
+
+# Sort orders of the variant lists, _id breaks ties so that the order is the
+# same every time
+VARIANT_SORTING = {
+    'variant_rank': [('variant_rank', pymongo.ASCENDING), ('_id', pymongo.ASCENDING)],
+    'rank_score': [('rank_score', pymongo.DESCENDING), ('_id', pymongo.ASCENDING)],
+}
+
+
+def panel_gene_info(panel_obj):
+    """Collect the manual annotations of the genes in a gene panel
+
+    Args:
+        panel_obj(dict)
+
+    Returns:
+        gene_info(dict): {<hgnc_id>: {
+                            'disease_associated_transcripts': set(str),
+                            'disease_associated_no_version': set(str),
+                            'reduced_penetrance': bool,
+                            'mosaicism': bool,
+                            'inheritance_models': set(str),
+                         }}
+    """
+    gene_info = {}
+    for panel_gene in panel_obj['genes']:
+        info = gene_info.setdefault(panel_gene['hgnc_id'], {
+            'disease_associated_transcripts': set(),
+            'disease_associated_no_version': set(),
+            'reduced_penetrance': False,
+            'mosaicism': False,
+            'inheritance_models': set(),
+        })
+        for tx in panel_gene.get('disease_associated_transcripts', []):
+            info['disease_associated_transcripts'].add(tx)
+            # We remove the version of transcript to compare against others
+            info['disease_associated_no_version'].add(re.sub(r'\.[0-9]', '', tx))
+        if panel_gene.get('reduced_penetrance'):
+            info['reduced_penetrance'] = True
+        if panel_gene.get('mosaicism'):
+            info['mosaicism'] = True
+        info['inheritance_models'].update(panel_gene.get('inheritance_models', []))
+    return gene_info
+
+
+def case_variant_file(case_obj, variant_type='clinical', category='snv'):
+    """Return the path of the snv or sv vcf of a case
+
+    Args:
+        case_obj(dict)
+        variant_type(str): 'clinical' or 'research'
+        category(str): 'snv' or 'sv'
+
+    Returns:
+        variant_file(str): None if the case has no such vcf
+    """
+    file_name = {'snv': 'vcf_snv', 'sv': 'vcf_sv'}.get(category)
+    if not file_name:
+        return None
+    if variant_type == 'research':
+        file_name += '_research'
+    elif variant_type != 'clinical':
+        return None
+    return case_obj.get('vcf_files', {}).get(file_name)
+
+
+def vcf_header(variant_file):
+    """Return the header of a vcf, it is cached per file
+
+    Args:
+        variant_file(str)
+
+    Returns:
+        header(str)
+    """
+    key = (variant_file, 'header', os.path.getmtime(variant_file))
+
+    def read_header():
+        header_lines = [line for line in VCF(variant_file).raw_header.split('\n')
+                        if len(line) > 3]
+        return ''.join(line + '\n' for line in header_lines)
+
+    return region_vcf_cache.get(key, read_header)
+
+
+def region_vcf(variant_file, region=''):
+    """Return the header and the records of a region in a vcf
+
+    The records are looked up with the tabix index of the vcf. Recently
+    served regions are cached.
+
+    Args:
+        variant_file(str): Path to a bgzipped and indexed vcf
+        region(str): '<chrom>', '<chrom>:<start>-<end>' or '' for all records
+
+    Returns:
+        region_vcf(str)
+    """
+    key = (variant_file, region, os.path.getmtime(variant_file))
+    cached = region_vcf_cache.get_many([key])
+    if key in cached:
+        return cached[key]
+
+    vcf_lines = [vcf_header(variant_file)]
+    vcf_lines.extend(str(variant) for variant in VCF(variant_file)(region))
+    result = ''.join(vcf_lines)
+    if len(result) <= REGION_VCF_CACHE_LIMIT:
+        region_vcf_cache.set_many({key: result})
+    return result
+
+
+def variant_keyset(variant_obj, sort_key='variant_rank'):
+    """Return the position of a variant in a sorted variant list
+
+    Args:
+        variant_obj(dict)
+        sort_key(str): A key in VARIANT_SORTING
+
+    Returns:
+        keyset(tuple): (<value of sort_key>, <_id>)
+    """
+    return (variant_obj.get(sort_key), variant_obj['_id'])
+
+
+def keyset_query(sorting, after):
+    """Return a query for the variants after a keyset in a sort order
+
+    The sort field gets a range that the index can use, and the '$or' leaves
+    out the variants with the same value that come before in _id order.
+
+    Args:
+        sorting(list(tuple)): From VARIANT_SORTING
+        after(tuple): From variant_keyset
+
+    Returns:
+        query(dict)
+    """
+    sort_field, direction = sorting[0]
+    value, variant_id = after
+    if direction == pymongo.ASCENDING:
+        operator, strict_operator = '$gte', '$gt'
+    else:
+        operator, strict_operator = '$lte', '$lt'
+    return {
+        sort_field: {operator: value},
+        '$or': [
+            {sort_field: {strict_operator: value}},
+            {'_id': {'$gt': variant_id}},
+        ]
+    }
+
+
+def is_indexed(variant_file):
+    """Check if there is a tabix index next to a vcf file"""
+    return any(os.path.exists(variant_file + suffix) for suffix in ('.tbi', '.csi'))
+
+
+def new_load_stats():
+    """Counters for the variants that are filtered and built during a load"""
+    return {'accepted': 0, 'rejected': 0, 'filter_time': 0.0, 'build_time': 0.0}
+
+
+def add_load_stats(stats, other_stats):
+    """Add the counters in other_stats to stats"""
+    for key in stats:
+        stats[key] += other_stats[key]
+
+
+def log_load_stats(stats):
+    """Log how many variants that were rejected and accepted"""
+    logger.info("%s variants rejected by the prefilter in %.2fs",
+                stats['rejected'], stats['filter_time'])
+    logger.info("%s variants accepted and built in %.2fs",
+                stats['accepted'], stats['build_time'])
+
+
+def build_variant_batch(records, build_args, stats):
+    """Parse and build a batch of accepted records
+
+    The records are parsed one at a time and the cytobands of the whole batch
+    are looked up at once.
+
+    Args:
+        records(list(tuple)): (nr_variants, cyvcf2.Variant)
+        build_args(dict): See build_variant_objs
+        stats(dict): Counters from new_load_stats that are updated
+
+    Returns:
+        built_batch(list(tuple)): (nr_variants, variant_obj)
+    """
+    start_time = time.perf_counter()
+    parsed_variants = [
+        parse_variant(
+            variant=variant,
+            case=build_args['case_obj'],
+            variant_type=build_args['variant_type'],
+            rank_results_header=build_args['rank_results_header'],
+            vep_header=build_args['vep_header'],
+            individual_positions=build_args['individual_positions'],
+            category=build_args['category'],
+            csq_columns=build_args['csq_columns'],
+            cytobands=False,
+        )
+        for _, variant in records
+    ]
+    annotate_cytobands(parsed_variants)
+    built_batch = []
+    for (nr_variants, _), parsed_variant in zip(records, parsed_variants):
+        variant_obj = build_variant(
+            variant=parsed_variant,
+            institute_id=build_args['institute_id'],
+            gene_to_panels=build_args['gene_to_panels'],
+            hgncid_to_gene=build_args['hgncid_to_gene'],
+            sample_info=build_args['sample_info']
+        )
+        built_batch.append((nr_variants, variant_obj))
+    stats['accepted'] += len(built_batch)
+    stats['build_time'] += time.perf_counter() - start_time
+    return built_batch
+
+
+def build_variant_objs(variants, build_args, stats=None):
+    """Parse and build the variants that should be loaded
+
+    Each record is first checked against the rank score threshold, only
+    looking at the RankScore field, so that rejected variants are never
+    parsed or built. Variants on MT are always loaded. Regions are selected
+    with the tabix index before the variants gets here.
+
+    The records are read, filtered and built in batches of PARSE_BATCH_SIZE,
+    and the time spent is counted once per batch.
+
+    Args:
+        variants(iterable(cyvcf2.Variant))
+        build_args(dict): case_obj, variant_type, category, rank_threshold,
+                          rank_results_header, vep_header, csq_columns,
+                          individual_positions, institute_id, gene_to_panels,
+                          hgncid_to_gene and sample_info
+        stats(dict): Counters from new_load_stats that are updated
+
+    Yields:
+        nr_variants(int), variant_obj(dict): Position of the variant in
+                                             variants and the built variant
+    """
+    if stats is None:
+        stats = new_load_stats()
+    case_id = build_args['case_obj']['_id']
+    rank_threshold = build_args['rank_threshold']
+
+    variants = iter(variants)
+    nr_records = 0
+    while True:
+        start_time = time.perf_counter()
+        records = list(itertools.islice(variants, PARSE_BATCH_SIZE))
+        if not records:
+            break
+        accepted = []
+        for nr_variants, variant in enumerate(records, nr_records):
+            if 'MT' not in variant.CHROM:
+                rank_score = parse_rank_score(variant.INFO.get('RankScore'), case_id)
+                if rank_score is not None and rank_score <= rank_threshold:
+                    continue
+            accepted.append((nr_variants, variant))
+        nr_records += len(records)
+        stats['rejected'] += len(records) - len(accepted)
+        stats['filter_time'] += time.perf_counter() - start_time
+
+        for nr_variants, variant_obj in build_variant_batch(accepted, build_args, stats):
+            yield nr_variants, variant_obj
+
+
+def skip_records(variants, checkpoint):
+    """Skip the records of a vcf that were handled before a checkpoint
+
+    The last skipped record has to be the last variant that was inserted,
+    otherwise the vcf has changed since the checkpoint was stored.
+
+    Args:
+        variants(iterable(cyvcf2.Variant))
+        checkpoint(dict): A load state with nr_records, chrom and position
+
+    Returns:
+        variants(iterator): The records after the checkpoint
+    """
+    variants = iter(variants)
+    nr_records = checkpoint['nr_records']
+    if not nr_records:
+        return variants
+    last_record = None
+    for last_record in itertools.islice(variants, nr_records):
+        pass
+    if (last_record is None or
+            CHR_PATTERN.match(last_record.CHROM).group(2) != checkpoint['chrom'] or
+            last_record.POS != checkpoint['position']):
+        raise VcfError("Variant {0}:{1} of the checkpoint is not record {2} of the "
+                       "vcf".format(checkpoint['chrom'], checkpoint['position'],
+                                    nr_records))
+    logger.info("Skipped %s records that were loaded before %s:%s", nr_records,
+                checkpoint['chrom'], checkpoint['position'])
+    return variants
+
+
+# The build arguments are sent once to each worker process instead of with
+# every shard since the gene maps are large
+_shard_build_args = None
+_shard_batch_size = None
+
+
+def _init_shard_worker(build_args, batch_size):
+    """Store the build arguments in a worker process"""
+    global _shard_build_args, _shard_batch_size
+    _shard_build_args = build_args
+    _shard_batch_size = batch_size
+
+
+def _build_shard(shard_info):
+    """Parse and build the variants in one shard of a vcf in a worker process
+
+    The variants are put on the queue of the shard in batches of at most
+    batch size as they are built, together with the number of records of the
+    shard that are handled, followed by the counters of the shard. The queue
+    is bounded so the worker waits while the batches are inserted. If
+    something goes wrong the error is put on the queue instead.
+
+    Args:
+        shard_info(tuple): shard(str), batch_queue(Queue), checkpoint(dict).
+                           The shard is a region of the vcf, usually a
+                           chromosome. If there is a checkpoint the records
+                           before it are skipped
+    """
+    shard, batch_queue, checkpoint = shard_info
+    stats = new_load_stats()
+    try:
+        vcf_obj = VCF(_shard_build_args['variant_file'])
+        variant_batch = []
+        nr_skipped = 0
+        with warnings.catch_warnings():
+            # cyvcf2 warns about contigs in the header without any variants
+            warnings.simplefilter('ignore')
+            variants = vcf_obj(shard)
+            if checkpoint:
+                variants = skip_records(variants, checkpoint)
+                nr_skipped = checkpoint['nr_records']
+            for nr_variants, variant_obj in build_variant_objs(variants,
+                                                               _shard_build_args,
+                                                               stats):
+                variant_batch.append(variant_obj)
+                if len(variant_batch) >= _shard_batch_size:
+                    batch_queue.put(('batch', (variant_batch,
+                                               nr_skipped + nr_variants + 1)))
+                    variant_batch = []
+        if variant_batch:
+            batch_queue.put(('batch', (variant_batch, nr_skipped + nr_variants + 1)))
+    except Exception as error:
+        batch_queue.put(('error', error))
+        return
+    batch_queue.put(('done', stats))
+
 
 class VariantHandler(object):
 
@@ -36,48 +422,45 @@ class VariantHandler(object):
     def add_gene_info(self, variant_obj, gene_panels=None):
         """Add extra information about genes from gene panels
 
+        The hgnc genes, disease terms and panel information are cached in
+        the process. All genes of the variant that are not cached are
+        fetched with one query.
+
         Args:
             variant_obj(dict): A variant from the database
             gene_panels(list(dict)): List of panels from database
         """
         gene_panels = gene_panels or []
 
-        # We need to check if there are any additional information in the gene panels
+        # The information from each gene panel, by hgnc id
+        panel_infos = [
+            gene_info_cache.get(
+                (self.db.name, 'panel_gene_info', panel_obj['_id'],
+                 panel_obj.get('version'), panel_obj.get('date')),
+                lambda panel_obj=panel_obj: panel_gene_info(panel_obj)
+            )
+            for panel_obj in gene_panels
+        ]
 
-        # extra_info will hold information from gene panels
-        extra_info = {}
-        for panel_obj in gene_panels:
-            for gene_info in panel_obj['genes']:
-                hgnc_id = gene_info['hgnc_id']
-                if hgnc_id in extra_info:
-                    extra_info[hgnc_id].append(gene_info)
-                else:
-                    extra_info[hgnc_id] = [gene_info]
+        variant_genes = variant_obj.get('genes', [])
+        hgnc_ids = [variant_gene['hgnc_id'] for variant_gene in variant_genes]
+        hgnc_genes = self.hgnc_genes_by_id(hgnc_ids)
+        disease_terms = self.genes_disease_terms(hgnc_ids)
 
         # Loop over the genes in the variant object to add information
         # from hgnc_genes and panel genes
-        for variant_gene in variant_obj.get('genes', []):
+        for variant_gene in variant_genes:
             hgnc_id = variant_gene['hgnc_id']
-            # Get the hgnc_gene
-            hgnc_gene = self.hgnc_gene(hgnc_id)
+            hgnc_gene = hgnc_genes.get(hgnc_id)
 
-            # Create a dictionary with transcripts information
+            # A dictionary with transcripts information
             transcripts_dict = {}
             if hgnc_gene:
-                # Add transcript information from the hgnc gene
-                for transcript in hgnc_gene.get('transcripts', []):
-                    tx_id = transcript['ensembl_transcript_id']
-                    transcripts_dict[tx_id] = transcript
-
-                # Add the transcripts to the gene object
-                hgnc_gene['transcripts_dict'] = transcripts_dict
+                transcripts_dict = hgnc_gene['transcripts_dict']
 
                 if hgnc_gene.get('incomplete_penetrance'):
                     variant_gene['omim_penetrance'] = True
 
-            # Get the panel specific information for the gene
-            panel_info = extra_info.get(hgnc_id, [])
-
             # Manually annotated disease associated transcripts
             disease_associated = set()
             # We need to strip the version to compare against others
@@ -88,19 +471,18 @@ class VariantHandler(object):
 
             # We need to loop since there can be information from multiple
             # panels
-            for gene_info in panel_info:
-                # Check if there are manually annotated disease transcripts
-                for tx in gene_info.get('disease_associated_transcripts', []):
-                    # We remove the version of transcript at this stage
-                    stripped = re.sub(r'\.[0-9]', '', tx)
-                    disease_associated_no_version.add(stripped)
-                    disease_associated.add(tx)
-                if gene_info.get('reduced_penetrance'):
+            for panel_info in panel_infos:
+                gene_info = panel_info.get(hgnc_id)
+                if not gene_info:
+                    continue
+                disease_associated.update(gene_info['disease_associated_transcripts'])
+                disease_associated_no_version.update(
+                    gene_info['disease_associated_no_version'])
+                if gene_info['reduced_penetrance']:
                     manual_penetrance = True
-
-                if gene_info.get('mosaicism'):
+                if gene_info['mosaicism']:
                     mosaicism = True
-                manual_inheritance.update(gene_info.get('inheritance_models', []))
+                manual_inheritance.update(gene_info['inheritance_models'])
 
             variant_gene['disease_associated_transcripts'] = list(disease_associated)
             variant_gene['manual_penetrance'] = manual_penetrance
@@ -132,16 +514,21 @@ class VariantHandler(object):
             variant_gene['common'] = hgnc_gene
 
             # Add the associated disease terms
-            variant_gene['disease_terms'] = self.disease_terms(hgnc_id)
+            variant_gene['disease_terms'] = disease_terms[hgnc_id]
 
         return variant_obj
 
     def variants(self, case_id, query=None, variant_ids=None, category='snv',
-                 nr_of_variants=10, skip=0, sort_key='variant_rank'):
+                 nr_of_variants=10, skip=0, sort_key='variant_rank', after=None):
         """Returns variants specified in question for a specific case.
 
         If skip not equal to 0 skip the first n variants.
 
+        The variants are sorted on sort_key with _id as tie breaker. To fetch
+        the next page of a list, give the keyset of the last variant on the
+        current page as after. The variants after it are then found with the
+        index, so every page costs the same as the first, unlike skip.
+
         Arguments:
             case_id(str): A string that represents the case
             query(dict): A dictionary with querys for the database
@@ -150,6 +537,8 @@ class VariantHandler(object):
             nr_of_variants(int): if -1 return all variants
             skip(int): How many variants to skip
             sort_key: 'variant_rank' or 'rank_score'
+            after(tuple): Keyset from variant_keyset, only return the
+                          variants after this one
 
         Yields:
             result(Iterable[Variant])
@@ -162,24 +551,26 @@ class VariantHandler(object):
         elif nr_of_variants == -1:
             nr_of_variants = 0 # This will return all variants
 
-        else:
-            nr_of_variants = skip + nr_of_variants
-
         mongo_query = self.build_query(case_id, query=query,
                                        variant_ids=variant_ids,
                                        category=category)
 
-        sorting = []
-        if sort_key == 'variant_rank':
-            sorting = [('variant_rank', pymongo.ASCENDING)]
-        if sort_key == 'rank_score':
-            sorting = [('rank_score', pymongo.DESCENDING)]
+        sorting = VARIANT_SORTING.get(sort_key, [])
+        if after:
+            if not sorting:
+                raise ValueError("Variants can not be fetched after a variant "
+                                 "without a sort key")
+            mongo_query = {'$and': [mongo_query, keyset_query(sorting, after)]}
 
+        mongo_query, hint = self.plan_query(mongo_query, sorting)
         result = self.variant_collection.find(
             mongo_query,
             skip=skip,
             limit=nr_of_variants
         ).sort(sorting)
+        if hint:
+            result = result.hint(hint)
+        self.log_query_plan(result)
 
         return result
 
@@ -211,28 +602,55 @@ class VariantHandler(object):
                                                variant_obj['position'])
         return variant_obj
 
+    def variants_by_id(self, document_ids, gene_panels=None):
+        """Fetch many variants with one query
+
+        The genes of all variants are looked up together before the gene
+        information is added to each variant, see add_gene_info.
+
+        Arguments:
+            document_ids(iterable(str))
+            gene_panels(List[GenePanel])
+
+        Returns:
+            variants(dict): {<document_id>: <variant_obj>}, variants that does
+                            not exist are left out
+        """
+        variant_objs = list(self.variant_collection.find(
+            {'_id': {'$in': list(set(document_ids))}}))
+        hgnc_ids = [gene['hgnc_id'] for variant_obj in variant_objs
+                    for gene in variant_obj.get('genes', [])]
+        # Fills the gene caches so that add_gene_info does not query again
+        self.hgnc_genes_by_id(hgnc_ids)
+        self.genes_disease_terms(hgnc_ids)
+
+        variants = {}
+        for variant_obj in variant_objs:
+            variant_obj = self.add_gene_info(variant_obj, gene_panels)
+            if variant_obj['chromosome'] in ['X', 'Y']:
+                variant_obj['is_par'] = is_par(variant_obj['chromosome'],
+                                               variant_obj['position'])
+            variants[variant_obj['_id']] = variant_obj
+        return variants
+
     def get_causatives(self, institute_id):
         """Return all causative variants for an institute
 
             Args:
                 institute_id(str)
 
-            Yields:
-                str: variant document id
+            Returns:
+                list(str): variant document ids
         """
-        query = self.case_collection.aggregate([
-            {'$match': {'collaborators': institute_id, 'causatives': {'$exists': True}}},
-            {'$unwind': '$causatives'},
-            {'$group': {'_id': '$causatives'}}
-        ])
-        return [item['_id'] for item in query]
+        return [causative['_id'] for causative in
+                self.institute_causatives(institute_id, projection={'_id': 1})]
 
     def check_causatives(self, case_obj=None, institute_obj=None):
         """Check if there are any variants that are previously marked causative
 
-            Loop through all variants that are marked 'causative' for an
-            institute and check if any of the variants are present in the
-            current case.
+            Look up the variants that are marked 'causative' for an
+            institute in the causative index and check if any of the
+            variants are present in the current case.
 
             Args:
                 case_obj (dict): A Case object
@@ -242,23 +660,14 @@ class VariantHandler(object):
                 causatives(iterable(Variant))
         """
         institute_id = case_obj['owner'] if case_obj else institute_obj['_id']
-        institute_causative_variant_ids = self.get_causatives(institute_id)
-        if len(institute_causative_variant_ids) == 0:
-            return []
-
+        query = {}
         if case_obj:
             # exclude variants that are marked causative in "case_obj"
-            case_causative_ids = set(case_obj.get('causatives', []))
-            institute_causative_variant_ids = list(
-                set(institute_causative_variant_ids).difference(case_causative_ids)
-            )
-
-        # convert from unique ids to general "variant_id"
-        query = self.variant_collection.find(
-            {'_id': {'$in': institute_causative_variant_ids}},
-            {'variant_id': 1}
-        )
-        positional_variant_ids = [item['variant_id'] for item in query]
+            query['_id'] = {'$nin': case_obj.get('causatives', [])}
+        causatives = self.institute_causatives(institute_id, query, {'variant_id': 1})
+        positional_variant_ids = list(set(causative['variant_id'] for causative in causatives))
+        if len(positional_variant_ids) == 0:
+            return []
 
         filters = {'variant_id': {'$in': positional_variant_ids}}
         if case_obj:
@@ -293,39 +702,120 @@ class VariantHandler(object):
                 case_obj(Case)
                 variant_type(str)
         """
-        # Get all variants sorted by rank score
-        variants = self.variant_collection.find({
-            'case_id': case_obj['_id'],
-            'category': category,
-            'variant_type': variant_type,
-        }).sort('rank_score', pymongo.DESCENDING)
+        self.add_variant_rank(case_obj, variant_type, category=category)
+        self.add_compound_info(case_obj, variant_type, category=category)
 
-        logger.info("Updating variant_rank for all variants")
+    def add_compound_info(self, case_obj, variant_type='clinical', category='snv',
+                          batch_size=None):
+        """Add rank score and genes of the compound variants to all variants
 
-        # Update the information on all compounds
-        for index, variant in enumerate(variants):
-            # This is a list with the updated compound documents
-            # compound_objs = self.update_compounds(variant)
-            self.variant_collection.find_one_and_update(
+        This is done once after the variants are loaded so that the variants
+        are complete when they are read. The variants are read in batches,
+        the compound variants of a batch are fetched with one query and the
+        compounds are sent back in one unordered bulk write.
+
+            Args:
+                case_obj(Case)
+                variant_type(str)
+                category(str)
+                batch_size(int): Number of variants that are updated at a time
+
+            Returns:
+                nr_updated(int): Number of variants with updated compounds
+        """
+        batch_size = batch_size or BATCH_SIZE
+        variants = self.variant_collection.find(
+            {
+                'case_id': case_obj['_id'],
+                'category': category,
+                'variant_type': variant_type,
+                'compounds.0': {'$exists': True},
+            },
+            {'compounds': 1}
+        )
+
+        logger.info("Updating compounds for all variants")
+        start_update = datetime.now()
+        nr_updated = 0
+        variant_batch = []
+        for variant in variants:
+            variant_batch.append(variant)
+            if len(variant_batch) >= batch_size:
+                nr_updated += self._update_compound_batch(variant_batch)
+                variant_batch = []
+        nr_updated += self._update_compound_batch(variant_batch)
+        logger.info("Updating compounds done. %s variants updated in %s",
+                    nr_updated, datetime.now() - start_update)
+        return nr_updated
+
+    def _update_compound_batch(self, variant_batch):
+        """Update the compounds of a batch of variants with one bulk write
+
+            Args:
+                variant_batch(list(dict)): Variants with _id and compounds
+
+            Returns:
+                nr_updated(int)
+        """
+        if not variant_batch:
+            return 0
+        compound_variants = self.compound_variants(
+            compound['variant'] for variant in variant_batch
+            for compound in variant['compounds']
+        )
+        requests = [
+            UpdateOne(
                 {'_id': variant['_id']},
-                {
-                    '$set': {
-                        'variant_rank': index + 1,
-                        # 'compounds': compound_objs,
-                    }
-                }
+                {'$set': {'compounds': self.update_compounds(variant, compound_variants)}}
             )
+            for variant in variant_batch
+        ]
+        result = self.variant_collection.bulk_write(requests, ordered=False)
+        return result.modified_count
+
+    def compound_variants(self, document_ids):
+        """Fetch the compound variants of many variants with one query
 
-        logger.info("Updating variant_rank done")
+        Only the fields that update_compounds uses are returned.
 
-    def update_compounds(self, variant):
-        """Update compounds for a variant."""
+        Args:
+            document_ids(iterable(str)): The _id of the compound variants
+
+        Returns:
+            compound_variants(dict): {<_id>: <variant_obj>}
+        """
+        document_ids = list(set(document_ids))
+        if not document_ids:
+            return {}
+        projection = {
+            'rank_score': 1,
+            'genes.hgnc_id': 1,
+            'genes.hgnc_symbol': 1,
+            'genes.region_annotation': 1,
+            'genes.functional_annotation': 1,
+        }
+        return {variant_obj['_id']: variant_obj for variant_obj in
+                self.variant_collection.find({'_id': {'$in': document_ids}},
+                                             projection)}
+
+    def update_compounds(self, variant, compound_variants=None):
+        """Update compounds for a variant.
+
+        Args:
+            variant(dict)
+            compound_variants(dict): From compound_variants, if given the
+                                     compounds are looked up here instead of
+                                     one at a time in the database
+        """
         compound_objs = []
         for compound in variant.get('compounds', []):
             not_loaded = True
             gene_objs = []
             # Check if the compound variant exists
-            variant_obj = self.variant_collection.find_one({'_id': compound['variant']})
+            if compound_variants is None:
+                variant_obj = self.variant_collection.find_one({'_id': compound['variant']})
+            else:
+                variant_obj = compound_variants.get(compound['variant'])
             # If the variant exosts we try to collect as much info as possible
             if variant_obj:
                 not_loaded = False
@@ -344,42 +834,67 @@ class VariantHandler(object):
             compound_objs.append(compound)
         return compound_objs
 
-    def add_variant_rank(self, case_obj, variant_type='clinical', category='snv'):
+    def add_variant_rank(self, case_obj, variant_type='clinical', category='snv',
+                         batch_size=None):
         """Add the variant rank for all inserted variants.
 
+        The variants are ranked on rank score and the ranks are sent to the
+        database in unordered bulk writes of batch_size updates.
+
             Args:
                 case_obj(Case)
                 variant_type(str)
+                category(str)
+                batch_size(int): Number of updates sent in each bulk write
+
+            Returns:
+                nr_updated(int): Number of variants that got a rank
         """
+        batch_size = batch_size or BATCH_SIZE
         variants = self.variant_collection.find(
             {
                 'case_id': case_obj['_id'],
                 'category': category,
                 'variant_type': variant_type,
             },
-            {'_id':1}
+            {'_id': 1}
         ).sort('rank_score', pymongo.DESCENDING)
 
         logger.info("Updating variant_rank for all variants")
+        start_ranking = datetime.now()
+        requests = []
+        nr_updated = 0
         for index, variant in enumerate(variants):
-            self.variant_collection.find_one_and_update(
+            requests.append(UpdateOne(
                 {'_id': variant['_id']},
                 {'$set': {'variant_rank': index + 1}}
-            )
-        logger.info("Updating variant_rank done")
+            ))
+            if len(requests) >= batch_size:
+                self.variant_collection.bulk_write(requests, ordered=False)
+                nr_updated += len(requests)
+                requests = []
+
+        if requests:
+            self.variant_collection.bulk_write(requests, ordered=False)
+            nr_updated += len(requests)
+
+        logger.info("Updating variant_rank done. %s variants ranked in %s",
+                    nr_updated, datetime.now() - start_ranking)
+        return nr_updated
 
     def other_causatives(self, case_obj, variant_obj):
-        """Find the same variant in other cases marked causative."""
-        # variant id without "*_[variant_type]"
-        variant_id = variant_obj['display_name'].rsplit('_', 1)[0]
+        """Find the same variant in other cases marked causative.
 
-        institute_causatives = self.get_causatives(variant_obj['institute'])
-        for causative_id in institute_causatives:
-            other_variant = self.variant(causative_id)
-            not_same_case = other_variant['case_id'] != case_obj['_id']
-            same_variant = other_variant['display_name'].startswith(variant_id)
-            if not_same_case and same_variant:
-                yield other_variant
+        Returns:
+            causatives(pymongo.Cursor): Documents from the causative index,
+                                        see scout.adapter.mongo.causative
+        """
+        # variant id without "*_[variant_type]"
+        simple_id = variant_obj['display_name'].rsplit('_', 1)[0]
+        return self.institute_causatives(
+            variant_obj['institute'],
+            {'simple_id': simple_id, 'case_id': {'$ne': case_obj['_id']}},
+        )
 
     def delete_variants(self, case_id, variant_type, category=None):
         """Delete variants of one type for a case
@@ -397,6 +912,8 @@ class VariantHandler(object):
             query['category'] = category
         result = self.variant_collection.delete_many(query)
         logger.info("{0} variants deleted".format(result.deleted_count))
+        # A checkpoint of the deleted variants can not be resumed
+        self.delete_load_states(case_id, variant_type, category)
 
     def load_variant(self, variant_obj):
         """Load a variant object
@@ -408,15 +925,51 @@ class VariantHandler(object):
             inserted_id
         """
         logger.debug("Loading variant %s", variant_obj['_id'])
+        if 'bin' not in variant_obj:
+            variant_obj['bin'] = genomic_bin(variant_obj['position'],
+                                             variant_obj.get('end', variant_obj['position']))
         try:
             result = self.variant_collection.insert_one(variant_obj)
         except DuplicateKeyError as err:
             raise IntegrityError("Variant %s already exists in database", variant_obj['_id'])
         return result.inserted_id
 
+    def load_variant_bulk(self, variant_objs):
+        """Load a batch of variant objects with one unordered insert
+
+        Variants that already exists in the database are skipped, the same
+        way as IntegrityErrors are ignored when loading variants one by one.
+
+        Args:
+            variant_objs(list(dict))
+
+        Returns:
+            nr_inserted(int)
+        """
+        if not variant_objs:
+            return 0
+
+        start_batch = datetime.now()
+        try:
+            result = self.variant_collection.insert_many(variant_objs, ordered=False)
+            nr_inserted = len(result.inserted_ids)
+        except BulkWriteError as err:
+            for write_error in err.details.get('writeErrors', []):
+                if write_error.get('code') != DUPLICATE_KEY_ERROR:
+                    raise err
+            nr_inserted = err.details['nInserted']
+            logger.debug("%s variants already existed in database",
+                         len(variant_objs) - nr_inserted)
+
+        time_spent = datetime.now() - start_batch
+        seconds = time_spent.total_seconds()
+        logger.info("Inserted %s variants in %s (%s variants/s)", nr_inserted,
+                    time_spent, int(nr_inserted / seconds) if seconds else nr_inserted)
+        return nr_inserted
+
     def load_variants(self, case_obj, variant_type='clinical', category='snv',
                       rank_threshold=None, chrom=None, start=None, end=None,
-                      gene_obj=None):
+                      gene_obj=None, batch_size=None, workers=None, resume=False):
         """Load variants for a case into scout.
 
         Load the variants for a specific analysis type and category into scout.
@@ -424,6 +977,15 @@ class VariantHandler(object):
         If region or gene is specified, load all variants from that region
         disregarding variant rank(if not specified)
 
+        The variants are collected and inserted in batches of 'batch_size'.
+        With more than one worker a whole indexed vcf is split on the
+        sequences in the index and the shards are parsed in a pool of
+        processes.
+
+        The progress is stored in the load state collection after every
+        batch. If the load fails the inserted variants are kept and the load
+        can be resumed from the last checkpoint with resume.
+
         Args:
             case_obj(dict): A case from the scout database
             variant_type(str): 'clinical' or 'research'. Default: 'clinical'
@@ -433,13 +995,19 @@ class VariantHandler(object):
             start(int): Specify the start position
             end(int): Specify the end position
             gene_obj(dict): A gene object from the database
+            batch_size(int): Number of variants to insert at a time
+            workers(int): Number of processes that parse variants. Default: 1
+            resume(bool): Continue from the checkpoint of an earlier load of
+                          the same file and region
 
         Returns:
             nr_inserted(int)
         """
+        batch_size = batch_size or BATCH_SIZE
+        workers = workers or 1
         institute_obj = self.institute(institute_id=case_obj['owner'])
         gene_to_panels = self.gene_to_panels()
-        hgncid_to_gene = self.hgncid_to_gene()
+        hgncid_to_gene = self.gene_lookup()
 
         variant_file = None
         if variant_type == 'clinical':
@@ -496,124 +1064,345 @@ class VariantHandler(object):
         else:
             rank_threshold = rank_threshold or 0
 
+        build_args = {
+            'variant_file': variant_file,
+            'case_obj': case_obj,
+            'variant_type': variant_type,
+            'category': category,
+            'rank_threshold': rank_threshold,
+            'rank_results_header': rank_results_header,
+            'vep_header': vep_header,
+            'csq_columns': parse_csq_columns(vep_header),
+            'individual_positions': individual_positions,
+            'institute_id': institute_obj['_id'],
+            'gene_to_panels': gene_to_panels,
+            'hgncid_to_gene': hgncid_to_gene,
+            'sample_info': sample_info,
+        }
+
+        load_state = None
+        if resume:
+            load_state = self.load_state(case_obj['_id'], variant_type, category,
+                                         region)
+            if not load_state:
+                logger.info("No checkpoint found for %s %s variants, loading all "
+                            "variants", variant_type, category)
+            elif (load_state['variant_file'] != variant_file or
+                  load_state['region'] != region):
+                logger.warning("The checkpoint of %s %s variants is from another "
+                               "file or region, loading all variants",
+                               variant_type, category)
+                load_state = None
+            elif load_state['status'] == 'done':
+                logger.info("All %s %s variants are already loaded", variant_type,
+                            category)
+                return 0
+            else:
+                logger.info("Resuming load of %s %s variants after batch %s",
+                            variant_type, category, load_state['batch'])
+
+        # Number of records per sequence according to the index
+        index_records = {}
+        if not load_state:
+            shards = None
+            if workers > 1:
+                if region:
+                    logger.info("Variants from a region are parsed in one process")
+                elif not is_indexed(variant_file):
+                    logger.warning("Vcf file %s is not indexed, variants are parsed "
+                                   "in one process", variant_file)
+                else:
+                    index_records = dict(index_sequences(variant_file))
+                    shards = list(index_records) or None
+            load_state = self.save_load_state({
+                '_id': load_state_id(case_obj['_id'], variant_type, category, region),
+                'case_id': case_obj['_id'],
+                'variant_type': variant_type,
+                'category': category,
+                'variant_file': variant_file,
+                'region': region,
+                'shards': shards,
+                'shards_done': [],
+                'shard': None,
+                'nr_records': 0,
+                'chrom': None,
+                'position': None,
+                'batch': 0,
+                'nr_inserted': 0,
+                'status': 'running',
+            })
+        elif load_state['shards']:
+            index_records = dict(index_sequences(variant_file))
+
+        shards = [shard for shard in load_state['shards'] or []
+                  if shard not in load_state['shards_done']]
+        # Number of records left in the vcf according to the index
+        nr_records = None
+        if shards and all(index_records.get(shard) is not None for shard in shards):
+            nr_records = sum(index_records[shard] for shard in shards)
+            if load_state['shard'] in shards:
+                nr_records -= load_state['nr_records']
+
         logger.info("Start inserting variants into database")
         start_insertion = datetime.now()
-        start_five_thousand = datetime.now()
-        # These are the number of parsed varaints
-        nr_variants = 0
         # These are the number of variants that meet the criteria and gets
         # inserted
         nr_inserted = 0
-        # This is to keep track of the inserted variants
-        inserted = 1
 
         try:
-            for nr_variants, variant in enumerate(vcf_obj(region)):
-                mt_variant = 'MT' in variant.CHROM
-                rank_score = parse_rank_score(variant.INFO.get('RankScore'), case_obj['_id'])
-                if (rank_score is None) or (rank_score > rank_threshold) or mt_variant:
-                    # Parse the vcf variant
-                    parsed_variant = parse_variant(
-                        variant=variant,
-                        case=case_obj,
-                        variant_type=variant_type,
-                        rank_results_header=rank_results_header,
-                        vep_header=vep_header,
-                        individual_positions=individual_positions,
-                        category=category,
-                    )
-
-                    # Build the variant object
-                    variant_obj = build_variant(
-                        variant=parsed_variant,
-                        institute_id=institute_obj['_id'],
-                        gene_to_panels=gene_to_panels,
-                        hgncid_to_gene=hgncid_to_gene,
-                        sample_info=sample_info
-                    )
-                    try:
-                        self.load_variant(variant_obj)
-                        nr_inserted += 1
-                    except IntegrityError as error:
-                        pass
-
-                    if (nr_variants != 0 and nr_variants % 5000 == 0):
-                        logger.info("%s variants parsed", str(nr_variants))
-                        logger.info("Time to parse variants: %s",
-                                    (datetime.now() - start_five_thousand))
-                        start_five_thousand = datetime.now()
-
-                    if (nr_inserted != 0 and (nr_inserted * inserted) % (1000 * inserted) == 0):
-                        logger.info("%s variants inserted", nr_inserted)
-                        inserted += 1
-
+            if load_state['shards']:
+                nr_inserted = self._load_variant_shards(shards, build_args, workers,
+                                                        batch_size, load_state,
+                                                        nr_records)
+            else:
+                nr_inserted = self._load_variant_region(vcf_obj, region, build_args,
+                                                        batch_size, load_state)
         except Exception as error:
             logger.exception('unexpected error')
-            logger.warning("Deleting inserted variants")
-            self.delete_variants(case_obj['_id'], variant_type)
+            logger.warning("Loading %s %s variants stopped after batch %s, the "
+                           "inserted variants are kept and the load can be resumed",
+                           variant_type, category, load_state['batch'])
             raise error
 
+        logger.info("Time to insert variants: %s", datetime.now() - start_insertion)
         self.update_variants(case_obj, variant_type, category=category)
+        load_state['status'] = 'done'
+        self.save_load_state(load_state)
         logger.info("Nr variants inserted: %s", nr_inserted)
         return nr_inserted
 
-    def overlapping(self, variant_obj):
+    def _save_checkpoint(self, load_state, shard, variant_batch, nr_records,
+                         nr_inserted):
+        """Store the progress of a load after a batch has been inserted
+
+        Args:
+            load_state(dict)
+            shard(str): The shard or region the batch is from
+            variant_batch(list(dict)): The inserted variants
+            nr_records(int): Records of the shard that are handled
+            nr_inserted(int): Number of variants that were inserted
+        """
+        last_variant = variant_batch[-1]
+        load_state['shard'] = shard
+        load_state['nr_records'] = nr_records
+        load_state['chrom'] = last_variant['chromosome']
+        load_state['position'] = last_variant['position']
+        load_state['batch'] += 1
+        load_state['nr_inserted'] += nr_inserted
+        self.save_load_state(load_state)
+
+    def _load_variant_region(self, vcf_obj, region, build_args, batch_size,
+                             load_state):
+        """Parse, build and insert the variants from a region of a vcf
+
+        A checkpoint is stored after every batch, records before the
+        checkpoint of the load state are skipped.
+
+        Args:
+            vcf_obj(cyvcf2.VCF)
+            region(str): A region on the form chrom:start-end, '' means all
+            build_args(dict): See build_variant_objs
+            batch_size(int): Number of variants to insert at a time
+            load_state(dict)
+
+        Returns:
+            nr_inserted(int)
+        """
+        start_five_thousand = datetime.now()
+        nr_inserted = 0
+        # Variants that are waiting to be inserted
+        variant_batch = []
+        stats = new_load_stats()
+        nr_skipped = load_state['nr_records']
+        variants = skip_records(vcf_obj(region), load_state)
+        variant_objs = build_variant_objs(variants, build_args, stats)
+        for nr_variants, variant_obj in variant_objs:
+            variant_batch.append(variant_obj)
+            if len(variant_batch) >= batch_size:
+                nr_batch = self.load_variant_bulk(variant_batch)
+                self._save_checkpoint(load_state, region, variant_batch,
+                                      nr_skipped + nr_variants + 1, nr_batch)
+                nr_inserted += nr_batch
+                variant_batch = []
+
+            if (nr_variants != 0 and nr_variants % 5000 == 0):
+                logger.info("%s variants parsed", str(nr_variants))
+                logger.info("Time to parse variants: %s",
+                            (datetime.now() - start_five_thousand))
+                start_five_thousand = datetime.now()
+
+        if variant_batch:
+            nr_batch = self.load_variant_bulk(variant_batch)
+            self._save_checkpoint(load_state, region, variant_batch,
+                                  nr_skipped + nr_variants + 1, nr_batch)
+            nr_inserted += nr_batch
+        log_load_stats(stats)
+        return nr_inserted
+
+    def _load_variant_shards(self, shards, build_args, workers, batch_size,
+                             load_state, nr_records=None):
+        """Parse and build variants from vcf shards in a pool of processes
+
+        The workers hand back the variants in batches through one bounded
+        queue per shard, and the batches are inserted as they arrive. The
+        shards are read in the same order as they are given so the variants
+        are inserted in the same order as when parsed in one process, while
+        only a few batches per worker are held in memory at a time.
+
+        A checkpoint is stored after every batch and when a shard is done. The
+        shard of the checkpoint in the load state continues after it.
+
+        Args:
+            shards(list(str)): Regions that together cover the rest of the vcf
+            build_args(dict): See build_variant_objs
+            workers(int): Number of processes
+            batch_size(int): Number of variants to insert at a time
+            load_state(dict)
+            nr_records(int): Number of records left in the vcf, if known it is
+                             checked that all records were filtered
+
+        Returns:
+            nr_inserted(int)
+        """
+        logger.info("Parsing variants from %s shards with %s workers",
+                    len(shards), workers)
+        nr_inserted = 0
+        stats = new_load_stats()
+        with multiprocessing.Manager() as manager:
+            shard_queues = []
+            for shard in shards:
+                checkpoint = None
+                if shard == load_state['shard']:
+                    checkpoint = dict(load_state)
+                shard_queues.append((shard, manager.Queue(QUEUED_BATCHES), checkpoint))
+            with multiprocessing.Pool(workers, initializer=_init_shard_worker,
+                                      initargs=(build_args, batch_size)) as pool:
+                result = pool.map_async(_build_shard, shard_queues, chunksize=1)
+                for shard, batch_queue, _ in shard_queues:
+                    while True:
+                        try:
+                            message, content = batch_queue.get(timeout=1)
+                        except queue.Empty:
+                            if result.ready():
+                                # A worker stopped without reporting back
+                                result.get()
+                                raise VcfError("Shard {0} of the vcf was never "
+                                               "parsed".format(shard))
+                            continue
+                        if message == 'batch':
+                            variant_batch, nr_shard_records = content
+                            nr_batch = self.load_variant_bulk(variant_batch)
+                            self._save_checkpoint(load_state, shard, variant_batch,
+                                                  nr_shard_records, nr_batch)
+                            nr_inserted += nr_batch
+                        elif message == 'done':
+                            add_load_stats(stats, content)
+                            load_state['shards_done'].append(shard)
+                            load_state['shard'] = None
+                            load_state['nr_records'] = 0
+                            self.save_load_state(load_state)
+                            break
+                        else:
+                            logger.warning("Could not parse shard %s", shard)
+                            raise content
+
+        log_load_stats(stats)
+        nr_filtered = stats['accepted'] + stats['rejected']
+        if nr_records is not None and nr_filtered != nr_records:
+            raise VcfError("{0} variants were parsed but the vcf has {1} "
+                           "records".format(nr_filtered, nr_records))
+        return nr_inserted
+
+    def overlapping(self, variant_obj, limit=OVERLAPPING_LIMIT, after=None):
         """Return ovelapping variants.
 
         Look at the genes that a variant overlapps to get coordinates.
-        Then return all variants that overlap these coordinates.
+        Then return the variants that overlap these coordinates. The
+        variants are looked up on their bin, see genomic_bin.
+
+        A variant that is not in any known gene uses its own coordinates,
+        not the whole chromosome.
 
         If variant_obj is sv it will return the overlapping snvs and oposite
 
         Args:
             variant_obj(dict)
+            limit(int): Maximum number of variants to return
+            after(tuple): From variant_keyset on rank_score, only return the
+                          variants after this one
 
         Returns:
-            variants(iterable(dict))
+            variants(pymongo.Cursor): Sorted on rank score
         """
         category = 'snv' if variant_obj['category'] == 'sv' else 'sv'
 
-        region_start = None
-        region_end = None
-        chromosome = variant_obj['chromosome']
-
-        for gene_id in variant_obj['hgnc_ids']:
-            gene_obj = self.hgnc_gene(gene_id)
-            if gene_obj:
-                gene_start = gene_obj['start']
-                gene_end = gene_obj['end']
-                if not region_start:
-                    region_start = gene_start
-                else:
-                    if gene_start < region_start:
-                        region_start = gene_start
-                if not region_end:
-                    region_end = gene_end
-                else:
-                    if gene_end > region_end:
-                        region_end = gene_end
-
-        query = self.build_query(
-            case_id=variant_obj['case_id'],
-            query={
-                'variant_type': variant_obj['variant_type'],
-                'chrom': chromosome,
-                'start': region_start,
-                'end': region_end,
-            },
-            category=category
-        )
+        genes = [gene_obj for gene_obj in
+                 self.hgnc_genes_by_id(variant_obj.get('hgnc_ids', [])).values()
+                 if gene_obj]
+        if genes:
+            region_start = min(gene_obj['start'] for gene_obj in genes)
+            region_end = max(gene_obj['end'] for gene_obj in genes)
+        else:
+            # Use the coordinates of the variant if it is not in any gene
+            region_start = variant_obj['position']
+            region_end = variant_obj.get('end', region_start)
 
-        sort_key = [('rank_score', pymongo.DESCENDING)]
-        variants = self.variant_collection.find(query).sort(sort_key)
+        query = {
+            'case_id': variant_obj['case_id'],
+            'category': category,
+            'variant_type': variant_obj['variant_type'],
+            'chromosome': variant_obj['chromosome'],
+            'bin': {'$in': overlapping_bins(region_start, region_end)},
+            'position': {'$lte': region_end},
+            'end': {'$gte': region_start},
+        }
+
+        sorting = VARIANT_SORTING['rank_score']
+        if after:
+            query = {'$and': [query, keyset_query(sorting, after)]}
+        query, hint = self.plan_query(query, sorting)
+        variants = self.variant_collection.find(query).sort(sorting).limit(limit)
+        if hint:
+            variants = variants.hint(hint)
+        self.log_query_plan(variants)
 
         return variants
 
+    def add_variant_bins(self, case_id):
+        """Add the bin to variants that were loaded without one
+
+            Args:
+                case_id(str)
+
+            Returns:
+                nr_updated(int)
+        """
+        variants = self.variant_collection.find(
+            {'case_id': case_id, 'bin': {'$exists': False}},
+            {'position': 1, 'end': 1}
+        )
+        nr_updated = 0
+        requests = []
+        for variant in variants:
+            bin_nr = genomic_bin(variant['position'], variant.get('end', variant['position']))
+            requests.append(UpdateOne({'_id': variant['_id']}, {'$set': {'bin': bin_nr}}))
+            if len(requests) >= BATCH_SIZE:
+                nr_updated += self.variant_collection.bulk_write(
+                    requests, ordered=False).modified_count
+                requests = []
+        if requests:
+            nr_updated += self.variant_collection.bulk_write(
+                requests, ordered=False).modified_count
+        logger.info("Added bins to %s variants", nr_updated)
+        return nr_updated
+
     def get_region_vcf(self, case_obj, chrom=None, start=None, end=None,
                        gene_obj=None, variant_type='clinical', category='snv',
                        rank_threshold=None):
         """Produce a reduced vcf with variants from the specified coordinates
 
+        The variants are read with the tabix index of the vcf, see region_vcf.
+
         Args:
             case_obj(dict): A case from the scout database
             variant_type(str): 'clinical' or 'research'. Default: 'clinical'
@@ -625,26 +1414,14 @@ class VariantHandler(object):
             gene_obj(dict): A gene object from the database
 
         Returns:
-            file_name(str): Path to the temporary file
+            region_vcf(str): The header and the variants of the region
         """
         rank_threshold = rank_threshold or -100
 
-        variant_file = None
-        if variant_type == 'clinical':
-            if category == 'snv':
-                variant_file = case_obj['vcf_files'].get('vcf_snv')
-            elif category == 'sv':
-                variant_file = case_obj['vcf_files'].get('vcf_sv')
-        elif variant_type == 'research':
-            if category == 'snv':
-                variant_file = case_obj['vcf_files'].get('vcf_snv_research')
-            elif category == 'sv':
-                variant_file = case_obj['vcf_files'].get('vcf_sv_research')
-
+        variant_file = case_variant_file(case_obj, variant_type, category)
         if not variant_file:
             raise SyntaxError("Vcf file does not seem to exist")
 
-        vcf_obj = VCF(variant_file)
         region = ""
 
         if gene_obj:
@@ -661,12 +1438,6 @@ class VariantHandler(object):
         else:
             rank_threshold = rank_threshold or 5
 
-        with tempfile.NamedTemporaryFile(mode='w', delete=False) as temp:
-            file_name = pathlib.Path(temp.name)
-            for header_line in vcf_obj.raw_header.split('\n'):
-                if len(header_line) > 3:
-                    temp.write(header_line + '\n')
-            for variant in vcf_obj(region):
-                temp.write(str(variant))
-
-        return file_name
+        if region and not is_indexed(variant_file):
+            raise SyntaxError("Vcf file {0} is not indexed".format(variant_file))
+        return region_vcf(variant_file, region)
@@ -45,7 +45,6 @@ def build_gene(gene, gene_to_panels=None, hgncid_to_gene=None):
     hgnc_gene = hgncid_to_gene.get(hgnc_id)
     
     inheritance = set()
-    hgnc_transcripts = []
     if hgnc_gene:
         gene_obj['hgnc_symbol'] = hgnc_gene['hgnc_symbol']
         gene_obj['ensembl_id'] = hgnc_gene['ensembl_id']
@@ -63,7 +62,6 @@ def build_gene(gene, gene_to_panels=None, hgncid_to_gene=None):
             inheritance.add('X')
         if hgnc_gene.get('y'):
             inheritance.add('Y')
-        hgnc_transcripts = hgnc_gene['transcripts']
     
     gene_obj['inheritance'] = list(inheritance)
     
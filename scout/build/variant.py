@@ -3,6 +3,9 @@ import logging
 
 from . import (build_genotype, build_compound, build_gene, build_clnsig)
 
+from scout.constants import MAX_GENE_INDEX
+from scout.utils.coordinates import genomic_bin
+
 log = logging.getLogger(__name__)
 
 def build_variant(variant, institute_id, gene_to_panels = None, 
@@ -57,6 +60,7 @@ def build_variant(variant, institute_id, gene_to_panels = None,
             chromosome = str, # required
             position = int, # required
             end = int, # required
+            bin = int, # UCSC bin of position to end, for overlap queries
             length = int, # required
             reference = str, # required
             alternative = str, # required
@@ -145,6 +149,8 @@ def build_variant(variant, institute_id, gene_to_panels = None,
     end = variant.get('end')
     if end:
         variant_obj['end'] = int(end)
+    variant_obj['bin'] = genomic_bin(variant_obj['position'],
+                                     variant_obj.get('end', variant_obj['position']))
 
     length = variant.get('length')
     if length:
@@ -213,7 +219,7 @@ def build_variant(variant, institute_id, gene_to_panels = None,
         if gene.get('hgnc_id'):
             gene_obj = build_gene(gene, gene_to_panels, hgncid_to_gene)
             genes.append(gene_obj)
-            if index > 30:
+            if index > MAX_GENE_INDEX:
                 # avoid uploading too much data (specifically for SV variants)
                 # mark variant as missing data
                 variant_obj['missing_data'] = True
@@ -16,3 +16,5 @@ def index(context):
     adapter = context.obj['adapter']
     
     adapter.load_indexes()
+    # The causatives are kept in a collection of their own
+    adapter.index_causatives()
@@ -7,6 +7,7 @@ import click
 import yaml
 
 from scout.load import load_scout
+from scout.adapter.mongo.variant import BATCH_SIZE
 from scout.parse.case import (parse_case_data)
 from scout.exceptions import IntegrityError, ConfigError
 
@@ -30,9 +31,16 @@ log = logging.getLogger(__name__)
               help='path to a sex_check.csv file')
 @click.option('--peddy-check', type=click.Path(exists=True),
               help='path to a ped_check.csv file')
+@click.option('--batch-size', type=int, default=BATCH_SIZE, show_default=True,
+              help='number of variants to insert at a time')
+@click.option('-w', '--workers', type=int, default=1, show_default=True,
+              help='number of processes that parse variants')
+@click.option('--resume', is_flag=True,
+              help='continue variant loads from the last checkpoint')
 @click.pass_context
 def case(context, vcf, vcf_sv, vcf_cancer, owner, ped, update, config,
-         no_variants, peddy_ped, peddy_sex, peddy_check):
+         no_variants, peddy_ped, peddy_sex, peddy_check, batch_size, workers,
+         resume):
     """Load a case into the database.
 
     A case can be loaded without specifying vcf files and/or bam files
@@ -65,7 +73,8 @@ def case(context, vcf, vcf_sv, vcf_cancer, owner, ped, update, config,
     log.info("Use family %s" % config_data['family'])
 
     try:
-        case_obj = adapter.load_case(config_data, update)
+        case_obj = adapter.load_case(config_data, update, batch_size=batch_size,
+                                    workers=workers, resume=resume)
     except IntegrityError as err:
         log.warning(err)
         context.abort()
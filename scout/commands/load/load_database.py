@@ -24,6 +24,7 @@ from .disease import diseases as disease_command
 from .variants import variants as variants_command
 
 from scout.load.all import load_region
+from scout.adapter.mongo.variant import BATCH_SIZE
 
 LOG = logging.getLogger(__name__)
 
@@ -34,12 +35,15 @@ LOG = logging.getLogger(__name__)
 @click.option('-c', '--chromosome')
 @click.option('-s', '--start', type=int)
 @click.option('-e', '--end', type=int)
+@click.option('--batch-size', type=int, default=BATCH_SIZE, show_default=True,
+              help='Number of variants to insert at a time')
 @click.pass_context
-def region(context, hgnc_id, case_id, chromosome, start, end):
+def region(context, hgnc_id, case_id, chromosome, start, end, batch_size):
     """Load all variants in a region to a existing case"""
     adapter = context.obj['adapter']
     load_region(
-        adapter=adapter, case_id=case_id, hgnc_id=hgnc_id, chrom=chromosome, start=start, end=end
+        adapter=adapter, case_id=case_id, hgnc_id=hgnc_id, chrom=chromosome, start=start, end=end,
+        batch_size=batch_size
     )
 
 
@@ -3,6 +3,8 @@ from pprint import pprint as pp
 
 import click
 
+from scout.adapter.mongo.variant import BATCH_SIZE
+
 log = logging.getLogger(__name__)
 
 @click.command(short_help='Upload variants to existing case')
@@ -22,10 +24,14 @@ log = logging.getLogger(__name__)
 @click.option('--hgnc-symbol', help='If all variants from a gene, specify the gene symbol')
 @click.option('--rank-treshold', default=5, help='Specify the rank score treshold',
                 show_default=True)
+@click.option('--batch-size', type=int, default=BATCH_SIZE, show_default=True,
+              help='Number of variants to insert at a time')
+@click.option('-w', '--workers', type=int, default=1, show_default=True,
+              help='Number of processes that parse variants')
 @click.pass_context
 def variants(context, case_id, institute, force, cancer, cancer_research, sv, 
              sv_research, snv, snv_research, chrom, start, end, hgnc_id, 
-             hgnc_symbol, rank_treshold):
+             hgnc_symbol, rank_treshold, batch_size, workers):
     """Upload variants to a case
 
         Note that the files has to be linked with the case, 
@@ -93,7 +99,9 @@ def variants(context, case_id, institute, force, cancer, cancer_research, sv,
                     chrom=chrom, 
                     start=start, 
                     end=end,
-                    gene_obj=gene_obj
+                    gene_obj=gene_obj,
+                    batch_size=batch_size,
+                    workers=workers,
                 )
             except Exception as e:
                 log.warning(e)
@@ -5,7 +5,8 @@ import logging
 import datetime
 import yaml
 
-import pymongo
+from contextlib import contextmanager
+
 import click
 
 from pprint import pprint as pp
@@ -44,12 +45,90 @@ from scout.parse.panel import parse_gene_panel
 from scout.build import (build_institute, build_case, build_panel, build_variant)
 
 from scout.load import (load_hgnc_genes, load_hpo, load_scout)
+from scout.load.hpo import parse_hpo_tables
 
 from scout.utils.handle import get_file_handle
-from scout.utils.link import link_genes
+from scout.utils.link import (read_reference_genes, link_builds)
+from scout.utils.resource_cache import cached_resource
 
 log = logging.getLogger(__name__)
 
+# The files in context.obj that the genes are parsed from in all builds
+GENE_RESOURCES = ('hgnc', 'exac', 'mim2gene', 'genemap2', 'hpogenes')
+
+# The files in context.obj that the hpo and disease terms are parsed from
+HPO_RESOURCES = ('hpo_terms', 'disease_terms', 'hpodiseases')
+
+
+@contextmanager
+def setup_stage(name, timings):
+    """Log the time spent in a stage of the setup
+
+    Args:
+        name(str)
+        timings(list): (<name>, <time spent>) is appended when the stage is done
+    """
+    log.info("%s", name)
+    start_time = datetime.datetime.now()
+    yield
+    time_spent = datetime.datetime.now() - start_time
+    log.info("%s done in %s", name, time_spent)
+    timings.append((name, time_spent))
+
+
+def linked_genes(context, builds, timings):
+    """Return the genes with the transcripts of each build
+
+    The genes are parsed from the same files for all builds, only the
+    transcripts differ. The result is kept in the resource cache, so the files
+    are only parsed again when they have changed.
+
+    Args:
+        context(click.Context)
+        builds(list(str))
+        timings(list): See setup_stage
+
+    Returns:
+        build_genes(dict): {<build>: <genes>}
+    """
+    gene_paths = [context.obj[resource] for resource in GENE_RESOURCES]
+    transcript_paths = {build: context.obj['transcripts' + build] for build in builds}
+
+    def build_genes():
+        with setup_stage("Parse reference genes", timings):
+            genes = read_reference_genes(*gene_paths)
+        with setup_stage("Link transcripts", timings):
+            return link_builds(genes, transcript_paths)
+
+    with setup_stage("Reference genes", timings):
+        return cached_resource(
+            'genes_' + '_'.join(builds),
+            gene_paths + [transcript_paths[build] for build in builds],
+            build_genes,
+        )
+
+
+def parsed_hpo_tables(context, timings):
+    """Return the parsed hpo terms, omim phenotypes and hpo diseases
+
+    Like the genes the result is kept in the resource cache.
+
+    Args:
+        context(click.Context)
+        timings(list): See setup_stage
+
+    Returns:
+        hpo_tables(dict): See parse_hpo_tables
+    """
+    hpo_paths = [context.obj[resource] for resource in HPO_RESOURCES]
+
+    def build_hpo_tables():
+        with setup_stage("Parse hpo and disease terms", timings):
+            return parse_hpo_tables(*[get_file_handle(path) for path in hpo_paths])
+
+    return cached_resource('hpo', hpo_paths, build_hpo_tables)
+
+
 @click.command('database', short_help='Setup a basic scout instance')
 @click.option('-i', '--institute-name', type=str)
 @click.option('-u', '--user-name', type=str)
@@ -64,6 +143,8 @@ def database(context, institute_name, user_name, user_mail):
     user_mail = user_mail or context.obj['user_mail']
 
     adapter = context.obj['adapter']
+    start_time = datetime.datetime.now()
+    timings = []
 
     log.info("Setting up database %s", context.obj['mongodb'])
     log.info("Deleting previous database")
@@ -94,62 +175,28 @@ def database(context, institute_name, user_name, user_mail):
 
     adapter.add_user(user_obj)
 
-    # Load the genes and transcripts
-    hgnc_handle = context.obj['hgnc']
-    transcripts37_handle = context.obj['transcripts37']
-    transcripts38_handle = context.obj['transcripts38']
-    exac_handle = context.obj['exac']
-    hpo_genes_handle = context.obj['hpogenes']
-
-    mim2gene_handle = context.obj['mim2gene']
-    genemap_handle = context.obj['genemap2']
-
-    genes37 = link_genes(
-        ensembl_lines=transcripts37_handle,
-        hgnc_lines=hgnc_handle,
-        exac_lines=exac_handle,
-        mim2gene_lines=mim2gene_handle,
-        genemap_lines=genemap_handle,
-        hpo_lines=hpo_genes_handle,
-    )
-
-    load_hgnc_genes(adapter, genes37, build='37')
-
-    genes38 = link_genes(
-        ensembl_lines=transcripts38_handle,
-        hgnc_lines=context.obj['hgnc38'],
-        exac_lines=context.obj['exac38'],
-        mim2gene_lines=context.obj['mim2gene38'],
-        genemap_lines=context.obj['genemap2_38'],
-        hpo_lines=context.obj['hpogenes_38'],
-    )
-
-    load_hgnc_genes(adapter, genes38, build='38')
-
-    hpo_terms_handle = context.obj['hpo_terms']
-    disease_handle = context.obj['disease_terms']
-    hpo_disease_handle = context.obj['hpodiseases']
-
-    load_hpo(
-        adapter=adapter,
-        hpo_lines=hpo_terms_handle,
-        disease_lines=disease_handle,
-        hpo_disease_lines=hpo_disease_handle
-    )
-
-    log.info("Creating indexes")
-
-    adapter.hgnc_collection.create_index([('build', pymongo.ASCENDING),
-                                          ('chromosome', pymongo.ASCENDING)])
-
-    adapter.variant_collection.create_index([('case_id', pymongo.ASCENDING),
-                                          ('rank_score', pymongo.DESCENDING)])
-
-    adapter.variant_collection.create_index([('case_id', pymongo.ASCENDING),
-                                          ('variant_rank', pymongo.ASCENDING)])
-
-    log.info("hgnc gene index created")
-
+    build_genes = linked_genes(context, ['37', '38'], timings)
+    for build in ('37', '38'):
+        with setup_stage("Load genes build {0}".format(build), timings):
+            load_hgnc_genes(adapter, build_genes.pop(build), build=build)
+
+    with setup_stage("Load hpo and disease terms", timings):
+        load_hpo(
+            adapter=adapter,
+            hpo_lines=None,
+            disease_lines=None,
+            hpo_disease_lines=None,
+            hpo_tables=parsed_hpo_tables(context, timings)
+        )
+
+    # The indexes are created after the bulk load of the reference data,
+    # inserting into indexed collections is slower
+    with setup_stage("Create indexes", timings):
+        adapter.load_indexes()
+
+    for stage, time_spent in timings:
+        log.info("%s: %s", stage, time_spent)
+    log.info("Total time: %s", datetime.datetime.now() - start_time)
     log.info("Scout instance setup successful")
 
 @click.command('demo', short_help='Setup a scout demo instance')
@@ -194,36 +241,22 @@ def demo(context):
     adapter.add_user(user_obj)
 
     # Load the genes and transcripts
-    hgnc_handle = context.obj['hgnc']
-    transcripts37_handle = context.obj['transcripts37']
-    # transcripts38_handle = context.obj['transcripts38']
-    exac_handle = context.obj['exac']
-    hpo_genes_handle = context.obj['hpogenes']
-    mim2gene_handle = context.obj['mim2gene']
-    genemap_handle = context.obj['genemap2']
-
-    genes37 = link_genes(
-        ensembl_lines=transcripts37_handle,
-        hgnc_lines=hgnc_handle,
-        exac_lines=exac_handle,
-        mim2gene_lines=mim2gene_handle,
-        genemap_lines=genemap_handle,
-        hpo_lines=hpo_genes_handle,
-    )
+    build_genes = linked_genes(context, ['37'], timings=[])
 
-    load_hgnc_genes(adapter, genes37, build='37')
-
-    hpo_terms_handle = context.obj['hpo_terms']
-    disease_handle = context.obj['disease_terms']
-    hpo_disease_handle = context.obj['hpodiseases']
+    load_hgnc_genes(adapter, build_genes['37'], build='37')
 
     load_hpo(
         adapter=adapter,
-        hpo_lines=hpo_terms_handle,
-        disease_lines=disease_handle,
-        hpo_disease_lines=hpo_disease_handle
+        hpo_lines=None,
+        disease_lines=None,
+        hpo_disease_lines=None,
+        hpo_tables=parsed_hpo_tables(context, timings=[])
     )
 
+    log.info("Creating indexes")
+    adapter.load_indexes()
+    log.info("Indexes created")
+
     adapter.load_panel(
         path=panel_path, 
         institute='cust000', 
@@ -239,19 +272,6 @@ def demo(context):
     
     adapter.load_case(case_data)
 
-    log.info("Creating indexes")
-
-    adapter.hgnc_collection.create_index([('build', pymongo.ASCENDING),
-                                          ('chromosome', pymongo.ASCENDING)])
-
-    adapter.variant_collection.create_index([('case_id', pymongo.ASCENDING),
-                                          ('rank_score', pymongo.DESCENDING)])
-
-    adapter.variant_collection.create_index([('case_id', pymongo.ASCENDING),
-                                          ('variant_rank', pymongo.ASCENDING)])
-    
-    log.info("hgnc gene index created")
-
     log.info("Scout demo instance setup successful")
 
 
@@ -266,31 +286,28 @@ def setup(context):
     context.obj['user_name'] = 'Clark Kent'
     context.obj['user_mail'] = 'clark.kent@mail.com'
 
+    # The gene, transcript and hpo files are given as paths, the parsed
+    # results are kept in the resource cache
     if context.invoked_subcommand == 'demo':
         log.info("Loading hgnc genes from %s", hgnc_reduced_path)
-        hgnc = get_file_handle(hgnc_reduced_path)
-        hgnc38 = get_file_handle(hgnc_reduced_path)
+        hgnc = hgnc_reduced_path
         log.info("Loading exac genes from %s", exac_reduced_path)
-        exac = get_file_handle(exac_reduced_path)
-        exac38 = get_file_handle(exac_reduced_path)
+        exac = exac_reduced_path
         log.info("Loading mim2gene info from %s", mim2gene_reduced_path)
-        mim2gene = get_file_handle(mim2gene_reduced_path)
-        mim2gene38 = get_file_handle(mim2gene_reduced_path)
+        mim2gene = mim2gene_reduced_path
         log.info("Loading genemap info from %s", genemap2_reduced_path)
-        genemap = get_file_handle(genemap2_reduced_path)
-        genemap38 = get_file_handle(genemap2_reduced_path)
+        genemap = genemap2_reduced_path
         log.info("Loading hpo gene info from %s", hpogenes_reduced_path)
-        hpogenes = get_file_handle(hpogenes_reduced_path)
-        hpogenes38 = get_file_handle(hpogenes_reduced_path)
+        hpogenes = hpogenes_reduced_path
         log.info("Loading hpo disease info from %s", hpo_phenotype_to_terms_reduced_path)
-        hpodiseases = get_file_handle(hpo_phenotype_to_terms_reduced_path)
+        hpodiseases = hpo_phenotype_to_terms_reduced_path
         log.info("Loading hpo terms from %s", hpoterms_reduced_path)
-        hpoterms = get_file_handle(hpoterms_reduced_path)
+        hpoterms = hpoterms_reduced_path
         log.info("Loading omim disease info from %s", genemap2_reduced_path)
-        diseaseterms = get_file_handle(genemap2_reduced_path)
+        diseaseterms = genemap2_reduced_path
         log.info("Loading transcripts build 37 info from %s", transcripts37_reduced_path)
-        transcripts37 = get_file_handle(transcripts37_reduced_path)
-        transcripts38 = get_file_handle(transcripts38_reduced_path)
+        transcripts37 = transcripts37_reduced_path
+        transcripts38 = transcripts38_reduced_path
         # Update context.obj settings here
         log.info("Change database name to scout-demo")
         context.obj['mongodb'] = 'scout-demo'
@@ -299,40 +316,30 @@ def setup(context):
 
     else:
         log.info("Loading hgnc genes from %s", hgnc_reduced_path)
-        hgnc = get_file_handle(hgnc_path)
-        hgnc38 = get_file_handle(hgnc_path)
+        hgnc = hgnc_path
         log.info("Loading exac genes from %s", exac_reduced_path)
-        exac = get_file_handle(exac_path)
-        exac38 = get_file_handle(exac_path)
+        exac = exac_path
         log.info("Loading mim2gene info from %s", mim2gene_reduced_path)
-        mim2gene = get_file_handle(mim2gene_path)
-        mim2gene38 = get_file_handle(mim2gene_path)
+        mim2gene = mim2gene_path
         log.info("Loading genemap info from %s", genemap2_reduced_path)
-        genemap = get_file_handle(genemap2_path)
-        genemap38 = get_file_handle(genemap2_path)
+        genemap = genemap2_path
         log.info("Loading hpo gene info from %s", hpogenes_reduced_path)
-        hpogenes = get_file_handle(hpogenes_path)
-        hpogenes38 = get_file_handle(hpogenes_path)
+        hpogenes = hpogenes_path
         log.info("Loading hpo disease info from %s", hpo_phenotype_to_terms_reduced_path)
-        hpodiseases = get_file_handle(hpo_phenotype_to_terms_path)
+        hpodiseases = hpo_phenotype_to_terms_path
         log.info("Loading hpo terms from %s", hpoterms_reduced_path)
-        hpoterms = get_file_handle(hpoterms_path)
+        hpoterms = hpoterms_path
         log.info("Loading omim disease info from %s", genemap2_reduced_path)
-        diseaseterms = get_file_handle(genemap2_path)
+        diseaseterms = genemap2_path
         log.info("Loading transcripts build 37 info from %s", transcripts37_reduced_path)
-        transcripts37 = get_file_handle(transcripts37_path)
-        transcripts38 = get_file_handle(transcripts38_path)
+        transcripts37 = transcripts37_path
+        transcripts38 = transcripts38_path
 
     context.obj['hgnc'] = hgnc
-    context.obj['hgnc38'] = hgnc38
     context.obj['exac'] = exac
-    context.obj['exac38'] = exac38
     context.obj['mim2gene'] = mim2gene
-    context.obj['mim2gene38'] = mim2gene38
     context.obj['genemap2'] = genemap
-    context.obj['genemap2_38'] = genemap38
     context.obj['hpogenes'] = hpogenes
-    context.obj['hpogenes_38'] = hpogenes38
     context.obj['hpodiseases'] = hpodiseases
     context.obj['hpo_terms'] = hpoterms
     context.obj['disease_terms'] = diseaseterms
@@ -29,9 +29,16 @@ log = logging.getLogger(__name__)
               help='path to research VCF with cancer variants to be added')
 @click.option('--peddy-ped', type=click.Path(exists=True),
               help='path to outfile .peddy.ped from peddy')
+@click.option('--resume', is_flag=True,
+              help='continue unfinished variant loads from the last checkpoint')
+@click.option('--compounds', is_flag=True,
+              help='add rank score and genes of compounds to all variants')
+@click.option('--bins', is_flag=True,
+              help='add the bins used for overlapping variants to all variants')
 @click.pass_context
 def case(context, case_id, case_name, institute, add_collaborator, vcf, vcf_sv,
-         vcf_cancer, vcf_research, vcf_sv_research, vcf_cancer_research, peddy_ped):
+         vcf_cancer, vcf_research, vcf_sv_research, vcf_cancer_research, peddy_ped,
+         resume, compounds, bins):
     """
     Update a case in the database
     """
@@ -76,3 +83,27 @@ def case(context, case_id, case_name, institute, add_collaborator, vcf, vcf_sv,
         case_obj['vcf_files']['vcf_cancer_research'] = vcf_cancer_research
 
     adapter.update_case(case_obj)
+
+    if resume:
+        for load_state in list(adapter.load_states(case_id, status='running')):
+            if load_state['region']:
+                log.info("Skipping load of region %s, load the region again",
+                         load_state['region'])
+                continue
+            log.info("Resuming load of %s %s variants", load_state['variant_type'],
+                     load_state['category'])
+            adapter.load_variants(
+                case_obj=case_obj,
+                variant_type=load_state['variant_type'],
+                category=load_state['category'],
+                rank_threshold=case_obj.get('rank_score_threshold', 0),
+                resume=True,
+            )
+
+    if compounds:
+        for variant_type in ('clinical', 'research'):
+            for category in ('snv', 'sv', 'cancer'):
+                adapter.add_compound_info(case_obj, variant_type, category=category)
+
+    if bins:
+        adapter.add_variant_bins(case_obj['_id'])
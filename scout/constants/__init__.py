@@ -4,25 +4,18 @@ from collections import OrderedDict
 
 from intervaltree import (IntervalTree, Interval)
 
-from scout.parse.cytoband import parse_cytoband
-from scout.resources import cytobands_path
-from scout.utils.handle import get_file_handle
-
 from .indexes import INDEXES
 
 from .acmg import (ACMG_COMPLETE_MAP, ACMG_OPTIONS, ACMG_CRITERIA, ACMG_MAP, REV_ACMG_MAP)
 from .so_terms import (SO_TERMS, SO_TERM_KEYS, SEVERE_SO_TERMS)
 from .variant_tags import (CONSEQUENCE, CONSERVATION, FEATURE_TYPES, SV_TYPES,
-                           GENETIC_MODELS, VARIANT_CALL, MANUAL_RANK_OPTIONS)
+                           GENETIC_MODELS, VARIANT_CALL, MANUAL_RANK_OPTIONS,
+                           MAX_GENE_INDEX)
 from .case_tags import (ANALYSIS_TYPES, SEX_MAP, REV_SEX_MAP, PHENOTYPE_MAP,
                         REV_PHENOTYPE_MAP, CASE_STATUSES)
 from .clnsig import (CLINSIG_MAP, REV_CLINSIG_MAP)
 from .phenotype import (PHENOTYPE_GROUPS, COHORT_TAGS)
 
-cytobands_handle = get_file_handle(cytobands_path)
-
-CYTOBANDS = parse_cytoband(cytobands_handle)
-
 CHROMOSOMES = ('1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12',
                '13', '14', '15', '16', '17', '18', '19', '20', '21', '22', 'X',
                'Y', 'MT')
@@ -24,12 +24,16 @@ INDEXES = {
             ('case_id', ASCENDING),
             ('variant_rank', ASCENDING)],
             name="caseid_variantrank"),
+        # Replaces caseid_category_varianttype_rankscore, which had no _id to
+        # break ties for the pages. 'scout index' creates this one and leaves
+        # the old index, which can be dropped by hand.
         IndexModel([
             ('case_id', ASCENDING),
             ('category', ASCENDING),
             ('variant_type', ASCENDING),
-            ('rank_score', DESCENDING)],
-            name="caseid_category_varianttype_rankscore"),
+            ('rank_score', DESCENDING),
+            ('_id', ASCENDING)],
+            name="caseid_category_varianttype_rankscore_id"),
         IndexModel([
             ('case_id', ASCENDING),
             ('variant_id', ASCENDING)],
@@ -40,6 +44,61 @@ INDEXES = {
             ('variant_rank', ASCENDING),
             ('panels', ASCENDING),
             ('thousand_genomes_frequency', ASCENDING)],
-            name="caseid_varianttype_variantrank_panels_thousandg")
+            name="caseid_varianttype_variantrank_panels_thousandg"),
+        # The indexes below match the filters in FiltersForm and
+        # SvFiltersForm. Variants are always queried on case, category and
+        # variant type and sorted on variant rank, with _id as tie breaker
+        # for the pages.
+        IndexModel([
+            ('case_id', ASCENDING),
+            ('category', ASCENDING),
+            ('variant_type', ASCENDING),
+            ('variant_rank', ASCENDING),
+            ('_id', ASCENDING)],
+            name="caseid_category_varianttype_variantrank"),
+        IndexModel([
+            ('case_id', ASCENDING),
+            ('category', ASCENDING),
+            ('variant_type', ASCENDING),
+            ('panels', ASCENDING),
+            ('variant_rank', ASCENDING),
+            ('_id', ASCENDING)],
+            name="caseid_category_varianttype_panels_variantrank"),
+        IndexModel([
+            ('case_id', ASCENDING),
+            ('category', ASCENDING),
+            ('variant_type', ASCENDING),
+            ('hgnc_symbols', ASCENDING),
+            ('variant_rank', ASCENDING),
+            ('_id', ASCENDING)],
+            name="caseid_category_varianttype_hgncsymbols_variantrank"),
+        IndexModel([
+            ('case_id', ASCENDING),
+            ('category', ASCENDING),
+            ('variant_type', ASCENDING),
+            ('chromosome', ASCENDING),
+            ('position', ASCENDING)],
+            name="caseid_category_varianttype_chromosome_position"),
+        # For overlapping variants, see scout.utils.coordinates.genomic_bin
+        IndexModel([
+            ('case_id', ASCENDING),
+            ('category', ASCENDING),
+            ('variant_type', ASCENDING),
+            ('chromosome', ASCENDING),
+            ('bin', ASCENDING)],
+            name="caseid_category_varianttype_chromosome_bin"),
+    ],
+    'causative_collection': [
+        IndexModel([
+            ('institutes', ASCENDING),
+            ('variant_id', ASCENDING)],
+            name="institutes_variantid"),
+        IndexModel([
+            ('institutes', ASCENDING),
+            ('simple_id', ASCENDING)],
+            name="institutes_simpleid"),
+        IndexModel([
+            ('case_id', ASCENDING)],
+            name="caseid"),
     ],
 }
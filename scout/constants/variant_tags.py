@@ -97,3 +97,7 @@ MANUAL_RANK_OPTIONS = {
         'description': 'Phenotype not related to disease',
     },
 }
+
+# Genes after this position are not stored on a variant, the variant is
+# marked as missing data instead
+MAX_GENE_INDEX = 30
@@ -30,7 +30,8 @@ def check_panels(adapter, panels, default_panels=None):
     return panels_exist
 
 
-def load_region(adapter, case_id, hgnc_id=None, chrom=None, start=None, end=None):
+def load_region(adapter, case_id, hgnc_id=None, chrom=None, start=None, end=None,
+                batch_size=None):
     """Load all variants in a region defined by a HGNC id
 
     Args:
@@ -40,6 +41,7 @@ def load_region(adapter, case_id, hgnc_id=None, chrom=None, start=None, end=None
         chrom (str): If variants from coordinates should be uploaded
         start (int): Start position for region
         end (int): Stop position for region
+        batch_size (int): Number of variants to insert at a time
     """
     if hgnc_id:
         gene_obj = adapter.hgnc_gene(hgnc_id)
@@ -57,27 +59,31 @@ def load_region(adapter, case_id, hgnc_id=None, chrom=None, start=None, end=None
              " {2}, end {3}".format(case_obj['_id'], chrom, start, end))
 
     adapter.load_variants(case_obj=case_obj, variant_type='clinical',
-                          category='snv', chrom=chrom, start=start, end=end)
+                          category='snv', chrom=chrom, start=start, end=end,
+                          batch_size=batch_size)
 
     vcf_sv_file = case_obj['vcf_files'].get('vcf_sv')
     if vcf_sv_file:
         log.info("Load clinical SV variants for case: {0} region: chr {1}, "
                  "start {2}, end {3}".format(case_obj['_id'], chrom, start, end))
         adapter.load_variants(case_obj=case_obj, variant_type='clinical',
-                              category='sv', chrom=chrom, start=start, end=end)
+                              category='sv', chrom=chrom, start=start, end=end,
+                              batch_size=batch_size)
 
     if case_obj['is_research']:
         log.info("Load research SNV variants for case: {0} region: chr {1}, "
                  "start {2}, end {3}".format(case_obj['_id'], chrom, start, end))
         adapter.load_variants(case_obj=case_obj, variant_type='research',
-                              category='snv', chrom=chrom, start=start, end=end)
+                              category='snv', chrom=chrom, start=start, end=end,
+                              batch_size=batch_size)
 
         vcf_sv_research = case_obj['vcf_files'].get('vcf_sv_research')
         if vcf_sv_research:
             log.info("Load research SV variants for case: {0} region: chr {1},"
                      " start {2}, end {3}".format(case_obj['_id'], chrom, start, end))
             adapter.load_variants(case_obj=case_obj, variant_type='research',
-                                  category='sv', chrom=chrom, start=start, end=end)
+                                  category='sv', chrom=chrom, start=start, end=end,
+                                  batch_size=batch_size)
 
 
 def load_scout(adapter, config, ped=None, update=False):
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Load reference data, like genes and hpo terms, in chunks.
+
+Each chunk is inserted with one unordered insert instead of one insert per
+document. The progress and the throughput is logged after every chunk.
+"""
+import itertools
+import logging
+
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Number of documents that are inserted at a time
+BULK_CHUNK_SIZE = 5000
+
+
+def load_bulk(documents, load_function, name='documents', chunk_size=BULK_CHUNK_SIZE):
+    """Insert documents in chunks
+
+    Args:
+        documents(iterable(dict))
+        load_function(function): Inserts a list of documents and returns the
+                                 number that was inserted, like
+                                 adapter.load_hgnc_bulk
+        name(str): What the documents are called in the log
+        chunk_size(int)
+
+    Returns:
+        nr_inserted(int)
+    """
+    documents = iter(documents)
+    start_time = datetime.now()
+    nr_inserted = 0
+    while True:
+        chunk = list(itertools.islice(documents, chunk_size))
+        if not chunk:
+            break
+        nr_inserted += load_function(chunk)
+        seconds = (datetime.now() - start_time).total_seconds()
+        logger.info("%s %s loaded (%s %s/s)", nr_inserted, name,
+                    int(nr_inserted / seconds) if seconds else nr_inserted, name)
+    return nr_inserted
@@ -6,27 +6,47 @@ from scout.parse.hpo import (parse_hpo_phenotypes, parse_hpo_diseases)
 from scout.parse.omim import get_mim_phenotypes
 from scout.build.hpo import build_hpo_term
 from scout.build.disease import build_disease_term
+from scout.load.bulk import load_bulk
 
 from pprint import pprint as pp
 
 logger = logging.getLogger(__name__)
 
 
-def load_hpo(adapter, hpo_lines, disease_lines, hpo_disease_lines):
+def load_hpo(adapter, hpo_lines, disease_lines, hpo_disease_lines,
+             hpo_tables=None):
     """Load the hpo terms and hpo diseases into database
     
     Args:
         adapter(MongoAdapter)
         hpo_lines(iterable(str))
         disease_lines(iterable(str))
+        hpo_disease_lines(iterable(str))
+        hpo_tables(dict): The lines already parsed, see parse_hpo_tables
     """
+    hpo_tables = hpo_tables or {}
     alias_genes = adapter.genes_by_alias()
     
-    load_hpo_terms(adapter, hpo_lines, alias_genes)
+    load_hpo_terms(adapter, hpo_lines, alias_genes,
+                   hpo_terms=hpo_tables.get('hpo_terms'))
     
-    load_disease_terms(adapter, disease_lines, alias_genes, hpo_disease_lines)
+    load_disease_terms(adapter, disease_lines, alias_genes, hpo_disease_lines,
+                       disease_terms=hpo_tables.get('disease_terms'),
+                       hpo_diseases=hpo_tables.get('hpo_diseases'))
+
+def parse_hpo_tables(hpo_lines, disease_lines, hpo_disease_lines):
+    """Parse the hpo terms, omim phenotypes and hpo diseases
+
+    Returns:
+        hpo_tables(dict): With the keys hpo_terms, disease_terms and hpo_diseases
+    """
+    return {
+        'hpo_terms': parse_hpo_phenotypes(hpo_lines),
+        'disease_terms': get_mim_phenotypes(genemap_lines=disease_lines),
+        'hpo_diseases': parse_hpo_diseases(hpo_disease_lines),
+    }
 
-def load_hpo_terms(adapter, hpo_lines, genes):
+def load_hpo_terms(adapter, hpo_lines, genes, hpo_terms=None):
     """Load the hpo terms into the database
     
     Parse the hpo lines, build the objects and add them to the database
@@ -34,23 +54,24 @@ def load_hpo_terms(adapter, hpo_lines, genes):
     Args:
         adapter(MongoAdapter)
         hpo_lines(iterable(str))
+        genes(dict): Dictionary with all genes found in database
+        hpo_terms(dict): The hpo lines already parsed
     """
-    hpo_terms = parse_hpo_phenotypes(hpo_lines)
+    if hpo_terms is None:
+        hpo_terms = parse_hpo_phenotypes(hpo_lines)
 
     start_time = datetime.now()
 
     logger.info("Loading the hpo terms...")
-    for nr_terms, hpo_id in enumerate(hpo_terms):
-        hpo_info = hpo_terms[hpo_id]
-        hpo_obj = build_hpo_term(hpo_info, genes)
-        
-        adapter.load_hpo_term(hpo_obj)
-    
+    hpo_objs = (build_hpo_term(hpo_info, genes) for hpo_info in hpo_terms.values())
+    nr_terms = load_bulk(hpo_objs, adapter.load_hpo_bulk, name='hpo terms')
+
     logger.info("Loading done. Nr of terms loaded {0}".format(nr_terms))
     logger.info("Time to load terms: {0}".format(datetime.now() - start_time))
 
 
-def load_disease_terms(adapter, genemap_lines, genes, hpo_disease_lines):
+def load_disease_terms(adapter, genemap_lines, genes, hpo_disease_lines,
+                       disease_terms=None, hpo_diseases=None):
     """Load the omim phenotypes into the database
     
     Parse the phenotypes from genemap2.txt and find the associated hpo terms
@@ -61,27 +82,30 @@ def load_disease_terms(adapter, genemap_lines, genes, hpo_disease_lines):
         genemap_lines(iterable(str))
         genes(dict): Dictionary with all genes found in database
         hpo_disease_lines(iterable(str))
+        disease_terms(dict): The genemap lines already parsed
+        hpo_diseases(dict): The hpo disease lines already parsed
 
     """
-
-    disease_terms = get_mim_phenotypes(genemap_lines=genemap_lines)
-    hpo_diseases = parse_hpo_diseases(hpo_disease_lines)
+    if disease_terms is None:
+        disease_terms = get_mim_phenotypes(genemap_lines=genemap_lines)
+    if hpo_diseases is None:
+        hpo_diseases = parse_hpo_diseases(hpo_disease_lines)
 
     start_time = datetime.now()
 
+    def disease_objs():
+        for disease_number, disease_info in disease_terms.items():
+            disease_id = "OMIM:{0}".format(disease_number)
+
+            if disease_id in hpo_diseases:
+                hpo_terms = hpo_diseases[disease_id]['hpo_terms']
+                if hpo_terms:
+                    disease_info['hpo_terms'] = hpo_terms
+            yield build_disease_term(disease_info, genes)
+
     logger.info("Loading the hpo disease...")
-    for nr_diseases, disease_number in enumerate(disease_terms):
-        disease_info = disease_terms[disease_number]
-        disease_id = "OMIM:{0}".format(disease_number)
-        
-        if disease_id in hpo_diseases:
-            hpo_terms = hpo_diseases[disease_id]['hpo_terms']
-            if hpo_terms:
-                disease_info['hpo_terms'] = hpo_terms
-        disease_obj = build_disease_term(disease_info, genes)
-
-        adapter.load_disease_term(disease_obj)
-    
+    nr_diseases = load_bulk(disease_objs(), adapter.load_disease_bulk, name='diseases')
+
     logger.info("Loading done. Nr of diseases loaded {0}".format(nr_diseases))
     logger.info("Time to load diseases: {0}".format(datetime.now() - start_time))
     
\ No newline at end of file
@@ -50,7 +50,7 @@ def load_variants(adapter, variant_file, case_obj, variant_type='clinical',
 
     gene_to_panels = adapter.gene_to_panels()
 
-    hgncid_to_gene = adapter.hgncid_to_gene()
+    hgncid_to_gene = adapter.gene_lookup()
 
     coordinates = {}
 
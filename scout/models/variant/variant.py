@@ -31,6 +31,7 @@ variant = dict(
     chromosome = str, # required
     position = int, # required
     end = int, # required
+    bin = int, # UCSC bin of position to end, for overlap queries
     length = int, # required
     reference = str, # required
     alternative = str, # required
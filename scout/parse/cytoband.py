@@ -1,19 +1,34 @@
 import logging
-import intervaltree
+
+from array import array
+from bisect import bisect_right
+
+import numpy as np
+
+from scout.resources import cytobands_path
+from scout.utils.handle import get_file_handle
+
+log = logging.getLogger(__name__)
+
+# The cytobands of the resource file, parsed by get_cytobands on first use
+_cytobands = None
+_genome_cytobands = None
 
 
 def parse_cytoband(lines):
     """Parse iterable with cytoband coordinates
-    
-    
+
+    The bands of each chromosome are kept in sorted arrays, see cytoband_name.
+
     Args:
         lines(iterable): Strings on format "chr1\t2300000\t5400000\tp36.32\tgpos25"
-    
+
     Returns:
-        cytobands(dict): Dictionary with chromosome names as keys and 
-                         interval trees as values
+        cytobands(dict): Dictionary with chromosome names as keys and
+                         (starts(array), ends(array), names(list)) as values,
+                         sorted on start
     """
-    cytobands = {}
+    bands = {}
     for line in lines:
         line = line.rstrip()
         splitted_line = line.split('\t')
@@ -21,23 +36,128 @@ def parse_cytoband(lines):
         start = int(splitted_line[1])
         stop = int(splitted_line[2])
         name = splitted_line[3]
-        if chrom in cytobands:
-            # Add interval to existing tree
-            cytobands[chrom][start:stop] = name
-        else:
-            # Create a new interval tree
-            new_tree = intervaltree.IntervalTree()
-            # create the interval
-            new_tree[start:stop] = name
-            # Add the interval tree 
-            cytobands[chrom] = new_tree
-    
-    return cytobands 
+        bands.setdefault(chrom, []).append((start, stop, name))
+
+    cytobands = {}
+    for chrom, chrom_bands in bands.items():
+        chrom_bands.sort()
+        cytobands[chrom] = (
+            array('l', [band[0] for band in chrom_bands]),
+            array('l', [band[1] for band in chrom_bands]),
+            [band[2] for band in chrom_bands],
+        )
+    return cytobands
+
+
+def cytoband_name(cytobands, chrom, pos):
+    """Return the name of the band that a position is in
+
+    A band includes its start but not its end, like in the cytoband file.
+
+    Args:
+        cytobands(dict): From parse_cytoband
+        chrom(str)
+        pos(int)
+
+    Returns:
+        name(str): Empty if the position is not in a band
+    """
+    if chrom not in cytobands:
+        return ""
+    starts, ends, names = cytobands[chrom]
+    index = bisect_right(starts, pos) - 1
+    if index >= 0 and pos < ends[index]:
+        return names[index]
+    return ""
+
+
+def get_cytobands():
+    """Return the cytobands of the resource file
+
+    The file is parsed the first time the cytobands are used, not when scout
+    is imported.
+    """
+    global _cytobands
+    if _cytobands is None:
+        log.debug("Parsing cytobands from %s", cytobands_path)
+        _cytobands = parse_cytoband(get_file_handle(cytobands_path))
+    return _cytobands
+
+
+def genome_cytobands(cytobands):
+    """Put the bands of all chromosomes in sorted arrays on one axis
+
+    Each chromosome is moved by an offset past the end of the chromosomes
+    before it, so that the bands of many positions on different chromosomes
+    can be found with one search, see cytoband_names.
+
+    Args:
+        cytobands(dict): From parse_cytoband
+
+    Returns:
+        genome(dict): 'offsets': {<chrom>: <offset>}, 'starts', 'ends' and
+                      'band_offsets': numpy arrays with the moved coordinates
+                      and the offset of each band, 'names': numpy array with
+                      the band names and an empty name last
+    """
+    offsets = {}
+    starts, ends, band_offsets, names = [], [], [], []
+    offset = 0
+    for chrom, (chrom_starts, chrom_ends, chrom_names) in cytobands.items():
+        offsets[chrom] = offset
+        starts.extend(start + offset for start in chrom_starts)
+        ends.extend(end + offset for end in chrom_ends)
+        band_offsets.extend([offset] * len(chrom_names))
+        names.extend(chrom_names)
+        offset += max(chrom_ends) + 1
+    return {
+        'offsets': offsets,
+        'starts': np.array(starts, dtype=np.int64),
+        'ends': np.array(ends, dtype=np.int64),
+        'band_offsets': np.array(band_offsets, dtype=np.int64),
+        'names': np.array(names + [""], dtype=object),
+    }
+
+
+def cytoband_names(chroms, positions, cytobands=None):
+    """Return the names of the bands that many positions are in
+
+    Gives the same names as cytoband_name for each position, but all
+    positions are looked up with one numpy search.
+
+    Args:
+        chroms(list(str))
+        positions(list(int))
+        cytobands(dict): From parse_cytoband, the cytobands of the resource
+                         file if not given
+
+    Returns:
+        names(list(str))
+    """
+    global _genome_cytobands
+    if cytobands is not None:
+        genome = genome_cytobands(cytobands)
+    else:
+        if _genome_cytobands is None:
+            _genome_cytobands = genome_cytobands(get_cytobands())
+        genome = _genome_cytobands
+
+    nr_positions = len(positions)
+    offsets = genome['offsets']
+    chrom_offsets = np.fromiter((offsets.get(chrom, -1) for chrom in chroms),
+                                dtype=np.int64, count=nr_positions)
+    genome_positions = np.fromiter(positions, dtype=np.int64, count=nr_positions)
+    genome_positions += chrom_offsets
+    indexes = np.searchsorted(genome['starts'], genome_positions, side='right') - 1
+    found = ((chrom_offsets >= 0) & (indexes >= 0) &
+             (genome_positions < genome['ends'][indexes]) &
+             (genome['band_offsets'][indexes] == chrom_offsets))
+    # The last name is empty
+    indexes[~found] = -1
+    return genome['names'][indexes].tolist()
 
 
 import click
-from scout.utils.handle import get_file_handle
-from scout.resources import cytobands_path
 
 @click.command()
 @click.option('--infile', default=cytobands_path)
@@ -45,25 +165,18 @@ def cli(infile):
     """docstring for cli"""
     lines = get_file_handle(infile)
     cytobands = parse_cytoband(lines)
-    
+
     print("Check some coordinates:")
-    
+
     print("checking chrom 1 pos 2")
-    intervals = cytobands['1'][2]
-    for interval in intervals:
-        print(interval)
-        print(interval.begin)
-        print(interval.end)
-        print(interval.data)
-        # print(interval.__dict__)
-    print(cytobands['1'][2])
-    
+    print(cytoband_name(cytobands, '1', 2))
+
     print("checking chrom 8 pos 101677777")
-    print(cytobands['8'][101677777])
+    print(cytoband_name(cytobands, '8', 101677777))
 
-    print("checking chrom X pos 4200000 - 6000000")
-    print(cytobands['X'][4200000:6000000])
+    print("checking chrom X pos 4200000 and 6000000")
+    print(cytoband_name(cytobands, 'X', 4200000), cytoband_name(cytobands, 'X', 6000000))
 
 
 if __name__ == '__main__':
-    cli()
\ No newline at end of file
+    cli()
@@ -1,6 +1,6 @@
 import logging
 
-from scout.utils.md5 import generate_md5_key
+from scout.utils.md5 import (md5_key_suffix, generate_suffixed_md5_key)
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +18,8 @@ def parse_compounds(compound_info, case_id, variant_type):
     # We need the case to construct the correct id
     compounds = []
     if compound_info:
+        # The end of the compound ids is the same for all compounds
+        key_suffix = md5_key_suffix([variant_type, case_id])
         for family_info in compound_info.split(','):
             splitted_entry = family_info.split(':')
             # This is the family id
@@ -26,8 +28,8 @@ def parse_compounds(compound_info, case_id, variant_type):
                     splitted_compound = compound.split('>')
                     compound_obj = {}
                     compound_name = splitted_compound[0]
-                    compound_obj['variant'] = generate_md5_key(compound_name.split('_') +
-                                                               [variant_type, case_id])
+                    compound_obj['variant'] = generate_suffixed_md5_key(
+                        compound_name.replace('_', ' '), key_suffix)
 
                     try:
                         compound_score = float(splitted_compound[1])
@@ -1,4 +1,5 @@
-from scout.constants import (CYTOBANDS, BND_ALT_PATTERN, CHR_PATTERN)
+from scout.constants import (BND_ALT_PATTERN, CHR_PATTERN)
+from scout.parse.cytoband import (get_cytobands, cytoband_name, cytoband_names)
 
 def get_cytoband_coordinates(chrom, pos):
     """Get the cytoband coordinate for a position
@@ -10,13 +11,7 @@ def get_cytoband_coordinates(chrom, pos):
     Returns:
         coordinate(str)
     """
-    coordinate = ""
-    
-    if chrom in CYTOBANDS:
-        for interval in CYTOBANDS[chrom][pos]:
-            coordinate = interval.data
-
-    return coordinate
+    return cytoband_name(get_cytobands(), chrom, pos)
 
 def get_sub_category(alt_len, ref_len, category, svtype=None):
     """Get the subcategory for a VCF variant
@@ -114,11 +109,13 @@ def get_end(pos, alt, category, snvend=None, svend=None, svlen=None):
 
     return end
 
-def parse_coordinates(variant, category):
+def parse_coordinates(variant, category, cytobands=True):
     """Find out the coordinates for a variant
     
     Args:
         variant(cyvcf2.Variant)
+        cytobands(bool): If False the cytobands are None, to be added for
+                         many variants at once with annotate_cytobands
     
     Returns:
         coordinates(dict): A dictionary on the form:
@@ -169,8 +166,11 @@ def parse_coordinates(variant, category):
                 match = CHR_PATTERN.match(other_chrom)
                 end_chrom = match.group(2)
     
-    cytoband_start = get_cytoband_coordinates(chrom, position)
-    cytoband_end = get_cytoband_coordinates(end_chrom, end)
+    cytoband_start = None
+    cytoband_end = None
+    if cytobands:
+        cytoband_start = get_cytoband_coordinates(chrom, position)
+        cytoband_end = get_cytoband_coordinates(end_chrom, end)
 
     coordinates = {
         'position': position,
@@ -185,3 +185,23 @@ def parse_coordinates(variant, category):
 
 
     return coordinates
+
+def annotate_cytobands(parsed_variants):
+    """Add the cytobands of the start and end of parsed variants
+
+    The bands of all variants are looked up at once, see cytoband_names.
+
+    Args:
+        parsed_variants(list(dict)): From parse_variant with cytobands=False
+    """
+    starts = cytoband_names(
+        [variant['chromosome'] for variant in parsed_variants],
+        [variant['position'] for variant in parsed_variants],
+    )
+    ends = cytoband_names(
+        [variant['end_chrom'] for variant in parsed_variants],
+        [variant['end'] for variant in parsed_variants],
+    )
+    for variant, cytoband_start, cytoband_end in zip(parsed_variants, starts, ends):
+        variant['cytoband_start'] = cytoband_start
+        variant['cytoband_end'] = cytoband_end
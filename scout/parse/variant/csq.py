@@ -0,0 +1,105 @@
+"""
+Functions to decode the VEP CSQ entry of a variant
+"""
+from scout.constants import MAX_GENE_INDEX
+
+# The CSQ fields that are used by parse_transcripts. All fields that ends with
+# AF are used as well since they hold the frequencies.
+TRANSCRIPT_KEYS = (
+    'Consequence', 'Feature', 'HGNC_ID', 'SYMBOL', 'ENSP', 'PolyPhen', 'SIFT',
+    'SWISSPROT', 'DOMAINS', 'HGVSc', 'HGVSp', 'BIOTYPE', 'EXON', 'INTRON',
+    'STRAND', 'CANONICAL', 'CADD_PHRED', 'CLIN_SIG', 'Existing_variation',
+)
+
+# The fields that are used for the variant and not only for its genes. These
+# are decoded for transcripts of genes that build_variant does not store.
+VARIANT_KEYS = (
+    'Consequence', 'Feature', 'HGNC_ID', 'SYMBOL', 'CADD_PHRED', 'CLIN_SIG',
+    'Existing_variation',
+)
+
+
+def parse_csq_columns(vep_header):
+    """Return the position of the fields in the vep header that are parsed
+
+    This only has to be done once per vcf file. The columns are in the same
+    order as in the header. If a key occurs more than once the last position
+    is used, as when zipping the header with the fields.
+
+    Args:
+        vep_header(list)
+
+    Returns:
+        csq_columns(list(tuple)): [(<key(str)>, <position(int)>,
+                                    <used for the variant(bool)>), ...]
+    """
+    positions = {}
+    for position, key in enumerate(vep_header):
+        if key in TRANSCRIPT_KEYS or key.upper().endswith('AF'):
+            positions[key] = position
+    return [(key, position, key in VARIANT_KEYS or key.upper().endswith('AF'))
+            for key, position in positions.items()]
+
+
+def _gene_key(fields, hgnc_position, symbol_position):
+    """Return the key that parse_genes groups a transcript on
+
+    Returns:
+        gene_key(int or str), has_hgnc_id(bool)
+    """
+    nr_fields = len(fields)
+    if hgnc_position is not None and hgnc_position < nr_fields and fields[hgnc_position]:
+        return int(fields[hgnc_position].split(':')[-1]), True
+    if symbol_position is not None and symbol_position < nr_fields:
+        return fields[symbol_position] or None, False
+    return None, False
+
+
+def parse_csq_transcripts(csq_entry, csq_columns):
+    """Decode the raw transcripts in a CSQ entry
+
+    Only the fields in csq_columns are picked out from each transcript. The
+    transcripts are decoded one at a time when iterated.
+
+    build_variant stops adding genes after the first gene with a hgnc id
+    beyond MAX_GENE_INDEX. Transcripts of the genes after that one only get
+    the fields that are used for the variant, like hgnc ids, frequencies and
+    clinical significance, since the rest would be dropped anyway.
+
+    Args:
+        csq_entry(str): The CSQ entry from the INFO field
+        csq_columns(list(tuple)): From parse_csq_columns
+
+    Yields:
+        raw_transcript(dict): {<key(str)>: <value(str)>}
+    """
+    positions = {key: position for key, position, _ in csq_columns}
+    hgnc_position = positions.get('HGNC_ID')
+    symbol_position = positions.get('SYMBOL')
+    variant_columns = [(key, position) for key, position, variant_key in csq_columns
+                       if variant_key]
+
+    # Position of each gene in the order they are first seen
+    gene_indexes = {}
+    # Index of the last gene that build_variant stores
+    last_gene_index = None
+    for transcript_info in csq_entry.split(','):
+        fields = transcript_info.split('|')
+        nr_fields = len(fields)
+
+        gene_key, has_hgnc_id = _gene_key(fields, hgnc_position, symbol_position)
+        gene_index = None
+        if gene_key is not None:
+            gene_index = gene_indexes.setdefault(gene_key, len(gene_indexes))
+            if (last_gene_index is None and has_hgnc_id and
+                    gene_index > MAX_GENE_INDEX):
+                last_gene_index = gene_index
+
+        if last_gene_index is not None and (gene_index is None or
+                                            gene_index > last_gene_index):
+            yield {key: fields[position] for key, position in variant_columns
+                   if position < nr_fields}
+            continue
+
+        yield {key: fields[position] for key, position, _ in csq_columns
+               if position < nr_fields}
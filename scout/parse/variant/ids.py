@@ -1,4 +1,4 @@
-from scout.utils.md5 import generate_md5_key
+from scout.utils.md5 import (generate_md5_key, generate_md5_keys)
 
 def parse_ids(chrom, pos, ref, alt, case_id, variant_type):
     """Construct the necessary ids for a variant
@@ -18,9 +18,11 @@ def parse_ids(chrom, pos, ref, alt, case_id, variant_type):
     pos = str(pos)
 
     ids['simple_id'] = parse_simple_id(chrom, pos, ref, alt)
-    ids['variant_id'] = parse_variant_id(chrom, pos, ref, alt, variant_type)
+    # The document id is the variant id extended with the case id, so both
+    # md5 keys are generated from the same hash
+    ids['variant_id'], ids['document_id'] = generate_md5_keys(
+        [chrom, pos, ref, alt, variant_type], case_id)
     ids['display_name'] = parse_display_name(chrom, pos, ref, alt, variant_type)
-    ids['document_id'] = parse_document_id(chrom, pos, ref, alt, variant_type, case_id)
 
     return ids
 
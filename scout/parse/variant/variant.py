@@ -15,6 +15,7 @@ from .rank_score import parse_rank_score
 from .coordinates import parse_coordinates
 from .models import parse_genetic_models
 from .transcript import parse_transcripts
+from .csq import (parse_csq_columns, parse_csq_transcripts)
 from .deleteriousness import parse_cadd
 
 from scout.constants import CHR_PATTERN
@@ -25,7 +26,8 @@ logger = logging.getLogger(__name__)
 
 def parse_variant(variant, case, variant_type='clinical',
                  rank_results_header=None, vep_header=None,
-                 individual_positions=None, category=None):
+                 individual_positions=None, category=None, csq_columns=None,
+                 cytobands=True):
     """Return a parsed variant
 
         Get all the necessary information to build a variant object
@@ -39,6 +41,10 @@ def parse_variant(variant, case, variant_type='clinical',
         individual_positions(dict): Explain what position each individual has
                                     in vcf
         category(str): 'snv', 'sv' or 'cancer'
+        csq_columns(list(tuple)): The parsed vep header from parse_csq_columns,
+                                  built from vep_header if not given
+        cytobands(bool): If False the cytobands are added later, for many
+                         variants at once with annotate_cytobands
 
     Returns:
         parsed_variant(dict): Parsed variant
@@ -110,7 +116,7 @@ def parse_variant(variant, case, variant_type='clinical',
     ################# Position specific #################
     parsed_variant['chromosome'] = chrom
 
-    coordinates = parse_coordinates(variant, category)
+    coordinates = parse_coordinates(variant, category, cytobands)
 
     parsed_variant['position'] = coordinates['position']
     parsed_variant['sub_category'] = coordinates['sub_category']
@@ -162,8 +168,9 @@ def parse_variant(variant, case, variant_type='clinical',
     if vep_header:
         vep_info = variant.INFO.get('CSQ')
         if vep_info:
-            raw_transcripts = (dict(zip(vep_header, transcript_info.split('|')))
-                               for transcript_info in vep_info.split(','))
+            if csq_columns is None:
+                csq_columns = parse_csq_columns(vep_header)
+            raw_transcripts = parse_csq_transcripts(vep_info, csq_columns)
 
 
     parsed_transcripts = []
@@ -7,6 +7,7 @@ import query_phenomizer
 
 from scout.constants import (CASE_STATUSES, PHENOTYPE_GROUPS, COHORT_TAGS)
 from scout.models.event import VERBS_MAP
+from scout.server.loader import request_loader
 from scout.server.utils import institute_and_case
 
 STATUS_MAP = {'solved': 'bg-success', 'archived': 'bg-warning'}
@@ -18,10 +19,13 @@ def cases(store, case_query):
     """Preprocess case objects."""
     limit = 100
     case_groups = {status: [] for status in CASE_STATUSES}
-    for case_obj in case_query.limit(limit):
+    case_objs = list(case_query.limit(limit))
+    users = request_loader(store).users(
+        user_email for case_obj in case_objs for user_email in case_obj.get('assignees', []))
+    for case_obj in case_objs:
         analysis_types = set(ind['analysis_type'] for ind in case_obj['individuals'])
         case_obj['analysis_types'] = list(analysis_types)
-        case_obj['assignees'] = [store.user(user_email) for user_email in
+        case_obj['assignees'] = [users[user_email] for user_email in
                                  case_obj.get('assignees', [])]
         case_groups[case_obj['status']].append(case_obj)
         case_obj['is_rerun'] = len(case_obj.get('analyses', [])) > 0
@@ -42,18 +46,24 @@ def case(store, institute_obj, case_obj):
         individual['phenotype_human'] = PHENOTYPE_MAP.get(individual['phenotype'])
         case_obj['individual_ids'].append(individual['individual_id'])
 
-    case_obj['assignees'] = [store.user(user_email) for user_email in
+    loader = request_loader(store)
+    users = loader.users(case_obj.get('assignees', []))
+    case_obj['assignees'] = [users[user_email] for user_email in
                              case_obj.get('assignees', [])]
-    suspects = [store.variant(variant_id) or variant_id for variant_id in
+    variants = loader.variants(case_obj.get('suspects', []) + case_obj.get('causatives', []))
+    suspects = [variants[variant_id] or variant_id for variant_id in
                 case_obj.get('suspects', [])]
-    causatives = [store.variant(variant_id) or variant_id for variant_id in
+    causatives = [variants[variant_id] or variant_id for variant_id in
                   case_obj.get('causatives', [])]
 
     distinct_genes = set()
     case_obj['panel_names'] = []
-    for panel_info in case_obj.get('panels', []):
-        if panel_info.get('is_default'):
-            panel_obj = store.panel(panel_info['panel_id'])
+    default_panels = [panel_info for panel_info in case_obj.get('panels', [])
+                      if panel_info.get('is_default')]
+    panels = loader.panels(panel_info['panel_id'] for panel_info in default_panels)
+    for panel_info in default_panels:
+        panel_obj = panels[panel_info['panel_id']]
+        if panel_obj:
             distinct_genes.update([gene['hgnc_id'] for gene in panel_obj['genes']])
             full_name = "{} ({})".format(panel_obj['display_name'], panel_obj['version'])
             case_obj['panel_names'].append(full_name)
@@ -64,14 +74,17 @@ def case(store, institute_obj, case_obj):
         hpo_term['hpo_link'] = ("http://compbio.charite.de/hpoweb/showterm?id={}"
                                 .format(hpo_term['phenotype_id']))
 
+    # All institutes are needed for the collaborators that the case can be
+    # shared with, so the current collaborators are taken from them too
+    all_institutes = loader.all_institutes()
     # other collaborators than the owner of the case
-    o_collaborators = [store.institute(collab_id) for collab_id in case_obj['collaborators'] if
-                       collab_id != case_obj['owner']]
+    institutes = loader.institutes(collab_id for collab_id in case_obj['collaborators'] if
+                                   collab_id != case_obj['owner'])
     case_obj['o_collaborators'] = [(collab_obj['_id'], collab_obj['display_name']) for
-                                   collab_obj in o_collaborators]
+                                   collab_obj in institutes.values()]
 
     irrelevant_ids = ('cust000', institute_obj['_id'])
-    collab_ids = [(collab['_id'], collab['display_name']) for collab in store.institutes() if
+    collab_ids = [(collab['_id'], collab['display_name']) for collab in all_institutes if
                   (collab['_id'] not in irrelevant_ids) and
                   (collab['_id'] not in case_obj['collaborators'])]
 
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import logging
+
+log = logging.getLogger(__name__)
+
+# The lists in a case that are counted on the dashboard
+OVERVIEW_TITLES = [
+    ('phenotype_terms', 'Phenotype terms'),
+    ('causatives', 'Causative variants'),
+    ('suspects', 'Pinned variants'),
+    ('cohorts', 'Cohort tag'),
+]
+
+
+def institute_statistics(statistics, institute_ids=None):
+    """Sum the case statistics of some institutes
+
+    Args:
+        statistics(dict): From store.case_statistics
+        institute_ids(iterable(str)): All institutes if None
+
+    Returns:
+        total(dict): The same counters as each institute has in statistics
+    """
+    total = {'cases': 0, 'status': {}, 'analysis_types': {}}
+    total.update({field: 0 for field, _ in OVERVIEW_TITLES})
+    for institute_id, stats in statistics.items():
+        if institute_ids is not None and institute_id not in institute_ids:
+            continue
+        total['cases'] += stats['cases']
+        for counter in ('status', 'analysis_types'):
+            for key, count in stats[counter].items():
+                total[counter][key] = total[counter].get(key, 0) + count
+        for field, _ in OVERVIEW_TITLES:
+            total[field] += stats[field]
+    return total
+
+
+def get_dashboard_info(statistics, institute_ids=None):
+    """Format the case statistics for the dashboard
+
+    Args:
+        statistics(dict): From store.case_statistics
+        institute_ids(iterable(str)): Only count cases of these institutes
+
+    Returns:
+        data(dict): None if there are no cases
+    """
+    total = institute_statistics(statistics, institute_ids)
+    total_cases = total['cases']
+    if total_cases == 0:
+        return None
+
+    cases = [{'status': 'all', 'count': total_cases, 'percent': 1}]
+    for status, count in total['status'].items():
+        cases.append({'status': status, 'count': count, 'percent': count / total_cases})
+
+    analysis_types = [{'name': name, 'count': count} for name, count in
+                      total['analysis_types'].items()]
+
+    overview = [{
+        'title': title,
+        'count': total[field],
+        'percent': total[field] / total_cases,
+    } for field, title in OVERVIEW_TITLES]
+
+    return {
+        'cases': cases,
+        'analysis_types': analysis_types,
+        'overview': overview,
+    }
@@ -3,6 +3,7 @@ from flask import (abort, Blueprint, current_app, redirect, render_template,
 from flask_login import current_user
 
 from scout.server.extensions import store
+from . import controllers
 
 blueprint = Blueprint('dashboard', __name__, template_folder='templates')
 
@@ -10,49 +11,26 @@ blueprint = Blueprint('dashboard', __name__, template_folder='templates')
 @blueprint.route('/dashboard')
 def index():
     """Display the Scout dashboard."""
-    total_cases = store.cases().count()
-    if total_cases == 0:
+    statistics = store.case_statistics()
+    # The anonymous user, when login is disabled, has no is_admin
+    if getattr(current_user, 'is_admin', False):
+        institute_ids = list(statistics)
+    else:
+        user_institutes = getattr(current_user, 'institutes', None) or []
+        institute_ids = [institute_id for institute_id in statistics
+                         if institute_id in user_institutes]
+    institute_id = request.args.get('institute')
+    if institute_id and institute_id not in institute_ids:
+        return abort(403)
+
+    data = controllers.get_dashboard_info(
+        statistics, institute_ids=[institute_id] if institute_id else institute_ids)
+    if data is None:
         flash('no cases loaded - please visit the dashboard later!', 'info')
         return redirect(url_for('cases.index'))
-    cases = [{'status': 'all', 'count': total_cases, 'percent': 1}]
-    query = store.case_collection.aggregate([
-        {'$group' : {'_id': '$status', 'count': {'$sum': 1}}}
-    ])
-    for status_group in query:
-        cases.append({'status': status_group['_id'],
-                      'count': status_group['count'],
-                      'percent': status_group['count'] / total_cases})
-
-    query = store.case_collection.aggregate([
-        {'$unwind': '$individuals'},
-        {'$group': {'_id': '$individuals.analysis_type', 'count': {'$sum': 1}}}
-    ])
-    analysis_types = [{'name': group['_id'], 'count': group['count']} for group in query]
-
-    phenotype_terms = store.case_collection.find({'phenotype_terms.1': {'$exists': True}}).count()
-    causative_variants = store.case_collection.find({'causatives.1': {'$exists': True}}).count()
-    pinned_variants = store.case_collection.find({'suspects.1': {'$exists': True}}).count()
-    cohort_tags = store.case_collection.find({'cohorts.1': {'$exists': True}}).count()
-    overview = [{
-        'title': 'Phenotype terms',
-        'count': phenotype_terms,
-        'percent': phenotype_terms / total_cases,
-    }, {
-        'title': 'Causative variants',
-        'count': causative_variants,
-        'percent': causative_variants / total_cases,
-    }, {
-        'title': 'Pinned variants',
-        'count': pinned_variants,
-        'percent': pinned_variants / total_cases,
-    }, {
-        'title': 'Cohort tag',
-        'count': cohort_tags,
-        'percent': cohort_tags / total_cases,
-    }]
     return render_template(
         'dashboard/index.html',
-        cases=cases,
-        analysis_types=analysis_types,
-        overview=overview,
+        institute_ids=sorted(institute_id for institute_id in institute_ids if institute_id),
+        institute_id=institute_id,
+        **data
     )
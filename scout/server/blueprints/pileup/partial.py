@@ -1,65 +1,171 @@
 # -*- coding: utf-8 -*-
+"""
+Serve byte ranges of large files, like bam files, to the alignment viewer.
+
+The ranges are read in chunks of CHUNK_SIZE while the response is sent, so
+the memory used per request does not depend on the size of the range. Whole
+files are handed to the wsgi server with wsgi.file_wrapper, which can use
+sendfile.
+"""
 import mimetypes
 import os
 import re
+import uuid
 
-from flask import abort, request, Response, send_file
+from flask import abort, request, Response
+from werkzeug.http import http_date, unquote_etag
+from werkzeug.wsgi import wrap_file
 
+# Bytes that are read from the file at a time
+CHUNK_SIZE = 64 * 1024
+# Requests with more ranges than this get the whole file
+MAX_RANGES = 50
 
-BYTE_RANGE_RE = re.compile(r'bytes=(\d+)-(\d+)?$')
+BYTE_RANGE_RE = re.compile(r'(\d*)-(\d*)$')
 
 
-def parse_byte_range(byte_range):
-    '''Returns the two numbers in 'bytes=123-456' or throws ValueError.
-    The last number or both numbers may be None.
-    '''
-    if byte_range.strip() == '':
-        return None, None
+def parse_byte_ranges(range_header, file_len):
+    """Return the byte ranges of a Range header
 
-    m = BYTE_RANGE_RE.match(byte_range)
-    if not m:
-        raise ValueError('Invalid byte range %s' % byte_range)
+    Ranges that start after the end of the file are left out.
 
-    first, last = [x and int(x) for x in m.groups()]
-    if last and last < first:
-        raise ValueError('Invalid byte range %s' % byte_range)
-    return first, last
+    Args:
+        range_header(str): e.g. 'bytes=0-99,200-' or 'bytes=-500'
+        file_len(int)
 
+    Returns:
+        byte_ranges(list(tuple)): [(<first>, <last>), ...] with the first and
+                                  last position, within the file, of each range
 
-def send_file_partial(path):
-    range_header = request.headers.get('Range', None)
-    if not range_header:
-        return send_file(path)
+    Raises:
+        ValueError: If the header can not be parsed
+    """
+    unit, _, ranges = range_header.partition('=')
+    if unit.strip() != 'bytes' or not ranges.strip():
+        raise ValueError('Invalid byte range %s' % range_header)
 
-    try:
-        byte_range = parse_byte_range(request.headers['Range'])
-    except ValueError as error:
-        return abort(400, 'Invalid byte range')
-    first, last = byte_range
+    byte_ranges = []
+    for byte_range in ranges.split(','):
+        match = BYTE_RANGE_RE.match(byte_range.strip())
+        if not match or match.groups() == ('', ''):
+            raise ValueError('Invalid byte range %s' % range_header)
+        first, last = match.groups()
+        if not first:
+            # The last bytes of the file
+            length = min(int(last), file_len)
+            if length:
+                byte_ranges.append((file_len - length, file_len - 1))
+            continue
+        first = int(first)
+        if last and int(last) < first:
+            raise ValueError('Invalid byte range %s' % range_header)
+        if first < file_len:
+            last = min(int(last), file_len - 1) if last else file_len - 1
+            byte_ranges.append((first, last))
+    return byte_ranges
+
+
+def file_etag(file_stat):
+    """Return an etag from the modification time and size of a file"""
+    return '{0:x}-{1:x}'.format(int(file_stat.st_mtime * 1000), file_stat.st_size)
+
+
+def read_range(path, first, last, chunk_size=CHUNK_SIZE):
+    """Yield the bytes from first to last of a file in chunks"""
+    with open(path, 'rb') as file_handle:
+        file_handle.seek(first)
+        remaining = last - first + 1
+        while remaining > 0:
+            chunk = file_handle.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _part_header(boundary, content_type, first, last, file_len):
+    """Return the header of one part in a multipart/byteranges response"""
+    return ('\r\n--{0}\r\nContent-Type: {1}\r\nContent-Range: bytes {2}-{3}/{4}\r\n\r\n'
+            .format(boundary, content_type, first, last, file_len).encode())
 
+
+def multipart_ranges(path, byte_ranges, file_len, content_type, boundary):
+    """Yield the body of a multipart/byteranges response"""
+    for first, last in byte_ranges:
+        yield _part_header(boundary, content_type, first, last, file_len)
+        for chunk in read_range(path, first, last):
+            yield chunk
+    yield '\r\n--{0}--\r\n'.format(boundary).encode()
+
+
+def _if_range_matches(if_range, etag, last_modified):
+    """Check if the If-Range header refers to the current version of a file"""
+    if if_range == last_modified:
+        return True
+    if_range_etag, weak = unquote_etag(if_range)
+    return not weak and if_range_etag == etag
+
+
+def send_file_partial(path):
+    """Respond with the requested byte ranges of a file
+
+    Handles the Range, If-Range, If-None-Match and If-Modified-Since headers.
+    """
     try:
-        data = None
-        with open(path, 'rb') as file_handle:
-            fs = os.fstat(file_handle.fileno())
-            file_len = fs[6]
-            if first >= file_len:
-                return abort(416, 'Requested Range Not Satisfiable')
-
-            if last is None or last >= file_len:
-                last = file_len - 1
-            response_length = last - first + 1
-
-            file_handle.seek(first)
-            data = file_handle.read(response_length)
-    except IOError:
+        file_stat = os.stat(path)
+    except (IOError, OSError):
         return abort(404, 'File not found')
+    file_len = file_stat.st_size
+    etag = file_etag(file_stat)
+    last_modified = http_date(file_stat.st_mtime)
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+    range_header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if range_header and if_range and not _if_range_matches(if_range, etag, last_modified):
+        # The file has changed since the client fetched a part of it
+        range_header = None
+
+    byte_ranges = None
+    if range_header:
+        try:
+            byte_ranges = parse_byte_ranges(range_header, file_len)
+        except ValueError:
+            return abort(400, 'Invalid byte range')
+        if not byte_ranges:
+            resp = Response('Requested Range Not Satisfiable', 416)
+            resp.headers['Content-Range'] = 'bytes */%s' % file_len
+            return resp
+        if len(byte_ranges) > MAX_RANGES:
+            byte_ranges = None
 
-    resp = Response(data, 206, mimetype=mimetypes.guess_type(path)[0],
-                    direct_passthrough=True)
+    if not byte_ranges:
+        resp = Response(wrap_file(request.environ, open(path, 'rb'), CHUNK_SIZE),
+                        200, mimetype=content_type, direct_passthrough=True)
+        resp.headers['Content-Length'] = str(file_len)
+    elif len(byte_ranges) == 1:
+        first, last = byte_ranges[0]
+        resp = Response(read_range(path, first, last), 206, mimetype=content_type,
+                        direct_passthrough=True)
+        resp.headers['Content-Range'] = 'bytes %s-%s/%s' % (first, last, file_len)
+        resp.headers['Content-Length'] = str(last - first + 1)
+    else:
+        boundary = uuid.uuid4().hex
+        content_length = len('\r\n--{0}--\r\n'.format(boundary))
+        for first, last in byte_ranges:
+            content_length += len(_part_header(boundary, content_type, first, last,
+                                               file_len))
+            content_length += last - first + 1
+        resp = Response(multipart_ranges(path, byte_ranges, file_len, content_type,
+                                         boundary),
+                        206, direct_passthrough=True,
+                        content_type='multipart/byteranges; boundary=%s' % boundary)
+        resp.headers['Content-Length'] = str(content_length)
 
-    resp.headers.add('Content-type', 'application/octet-stream')
-    resp.headers.add('Accept-Ranges', 'bytes')
-    resp.headers.add('Content-Range',
-                     'bytes %s-%s/%s' % (first, last, file_len))
-    resp.headers.add('Content-Length', str(response_length))
+    resp.headers['Accept-Ranges'] = 'bytes'
+    resp.headers['Last-Modified'] = last_modified
+    resp.set_etag(etag)
+    if resp.status_code == 200:
+        # Answers If-None-Match and If-Modified-Since with 304 Not Modified
+        resp.make_conditional(request)
     return resp
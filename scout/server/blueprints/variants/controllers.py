@@ -8,6 +8,8 @@ from flask_mail import Message
 from scout.constants import (CLINSIG_MAP, ACMG_MAP, MANUAL_RANK_OPTIONS, ACMG_OPTIONS,
                              ACMG_COMPLETE_MAP, CALLERS)
 from scout.constants.acmg import ACMG_CRITERIA
+from scout.adapter.mongo.variant import (variant_keyset, case_variant_file, is_indexed,
+                                         OVERLAPPING_LIMIT, REGION_VCF_MAX_SPAN)
 from scout.models.event import VERBS_MAP
 from scout.server.utils import institute_and_case
 from .forms import CancerFiltersForm
@@ -19,38 +21,115 @@ class MissingSangerRecipientError(Exception):
     pass
 
 
-def variants(store, institute_obj, case_obj, variants_query, page=1, per_page=50):
+def parse_keyset(keyset_arg):
+    """Parse the keyset of the last variant on a page from a request argument
+
+    Args:
+        keyset_arg(str): '<sort value>:<variant _id>'
+
+    Returns:
+        keyset(tuple): None if the argument is missing or malformed
+    """
+    if not keyset_arg or ':' not in keyset_arg:
+        return None
+    value, variant_id = keyset_arg.split(':', 1)
+    try:
+        return (float(value), variant_id)
+    except ValueError:
+        log.warning("Malformed variant keyset: %s", keyset_arg)
+        return None
+
+
+def format_keyset(keyset):
+    """Format a keyset from variant_keyset as a request argument"""
+    return "{0}:{1}".format(*keyset)
+
+
+def page_variants(variants_query, page=1, per_page=50, after=None,
+                  sort_key='variant_rank'):
+    """Fetch one page of variants and the keyset of the next page
+
+    Instead of counting all variants one variant more than the page is
+    fetched to see if there are more variants. The query should start after
+    the last variant of the previous page, only links without a keyset skip
+    the variants of the earlier pages.
+
+    Returns:
+        variant_objs(list(dict)), next_after(str): next_after is None on the
+                                                   last page
+    """
+    if after is None:
+        variants_query = variants_query.skip(per_page * max(page - 1, 0))
+    variant_objs = list(variants_query.limit(per_page + 1))
+    next_after = None
+    if len(variant_objs) > per_page:
+        variant_objs = variant_objs[:per_page]
+        next_after = format_keyset(variant_keyset(variant_objs[-1], sort_key))
+    return variant_objs, next_after
+
+
+def variants(store, institute_obj, case_obj, variants_query, page=1, per_page=50,
+             after=None):
     """Pre-process list of variants."""
-    variant_count = variants_query.count()
-    skip_count = per_page * max(page - 1, 0)
-    more_variants = True if variant_count > (skip_count + per_page) else False
+    variant_objs, next_after = page_variants(variants_query, page, per_page, after)
+    resolved = resolve_variants(store, institute_obj, variant_objs)
 
     return {
-        'variants': (parse_variant(store, institute_obj, case_obj, variant_obj, update=True) for
-                     variant_obj in variants_query.skip(skip_count).limit(per_page)),
-        'more_variants': more_variants,
+        'variants': (parse_variant(store, institute_obj, case_obj, variant_obj,
+                                   resolved=resolved) for variant_obj in variant_objs),
+        'more_variants': next_after is not None,
+        'next_after': next_after,
     }
 
 
-def sv_variants(store, institute_obj, case_obj, variants_query, page=1, per_page=50):
+def sv_variants(store, institute_obj, case_obj, variants_query, page=1, per_page=50,
+                after=None):
     """Pre-process list of SV variants."""
-    skip_count = (per_page * max(page - 1, 0))
-    more_variants = True if variants_query.count() > (skip_count + per_page) else False
+    variant_objs, next_after = page_variants(variants_query, page, per_page, after)
+    resolved = resolve_variants(store, institute_obj, variant_objs)
 
     return {
-        'variants': (parse_variant(store, institute_obj, case_obj, variant) for variant in
-                     variants_query.skip(skip_count).limit(per_page)),
-        'more_variants': more_variants,
+        'variants': (parse_variant(store, institute_obj, case_obj, variant, resolved=resolved)
+                     for variant in variant_objs),
+        'more_variants': next_after is not None,
+        'next_after': next_after,
     }
 
 
-def sv_variant(store, institute_id, case_name, variant_id):
+def overlapping_variants(store, institute_obj, case_obj, variant_obj, after=None):
+    """Fetch a page of the variants that overlap a variant
+
+    Returns:
+        variant_objs(list(dict)), next_after(str): next_after is None on the
+                                                   last page
+    """
+    variant_objs, next_after = page_variants(
+        store.overlapping(variant_obj, after=after),
+        per_page=OVERLAPPING_LIMIT,
+        after=after,
+        sort_key='rank_score',
+    )
+    resolved = resolve_variants(store, institute_obj, variant_objs)
+    return ([parse_variant(store, institute_obj, case_obj, other_variant, resolved=resolved)
+             for other_variant in variant_objs], next_after)
+
+
+def sv_variant(store, institute_id, case_name, variant_id, overlapping_after=None):
     """Pre-process a SV variant entry for detail page."""
     institute_obj, case_obj = institute_and_case(store, institute_id, case_name)
     variant_obj = store.variant(variant_id)
 
     # fill in information for pilup view
     variant_case(store, case_obj, variant_obj)
+    # The sv vcf of the whole variant and of the regions around its ends
+    chrom = variant_obj['chromosome']
+    position = variant_obj['position']
+    end = variant_obj['end']
+    variant_obj['region_vcf_files'] = {
+        'variant': region_vcf_url(case_obj, chrom, position - 50, end + 50, 'sv'),
+        'start': region_vcf_url(case_obj, chrom, position - 500, position + 500, 'sv'),
+        'end': region_vcf_url(case_obj, chrom, end - 500, end + 500, 'sv'),
+    }
 
     # frequencies
     variant_obj['frequencies'] = [
@@ -64,8 +143,8 @@ def sv_variant(store, institute_id, case_name, variant_id):
     ]
 
     variant_obj['callers'] = callers(variant_obj, category='sv')
-    overlapping_snvs = (parse_variant(store, institute_obj, case_obj, variant) for variant in
-                        store.overlapping(variant_obj))
+    overlapping_snvs, overlapping_after = overlapping_variants(
+        store, institute_obj, case_obj, variant_obj, after=overlapping_after)
 
     variant_obj['comments'] = store.events(institute_obj, case=case_obj,
                                            variant_id=variant_obj['variant_id'], comments=True)
@@ -75,20 +154,61 @@ def sv_variant(store, institute_id, case_name, variant_id):
         'case': case_obj,
         'variant': variant_obj,
         'overlapping_snvs': overlapping_snvs,
+        'overlapping_after': overlapping_after,
         'manual_rank_options': MANUAL_RANK_OPTIONS,
     }
 
 
-def parse_variant(store, institute_obj, case_obj, variant_obj, update=False):
-    """Parse information about variants."""
-    has_changed = False
+def resolve_variants(store, institute_obj, variant_objs):
+    """Fetch what parse_variant looks up for a list of variants
+
+    The comments, compound variants and missing gene symbols of all the
+    variants are fetched with one query per collection, instead of a few
+    queries per variant.
+
+    Args:
+        store(MongoAdapter)
+        institute_obj(dict)
+        variant_objs(list(dict))
+
+    Returns:
+        resolved(dict): comments, compounds and hgnc_symbols
+    """
+    variant_ids = []
+    compound_ids = []
+    hgnc_ids = []
+    for variant_obj in variant_objs:
+        variant_ids.append(variant_obj['variant_id'])
+        compounds = variant_obj.get('compounds', [])
+        if compounds and 'not_loaded' not in compounds[0]:
+            compound_ids.extend(compound['variant'] for compound in compounds)
+        for gene_obj in variant_obj.get('genes') or []:
+            if gene_obj.get('hgnc_symbol') is None:
+                hgnc_ids.append(gene_obj['hgnc_id'])
+
+    return {
+        'comments': store.variants_comments(institute_obj, variant_ids),
+        'compounds': store.compound_variants(compound_ids),
+        'hgnc_symbols': store.hgnc_symbols(hgnc_ids),
+    }
+
+
+def parse_variant(store, institute_obj, case_obj, variant_obj, resolved=None):
+    """Parse information about variants.
+
+    If the variant is part of a list, resolved from resolve_variants is used
+    instead of looking up comments, compounds and genes for each variant.
+
+    The compounds are added when the variants are loaded. For variants that
+    were loaded before that they are added here, but not stored.
+    """
     compounds = variant_obj.get('compounds', [])
     if compounds:
         # Check if we need to add compound information
         if 'not_loaded' not in compounds[0]:
-            new_compounds = store.update_compounds(variant_obj)
+            new_compounds = store.update_compounds(
+                variant_obj, resolved['compounds'] if resolved else None)
             variant_obj['compounds'] = new_compounds
-            has_changed = True
 
         # sort compounds on combined rank score
         variant_obj['compounds'] = sorted(variant_obj['compounds'],
@@ -98,16 +218,20 @@ def parse_variant(store, institute_obj, case_obj, variant_obj, update=False):
     if variant_genes is not None:
         for gene_obj in variant_genes:
             if gene_obj.get('hgnc_symbol') is None:
-                hgnc_gene = store.hgnc_gene(gene_obj['hgnc_id'])
-                if hgnc_gene:
-                    has_changed = True
-                    gene_obj['hgnc_symbol'] = hgnc_gene['hgnc_symbol']
-
-    if update and has_changed:
-        variant_obj = store.update_variant(variant_obj)
-
-    variant_obj['comments'] = store.events(institute_obj, case=case_obj,
-                                           variant_id=variant_obj['variant_id'], comments=True)
+                if resolved:
+                    hgnc_symbol = resolved['hgnc_symbols'].get(gene_obj['hgnc_id'])
+                else:
+                    hgnc_gene = store.hgnc_gene(gene_obj['hgnc_id'])
+                    hgnc_symbol = hgnc_gene['hgnc_symbol'] if hgnc_gene else None
+                if hgnc_symbol:
+                    gene_obj['hgnc_symbol'] = hgnc_symbol
+
+    if resolved:
+        variant_obj['comments'] = resolved['comments'].get(variant_obj['variant_id'], [])
+    else:
+        variant_obj['comments'] = store.events(institute_obj, case=case_obj,
+                                               variant_id=variant_obj['variant_id'],
+                                               comments=True)
 
     if variant_genes:
         variant_obj.update(get_predictions(variant_genes))
@@ -159,23 +283,34 @@ def variant_case(store, case_obj, variant_obj):
         else:
             log.debug("%s: no bam file found", individual['individual_id'])
 
-    try:
-        genes = variant_obj.get('genes', [])
-        if len(genes) == 1:
-            hgnc_gene_obj = store.hgnc_gene(variant_obj['genes'][0]['hgnc_id'])
-            if hgnc_gene_obj:
-                vcf_path = store.get_region_vcf(case_obj, gene_obj=hgnc_gene_obj)
-                case_obj['region_vcf_file'] = vcf_path
-            else:
-                case_obj['region_vcf_file'] = None
-        elif len(genes) > 1:
-            chrom = variant_obj['genes'][0]['common']['chromosome']
-            start = min(gene['common']['start'] for gene in variant_obj['genes'])
-            end = max(gene['common']['end'] for gene in variant_obj['genes'])
-            vcf_path = store.get_region_vcf(case_obj, chrom=chrom, start=start, end=end)
-            case_obj['region_vcf_file'] = vcf_path
-    except (SyntaxError, Exception):
-        log.warning("skip VCF region for alignment view")
+    # The alignment viewer fetches the variants of the genes from region_vcf
+    case_obj['region_vcf_file'] = None
+    genes = [gene['common'] for gene in variant_obj.get('genes', []) if gene.get('common')]
+    if genes:
+        case_obj['region_vcf_file'] = region_vcf_url(
+            case_obj,
+            chrom=genes[0]['chromosome'],
+            start=min(gene['start'] for gene in genes),
+            end=max(gene['end'] for gene in genes),
+        )
+
+
+def region_vcf_url(case_obj, chrom, start, end, category='snv'):
+    """Return the url of the variants of a region for the alignment viewer
+
+    Returns:
+        url(str): None if the vcf of the case is missing or not indexed, or if
+                  the region is longer than REGION_VCF_MAX_SPAN
+    """
+    variant_file = case_variant_file(case_obj, category=category)
+    if not (variant_file and is_indexed(variant_file)):
+        return None
+    start = max(start, 1)
+    if end - start > REGION_VCF_MAX_SPAN:
+        return None
+    return url_for('variants.region_vcf', institute_id=case_obj['owner'],
+                   case_name=case_obj['display_name'], chrom=chrom, start=start,
+                   end=end, category=category)
 
 
 def find_bai_file(bam_file):
@@ -187,7 +322,7 @@ def find_bai_file(bam_file):
     return bai_file
 
 
-def variant(store, institute_obj, case_obj, variant_id):
+def variant(store, institute_obj, case_obj, variant_id, overlapping_after=None):
     """Pre-process a single variant."""
     default_panels = [store.panel(panel['panel_id']) for panel in
                       case_obj['panels'] if panel.get('is_default')]
@@ -249,6 +384,9 @@ def variant(store, institute_obj, case_obj, variant_id):
         variant_models = set(model.split('_', 1)[0] for model in variant_obj['genetic_models'])
         variant_obj['is_matching_inheritance'] = variant_models & gene_models
 
+    overlapping_svs, overlapping_after = overlapping_variants(
+        store, institute_obj, case_obj, variant_obj, after=overlapping_after)
+
     evaluations = []
     for evaluation_obj in store.get_evaluations(variant_obj):
         evaluation(store, evaluation_obj)
@@ -257,8 +395,8 @@ def variant(store, institute_obj, case_obj, variant_id):
         'variant': variant_obj,
         'causatives': other_causatives,
         'events': events,
-        'overlapping_svs': (parse_variant(store, institute_obj, case_obj, variant_obj) for
-                            variant_obj in store.overlapping(variant_obj)),
+        'overlapping_svs': overlapping_svs,
+        'overlapping_after': overlapping_after,
         'manual_rank_options': MANUAL_RANK_OPTIONS,
         'ACMG_OPTIONS': ACMG_OPTIONS,
         'evaluations': evaluations,
@@ -540,11 +678,13 @@ def cancer_variants(store, request_args, institute_id, case_name):
     institute_obj, case_obj = institute_and_case(store, institute_id, case_name)
     form = CancerFiltersForm(request_args)
     variants_query = store.variants(case_obj['_id'], category='cancer', query=form.data).limit(50)
+    variant_objs = list(variants_query)
+    resolved = resolve_variants(store, institute_obj, variant_objs)
     data = dict(
         institute=institute_obj,
         case=case_obj,
-        variants=(parse_variant(store, institute_obj, case_obj, variant, update=True) for
-                  variant in variants_query),
+        variants=(parse_variant(store, institute_obj, case_obj, variant,
+                                resolved=resolved) for variant in variant_objs),
         form=form,
         variant_type=request_args.get('variant_type', 'clinical'),
     )
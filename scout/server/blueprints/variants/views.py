@@ -2,12 +2,14 @@
 import io
 import logging
 
-from flask import Blueprint, request, redirect, abort, flash, current_app, url_for, jsonify
+from flask import (Blueprint, request, redirect, abort, flash, current_app, url_for, jsonify,
+                   Response)
 from flask_login import current_user
 
 from scout.constants import SEVERE_SO_TERMS
 from scout.constants.acmg import ACMG_CRITERIA
 from scout.constants import ACMG_MAP
+from scout.adapter.mongo.variant import REGION_VCF_MAX_SPAN
 from scout.server.extensions import store, mail, loqusdb
 from scout.server.utils import templated, institute_and_case, public_endpoint
 from scout.utils.acmg import get_acmg
@@ -64,8 +66,10 @@ def variants(institute_id, case_name):
                                case_obj['dynamic_gene_list']))
         form.hgnc_symbols.data = hpo_symbols
 
-    variants_query = store.variants(case_obj['_id'], query=form.data)
-    data = controllers.variants(store, institute_obj, case_obj, variants_query, page)
+    after = controllers.parse_keyset(request.args.get('after'))
+    variants_query = store.variants(case_obj['_id'], query=form.data, after=after)
+    data = controllers.variants(store, institute_obj, case_obj, variants_query, page,
+                                after=after)
 
     return dict(institute=institute_obj, case=case_obj, form=form,
                 severe_so_terms=SEVERE_SO_TERMS, page=page, **data)
@@ -76,7 +80,9 @@ def variants(institute_id, case_name):
 def variant(institute_id, case_name, variant_id):
     """Display a specific SNV variant."""
     institute_obj, case_obj = institute_and_case(store, institute_id, case_name)
-    data = controllers.variant(store, institute_obj, case_obj, variant_id)
+    overlapping_after = controllers.parse_keyset(request.args.get('overlapping_after'))
+    data = controllers.variant(store, institute_obj, case_obj, variant_id,
+                               overlapping_after=overlapping_after)
     if data is None:
         return abort(404)
     if current_app.config.get('LOQUSDB_SETTINGS'):
@@ -85,6 +91,32 @@ def variant(institute_id, case_name, variant_id):
     return dict(institute=institute_obj, case=case_obj, **data)
 
 
+@variants_bp.route('/<institute_id>/<case_name>/region.vcf')
+def region_vcf(institute_id, case_name):
+    """Serve the variants of a region as a vcf for the alignment viewer."""
+    institute_obj, case_obj = institute_and_case(store, institute_id, case_name)
+    chrom = request.args.get('chrom')
+    start = request.args.get('start', type=int)
+    end = request.args.get('end', type=int)
+    if not chrom or start is None or end is None:
+        return abort(400)
+    if not 0 <= end - start <= REGION_VCF_MAX_SPAN:
+        return abort(400)
+    try:
+        vcf_text = store.get_region_vcf(
+            case_obj,
+            chrom=chrom,
+            start=start,
+            end=end,
+            variant_type=request.args.get('variant_type', 'clinical'),
+            category=request.args.get('category', 'snv'),
+        )
+    except (SyntaxError, OSError) as error:
+        log.warning("No region vcf for %s: %s", case_name, error)
+        return abort(404)
+    return Response(vcf_text, mimetype='text/plain')
+
+
 @variants_bp.route('/<institute_id>/<case_name>/sv/variants')
 @templated('variants/sv-variants.html')
 def sv_variants(institute_id, case_name):
@@ -100,8 +132,11 @@ def sv_variants(institute_id, case_name):
     form.gene_panels.choices = panel_choices
     query = form.data
     query['variant_type'] = variant_type
-    variants_query = store.variants(case_obj['_id'], category='sv', query=form.data)
-    data = controllers.sv_variants(store, institute_obj, case_obj, variants_query, page)
+    after = controllers.parse_keyset(request.args.get('after'))
+    variants_query = store.variants(case_obj['_id'], category='sv', query=form.data,
+                                    after=after)
+    data = controllers.sv_variants(store, institute_obj, case_obj, variants_query, page,
+                                   after=after)
     return dict(institute=institute_obj, case=case_obj, variant_type=variant_type,
                 form=form, severe_so_terms=SEVERE_SO_TERMS, page=page, **data)
 
@@ -110,7 +145,9 @@ def sv_variants(institute_id, case_name):
 @templated('variants/sv-variant.html')
 def sv_variant(institute_id, case_name, variant_id):
     """Display a specific structural variant."""
-    data = controllers.sv_variant(store, institute_id, case_name, variant_id)
+    overlapping_after = controllers.parse_keyset(request.args.get('overlapping_after'))
+    data = controllers.sv_variant(store, institute_id, case_name, variant_id,
+                                  overlapping_after=overlapping_after)
     return data
 
 
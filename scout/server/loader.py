@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Identity maps for the documents that a request looks up.
+
+Pages show the same users, institutes, panels and variants for many cases.
+The loader of a request fetches each document at most once, and the ids
+that are asked for together are fetched with one query.
+"""
+from flask import g
+
+
+class RequestLoader(object):
+
+    """Documents that are fetched during one request"""
+
+    def __init__(self, store):
+        self.store = store
+        self._identity_maps = {
+            'users': {},
+            'institutes': {},
+            'panels': {},
+            'variants': {},
+        }
+
+    def _load(self, name, ids, fetch_function):
+        """Return documents from an identity map, fetch the missing ones
+
+        Args:
+            name(str): Name of the identity map
+            ids(iterable)
+            fetch_function(function): Takes a list of ids and returns
+                                      {<id>: <document>}
+
+        Returns:
+            documents(dict): {<id>: <document>}, None for missing documents
+        """
+        ids = list(ids)
+        identity_map = self._identity_maps[name]
+        missing = [document_id for document_id in set(ids) if document_id not in identity_map]
+        if missing:
+            fetched = fetch_function(missing)
+            for document_id in missing:
+                identity_map[document_id] = fetched.get(document_id)
+        return {document_id: identity_map[document_id] for document_id in ids}
+
+    def users(self, emails):
+        """Return {<email>: <user_obj>}"""
+        return self._load('users', emails, self.store.users_by_email)
+
+    def institutes(self, institute_ids):
+        """Return {<institute_id>: <institute_obj>}"""
+        return self._load('institutes', institute_ids, self.store.institutes_by_id)
+
+    def all_institutes(self):
+        """Return all institutes, they are added to the identity map"""
+        institute_objs = list(self.store.institutes())
+        self._identity_maps['institutes'].update(
+            (institute_obj['_id'], institute_obj) for institute_obj in institute_objs)
+        return institute_objs
+
+    def panels(self, panel_ids):
+        """Return {<panel_id>: <panel_obj>}"""
+        return self._load('panels', panel_ids, self.store.panels_by_id)
+
+    def variants(self, document_ids):
+        """Return {<document_id>: <variant_obj>}"""
+        return self._load('variants', document_ids, self.store.variants_by_id)
+
+
+def request_loader(store):
+    """Return the loader of the current request"""
+    loader = getattr(g, 'request_loader', None)
+    if loader is None:
+        loader = g.request_loader = RequestLoader(store)
+    return loader
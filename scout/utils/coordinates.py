@@ -41,3 +41,58 @@ def check_coordinates(chromosome, pos, coordinates):
         return True
 
     return False
+
+
+# The standard UCSC binning scheme. Bins of 128 kb on the lowest level and
+# eight times larger bins on each level above, up to one bin of 512 Mb.
+BIN_OFFSETS = (512 + 64 + 8 + 1, 64 + 8 + 1, 8 + 1, 1, 0)
+BIN_FIRST_SHIFT = 17
+BIN_NEXT_SHIFT = 3
+MAX_BIN_POSITION = 1 << (BIN_FIRST_SHIFT + BIN_NEXT_SHIFT * (len(BIN_OFFSETS) - 1))
+
+
+def _bin_range(start, end):
+    """Return the first and last position of an interval, within the binned range"""
+    start, end = min(start, end), max(start, end)
+    start = min(max(start, 1), MAX_BIN_POSITION)
+    end = min(max(end, 1), MAX_BIN_POSITION)
+    # The bins are calculated on 0-based, half open coordinates
+    return (start - 1) >> BIN_FIRST_SHIFT, (end - 1) >> BIN_FIRST_SHIFT
+
+
+def genomic_bin(start, end):
+    """Return the smallest bin that holds an interval
+
+    Args:
+        start(int): 1-based position
+        end(int): 1-based position, inclusive
+
+    Returns:
+        bin_nr(int)
+    """
+    start_bin, end_bin = _bin_range(start, end)
+    for offset in BIN_OFFSETS:
+        if start_bin == end_bin:
+            return offset + start_bin
+        start_bin >>= BIN_NEXT_SHIFT
+        end_bin >>= BIN_NEXT_SHIFT
+    return 0
+
+
+def overlapping_bins(start, end):
+    """Return the bins of all intervals that can overlap an interval
+
+    Args:
+        start(int): 1-based position
+        end(int): 1-based position, inclusive
+
+    Returns:
+        bin_nrs(list(int))
+    """
+    start_bin, end_bin = _bin_range(start, end)
+    bin_nrs = []
+    for offset in BIN_OFFSETS:
+        bin_nrs.extend(range(offset + start_bin, offset + end_bin + 1))
+        start_bin >>= BIN_NEXT_SHIFT
+        end_bin >>= BIN_NEXT_SHIFT
+    return bin_nrs
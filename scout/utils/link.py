@@ -1,5 +1,6 @@
 import sys
 import logging
+import multiprocessing
 
 from pprint import pprint as pp
 
@@ -8,9 +9,13 @@ from scout.parse.ensembl import parse_ensembl_transcripts
 from scout.parse.exac import parse_exac_genes
 from scout.parse.hpo import get_incomplete_penetrance_genes
 from scout.parse.omim import get_mim_genes
+from scout.utils.handle import get_file_handle
 
 log = logging.getLogger(__name__)
 
+# The gene fields that are used to link genes to ensembl transcripts
+ENSEMBL_LINK_FIELDS = ('ensembl_gene_id', 'hgnc_symbol', 'ref_seq')
+
 
 def genes_by_alias(hgnc_genes):
     """Return a dictionary with hgnc symbols as keys
@@ -118,33 +123,30 @@ def add_ensembl_info(gene_info, ensembl_transcripts):
 
 
 
-def link_genes(ensembl_lines, hgnc_lines, exac_lines, mim2gene_lines,
-               genemap_lines, hpo_lines):
-    """Gather information from different sources and return a gene dict
-
-    Extract information collected from a number of sources and combine them
-    into a gene dict with HGNC symbols as keys.
+def parse_reference_genes(hgnc_lines, exac_lines, mim2gene_lines, genemap_lines,
+                          hpo_lines):
+    """Gather the gene information that is the same in all genome builds
 
     hgnc_id works as the primary symbol and it is from this source we gather
     as much information as possible (hgnc_complete_set.txt)
 
-    Coordinates are gathered from ensemble and the entries are linked from hgnc
-    to ensembl via ENSGID.
-
     From exac the gene intolerance scores are collected, genes are linked to hgnc
     via hgnc symbol. This is a unstable symbol since they often change.
 
+    The coordinates and transcripts are added per build with link_build.
 
         Args:
-            ensembl_lines(iterable(str))
             hgnc_lines(iterable(str))
             exac_lines(iterable(str))
+            mim2gene_lines(iterable(str))
+            genemap_lines(iterable(str))
+            hpo_lines(iterable(str))
 
-        Yields:
-            gene(dict): A dictionary with gene information
+        Returns:
+            genes(dict): A dictionary with hgnc_id as key and gene info as value
     """
     genes = {}
-    log.info("Linking genes and transcripts")
+    log.info("Parsing hgnc genes")
     # HGNC genes are the main source, these define the gene dataset to use
     # Try to use as much information as possible from hgnc
     for hgnc_gene in parse_hgnc_genes(hgnc_lines):
@@ -153,29 +155,6 @@ def link_genes(ensembl_lines, hgnc_lines, exac_lines, mim2gene_lines,
         genes[hgnc_id] = hgnc_gene
 
     symbol_to_id = genes_by_alias(genes)
-    # Parse and add the ensembl gene info
-    all_genes = {'ensembl': {}, 'symbol': {}}
-    for transcript in parse_ensembl_transcripts(ensembl_lines):
-        ensg_symbol = transcript['hgnc_symbol']
-        ensgid = transcript['ensembl_gene_id']
-        for id_type, gene_id in [('symbol', ensg_symbol), ('ensembl', ensgid)]:
-            if gene_id in all_genes[id_type]:
-                all_genes[id_type][gene_id].append(transcript)
-            else:
-                all_genes[id_type][gene_id] = [transcript]
-
-    log.info("Add ensembl info")
-    # Add gene coordinates and transcript info for hgnc genes:
-    for gene_info in genes.values():
-        ensgid = gene_info['ensembl_gene_id']
-        ensg_symbol = gene_info['hgnc_symbol']
-
-        for id_type, gene_id in [('ensembl', ensgid), ('symbol', ensg_symbol)]:
-            if gene_id:
-                if gene_id in all_genes[id_type]:
-                    add_ensembl_info(gene_info, all_genes[id_type][gene_id])
-                    ensgid = 'ADDED'
-                    break
 
     log.info("Add exac pli scores")
     for exac_gene in parse_exac_genes(exac_lines):
@@ -245,3 +224,136 @@ def link_genes(ensembl_lines, hgnc_lines, exac_lines, mim2gene_lines,
                         gene_info['incomplete_penetrance'] = True
 
     return genes
+
+
+def read_reference_genes(hgnc_path, exac_path, mim2gene_path, genemap_path,
+                         hpo_path):
+    """Run parse_reference_genes on files
+
+        Returns:
+            genes(dict): A dictionary with hgnc_id as key and gene info as value
+    """
+    return parse_reference_genes(
+        hgnc_lines=get_file_handle(hgnc_path),
+        exac_lines=get_file_handle(exac_path),
+        mim2gene_lines=get_file_handle(mim2gene_path),
+        genemap_lines=get_file_handle(genemap_path),
+        hpo_lines=get_file_handle(hpo_path),
+    )
+
+
+def ensembl_gene_info(genes, ensembl_lines):
+    """Return the coordinates and transcripts of the genes in one build
+
+    Coordinates are gathered from ensembl and the entries are linked from hgnc
+    to ensembl via ENSGID, or via the hgnc symbol.
+
+        Args:
+            genes(dict): hgnc_id as key, with at least the ENSEMBL_LINK_FIELDS
+            ensembl_lines(iterable(str))
+
+        Returns:
+            ensembl_info(dict): {<hgnc_id>: {'chromosome', 'start', 'end',
+                                'transcripts'}} for the genes found in ensembl
+    """
+    log.info("Parsing ensembl transcripts")
+    all_genes = {'ensembl': {}, 'symbol': {}}
+    for transcript in parse_ensembl_transcripts(ensembl_lines):
+        ensg_symbol = transcript['hgnc_symbol']
+        ensgid = transcript['ensembl_gene_id']
+        for id_type, gene_id in [('symbol', ensg_symbol), ('ensembl', ensgid)]:
+            if gene_id in all_genes[id_type]:
+                all_genes[id_type][gene_id].append(transcript)
+            else:
+                all_genes[id_type][gene_id] = [transcript]
+
+    log.info("Add ensembl info")
+    ensembl_info = {}
+    for hgnc_id, gene_info in genes.items():
+        ensgid = gene_info['ensembl_gene_id']
+        ensg_symbol = gene_info['hgnc_symbol']
+
+        for id_type, gene_id in [('ensembl', ensgid), ('symbol', ensg_symbol)]:
+            if gene_id and gene_id in all_genes[id_type]:
+                build_info = {'ref_seq': gene_info['ref_seq'], 'transcripts': []}
+                add_ensembl_info(build_info, all_genes[id_type][gene_id])
+                del build_info['ref_seq']
+                ensembl_info[hgnc_id] = build_info
+                break
+    return ensembl_info
+
+
+def link_build(genes, ensembl_info):
+    """Return copies of the genes with the coordinates and transcripts of a build
+
+        Args:
+            genes(dict): From parse_reference_genes
+            ensembl_info(dict): From ensembl_gene_info
+
+        Returns:
+            build_genes(dict)
+    """
+    return {hgnc_id: dict(gene_info, **ensembl_info.get(hgnc_id, {}))
+            for hgnc_id, gene_info in genes.items()}
+
+
+def _ensembl_gene_info_file(genes, ensembl_path):
+    """Run ensembl_gene_info on a file, in a worker process"""
+    return ensembl_gene_info(genes, get_file_handle(ensembl_path))
+
+
+def link_builds(genes, ensembl_paths, workers=None):
+    """Add the coordinates and transcripts of several builds to the genes
+
+    The ensembl files are parsed and linked in one process per build. Only the
+    fields that are needed for linking are sent to the processes.
+
+        Args:
+            genes(dict): From parse_reference_genes
+            ensembl_paths(dict): {<build>: <path to ensembl transcripts>}
+            workers(int): Number of processes, defaults to one per build. With
+                          one worker the builds are linked in this process
+
+        Returns:
+            build_genes(dict): {<build>: <genes>}
+    """
+    builds = list(ensembl_paths)
+    link_genes = {hgnc_id: {field: gene_info[field] for field in ENSEMBL_LINK_FIELDS}
+                  for hgnc_id, gene_info in genes.items()}
+    arguments = [(link_genes, ensembl_paths[build]) for build in builds]
+    workers = workers or len(builds)
+    if workers > 1:
+        with multiprocessing.Pool(min(workers, len(builds))) as pool:
+            results = pool.starmap(_ensembl_gene_info_file, arguments)
+    else:
+        results = [_ensembl_gene_info_file(*args) for args in arguments]
+    return {build: link_build(genes, ensembl_info)
+            for build, ensembl_info in zip(builds, results)}
+
+
+def link_genes(ensembl_lines, hgnc_lines, exac_lines, mim2gene_lines,
+               genemap_lines, hpo_lines):
+    """Gather information from different sources and return a gene dict
+
+    Extract information collected from a number of sources and combine them
+    into a gene dict with HGNC symbols as keys.
+
+    See parse_reference_genes and ensembl_gene_info.
+
+        Args:
+            ensembl_lines(iterable(str))
+            hgnc_lines(iterable(str))
+            exac_lines(iterable(str))
+
+        Returns:
+            genes(dict): A dictionary with hgnc_id as key and gene info as value
+    """
+    log.info("Linking genes and transcripts")
+    genes = parse_reference_genes(
+        hgnc_lines=hgnc_lines,
+        exac_lines=exac_lines,
+        mim2gene_lines=mim2gene_lines,
+        genemap_lines=genemap_lines,
+        hpo_lines=hpo_lines,
+    )
+    return link_build(genes, ensembl_gene_info(genes, ensembl_lines))
@@ -13,11 +13,69 @@ def generate_md5_key(list_of_arguments):
     Returns:
         A md5-key object generated from the list of strings.
     """
+    check_md5_arguments(list_of_arguments)
+
+    hash = hashlib.md5()
+    hash.update(' '.join(list_of_arguments).encode('utf-8'))
+    return hash.hexdigest()
+
+
+def check_md5_arguments(list_of_arguments):
+    """Raise SyntaxError if any of the arguments is not a string"""
     for arg in list_of_arguments:
         if not isinstance(arg, string_types):
             raise SyntaxError("Error in generate_md5_key: "
                               "Argument: {0} is a {1}".format(arg, type(arg)))
 
-    hash = hashlib.md5()
-    hash.update(' '.join(list_of_arguments).encode('utf-8'))
-    return hash.hexdigest()
+
+def generate_md5_keys(list_of_arguments, extra_argument):
+    """Generate the md5-keys for a list of arguments with and without one more
+
+    Gives the same keys as generate_md5_key(list_of_arguments) and
+    generate_md5_key(list_of_arguments + [extra_argument]), but the start
+    that the keys share is only hashed once.
+
+    Args:
+        list_of_arguments: A list of strings
+        extra_argument(str): Is added last to the second key
+
+    Returns:
+        key(str), extended_key(str)
+    """
+    check_md5_arguments(list_of_arguments + [extra_argument])
+    hash = hashlib.md5(' '.join(list_of_arguments).encode('utf-8'))
+    key = hash.hexdigest()
+    hash.update((' ' + extra_argument).encode('utf-8'))
+    return key, hash.hexdigest()
+
+
+def md5_key_suffix(list_of_arguments):
+    """Return the end of a md5-key string for arguments that are reused
+
+    Used with generate_suffixed_md5_key to check and join the arguments that
+    are the same for many keys, like variant type and case id, only once.
+
+    Args:
+        list_of_arguments: A list of strings
+
+    Returns:
+        key_suffix(str)
+    """
+    check_md5_arguments(list_of_arguments)
+    return ''.join(' ' + arg for arg in list_of_arguments)
+
+
+def generate_suffixed_md5_key(key_start, key_suffix):
+    """Generate an md5-key from a joined string and a suffix from md5_key_suffix
+
+    generate_suffixed_md5_key(' '.join(args), md5_key_suffix(suffix_args)) is
+    the same as generate_md5_key(args + suffix_args).
+
+    Args:
+        key_start(str): The first arguments joined with spaces
+        key_suffix(str)
+
+    Returns:
+        A md5-key(str)
+    """
+    return hashlib.md5((key_start + key_suffix).encode('utf-8')).hexdigest()
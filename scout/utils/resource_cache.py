@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+On disk cache of parsed resource files.
+
+Parsing the gene, transcript, omim and hpo files takes much longer than reading
+the result back. The parsed result is pickled in the cache directory under a
+key from the content of the files, so a changed file is parsed again and the
+old result is removed.
+
+The cache directory is SCOUT_CACHE_DIR, or scout in the users cache directory.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+
+from scout import __version__
+
+log = logging.getLogger(__name__)
+
+# Change when the parsed format changes, to not read results of older parsers.
+# Results are also kept apart per scout version, see resource_key
+CACHE_VERSION = '1'
+
+READ_SIZE = 1024 * 1024
+
+# Digests of files, by path, size and modification time
+_file_digests = {}
+
+
+def default_cache_dir():
+    """Return the directory of the resource cache"""
+    if os.environ.get('SCOUT_CACHE_DIR'):
+        return os.environ['SCOUT_CACHE_DIR']
+    user_cache = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(user_cache, 'scout')
+
+
+def file_digest(path):
+    """Return the sha1 digest of the content of a file
+
+    The digest is kept as long as the size and modification time of the file
+    are the same, so each file is read once per process.
+    """
+    file_stat = os.stat(path)
+    stat_key = (os.path.abspath(path), file_stat.st_size, file_stat.st_mtime)
+    if stat_key not in _file_digests:
+        digest = hashlib.sha1()
+        with open(path, 'rb') as file_handle:
+            for chunk in iter(lambda: file_handle.read(READ_SIZE), b''):
+                digest.update(chunk)
+        _file_digests[stat_key] = digest.hexdigest()
+    return _file_digests[stat_key]
+
+
+def resource_key(name, paths):
+    """Return the cache key of a result that is parsed from files
+
+    The key changes with the content of the files and with the scout version,
+    so an upgrade that changes a parser never reads an older result.
+    """
+    key = hashlib.sha1(' '.join([name, CACHE_VERSION, __version__]).encode('utf-8'))
+    for path in paths:
+        key.update(file_digest(path).encode('utf-8'))
+    return key.hexdigest()
+
+
+def cached_resource(name, paths, build_function, cache_dir=None):
+    """Return a result that is parsed from files, from the cache if possible
+
+    A result that can not be read from the cache is built and stored. If the
+    cache directory can not be written the result is returned anyway.
+
+    Args:
+        name(str): What is parsed, results with the same name and other keys
+                   are removed when a new result is stored
+        paths(list(str)): The files that the result is parsed from
+        build_function(function): Parses the files, without arguments
+        cache_dir(str): Defaults to default_cache_dir()
+
+    Returns:
+        result
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    file_name = '{0}-{1}.pickle'.format(name, resource_key(name, paths))
+    cache_path = os.path.join(cache_dir, file_name)
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            result = pickle.load(cache_file)
+        log.info("Read %s from %s", name, cache_path)
+        return result
+    except FileNotFoundError:
+        pass
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError,
+            ImportError) as err:
+        log.warning("Could not read %s from the cache: %s", name, err)
+
+    result = build_function()
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Written to a temporary file first so that processes that run at the
+        # same time never read a half written result
+        with tempfile.NamedTemporaryFile(dir=cache_dir, suffix='.tmp',
+                                         delete=False) as cache_file:
+            pickle.dump(result, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(cache_file.name, cache_path)
+        log.info("Stored %s in %s", name, cache_path)
+        for old_name in os.listdir(cache_dir):
+            if old_name.startswith(name + '-') and old_name != file_name:
+                os.remove(os.path.join(cache_dir, old_name))
+    except OSError as err:
+        log.warning("Could not store %s in the cache: %s", name, err)
+    return result
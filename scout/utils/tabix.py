@@ -0,0 +1,96 @@
+"""
+Read the sequence names and record counts from a tabix or csi index.
+
+The names are taken from the index and not from the vcf header since a vcf
+can have records on contigs that the header does not declare.
+"""
+import gzip
+import os
+import struct
+
+# The pseudo bin in a tabix index that holds the number of records
+TBI_PSEUDO_BIN = 37450
+
+
+def _read(fmt, data, offset):
+    """Unpack fmt from data at offset, return the values and the new offset"""
+    values = struct.unpack_from(fmt, data, offset)
+    return values, offset + struct.calcsize(fmt)
+
+
+def _parse_names(data, offset, l_nm):
+    """Return the null separated sequence names"""
+    names = data[offset:offset + l_nm].split(b'\x00')
+    return [name.decode('utf-8') for name in names if name]
+
+
+def _parse_references(data, offset, n_ref, pseudo_bin, csi=False):
+    """Return the number of records per reference from the pseudo bins
+
+    Returns:
+        nr_records(list(int)): None for a reference without a pseudo bin
+    """
+    nr_records = []
+    for _ in range(n_ref):
+        (n_bin,), offset = _read('<i', data, offset)
+        records = None
+        for _ in range(n_bin):
+            (bin_nr,), offset = _read('<I', data, offset)
+            if csi:
+                # The linear offset of the bin
+                offset += 8
+            (n_chunk,), offset = _read('<i', data, offset)
+            if bin_nr == pseudo_bin and n_chunk == 2:
+                (_, _, n_mapped, _), _ = _read('<4Q', data, offset)
+                records = n_mapped
+            offset += n_chunk * 16
+        if not csi:
+            (n_intv,), offset = _read('<i', data, offset)
+            offset += n_intv * 8
+        nr_records.append(records)
+    return nr_records
+
+
+def _parse_tbi(data):
+    """Parse the content of a .tbi file"""
+    (n_ref, _, _, _, _, _, _, l_nm), offset = _read('<8i', data, 4)
+    names = _parse_names(data, offset, l_nm)
+    nr_records = _parse_references(data, offset + l_nm, n_ref, TBI_PSEUDO_BIN)
+    return list(zip(names, nr_records))
+
+
+def _parse_csi(data):
+    """Parse the content of a .csi file"""
+    (min_shift, depth, l_aux), offset = _read('<3i', data, 4)
+    names = []
+    if l_aux >= 28:
+        # Tabix style meta data with the sequence names
+        (_, _, _, _, _, _, l_nm), aux_offset = _read('<7i', data, offset)
+        names = _parse_names(data, aux_offset, l_nm)
+    offset += l_aux
+    (n_ref,), offset = _read('<i', data, offset)
+    pseudo_bin = ((1 << (3 * depth + 3)) - 1) // 7 + 1
+    nr_records = _parse_references(data, offset, n_ref, pseudo_bin, csi=True)
+    return list(zip(names, nr_records))
+
+
+def index_sequences(variant_file):
+    """Return the sequences in the index of a bgzipped vcf
+
+    Args:
+        variant_file(str): Path to a vcf with a .tbi or .csi index
+
+    Returns:
+        sequences(list(tuple)): [(<name(str)>, <nr records(int) or None>), ...]
+                                empty if there is no index that can be read
+    """
+    for suffix, parse_function in (('.tbi', _parse_tbi), ('.csi', _parse_csi)):
+        index_path = variant_file + suffix
+        if not os.path.exists(index_path):
+            continue
+        with gzip.open(index_path, 'rb') as index_file:
+            data = index_file.read()
+        if data[:4] != suffix[1:].upper().encode() + b'\x01':
+            continue
+        return parse_function(data)
+    return []
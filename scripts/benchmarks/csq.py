@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+csq.py
+
+Compare the time it takes to decode the VEP CSQ entries of a vcf by zipping
+every transcript with the whole header, the old way, with the column based
+decoding used by parse_variant.
+
+Runs on the demo vcfs if no files are given.
+
+"""
+import time
+
+import click
+from cyvcf2 import VCF
+
+from scout.demo import (clinical_snv_path, research_snv_path, clinical_sv_path,
+                        research_sv_path)
+from scout.parse.variant.headers import parse_vep_header
+from scout.parse.variant.csq import (parse_csq_columns, parse_csq_transcripts)
+from scout.parse.variant.transcript import parse_transcripts
+
+
+def read_csq_entries(vcf_path):
+    """Return the vep header and all CSQ entries of a vcf"""
+    vcf_obj = VCF(vcf_path)
+    vep_header = parse_vep_header(vcf_obj)
+    csq_entries = [variant.INFO.get('CSQ') for variant in vcf_obj]
+    return vep_header, [entry for entry in csq_entries if entry]
+
+
+def zip_transcripts(csq_entries, vep_header):
+    """Decode all transcripts by zipping them with the header"""
+    nr_transcripts = 0
+    for csq_entry in csq_entries:
+        raw_transcripts = (dict(zip(vep_header, transcript_info.split('|')))
+                           for transcript_info in csq_entry.split(','))
+        for _ in parse_transcripts(raw_transcripts):
+            nr_transcripts += 1
+    return nr_transcripts
+
+
+def column_transcripts(csq_entries, vep_header):
+    """Decode all transcripts with precomputed columns"""
+    nr_transcripts = 0
+    csq_columns = parse_csq_columns(vep_header)
+    for csq_entry in csq_entries:
+        raw_transcripts = parse_csq_transcripts(csq_entry, csq_columns)
+        for _ in parse_transcripts(raw_transcripts):
+            nr_transcripts += 1
+    return nr_transcripts
+
+
+@click.command()
+@click.argument('vcf_files', nargs=-1, type=click.Path(exists=True))
+@click.option('-r', '--repeats', default=5, show_default=True)
+def cli(vcf_files, repeats):
+    """Benchmark decoding of VEP transcripts"""
+    vcf_files = vcf_files or (clinical_snv_path, research_snv_path,
+                              clinical_sv_path, research_sv_path)
+    for vcf_path in vcf_files:
+        vep_header, csq_entries = read_csq_entries(vcf_path)
+        if not csq_entries:
+            click.echo("No CSQ entries in {0}".format(vcf_path))
+            continue
+
+        start = time.time()
+        for _ in range(repeats):
+            nr_transcripts = zip_transcripts(csq_entries, vep_header)
+        zip_time = time.time() - start
+
+        start = time.time()
+        for _ in range(repeats):
+            column_transcripts(csq_entries, vep_header)
+        column_time = time.time() - start
+
+        click.echo("{0}: {1} transcripts in {2} variants".format(
+            vcf_path, nr_transcripts, len(csq_entries)))
+        click.echo("  Zip with header: {0:.2f}s".format(zip_time))
+        click.echo("  Column decoding: {0:.2f}s".format(column_time))
+        click.echo("  Speedup: {0:.1f}x".format(
+            zip_time / column_time if column_time else float('inf')))
+
+
+if __name__ == '__main__':
+    cli()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+cytobands.py
+
+Compare the time it takes to find the cytobands of a batch of variants one
+variant at a time with cytoband_name, the way parse_coordinates does it, with
+one lookup for the whole batch with cytoband_names, the way the variant load
+does it.
+
+"""
+import random
+import time
+
+import click
+
+from scout.parse.cytoband import (get_cytobands, cytoband_name, cytoband_names)
+
+
+def random_positions(cytobands, nr_variants):
+    """Return lists of chromosomes and positions inside the chromosomes"""
+    chrom_ends = {chrom: max(ends) for chrom, (_, ends, _) in cytobands.items()}
+    chroms = random.choices(list(chrom_ends), k=nr_variants)
+    positions = [random.randint(1, chrom_ends[chrom]) for chrom in chroms]
+    return chroms, positions
+
+
+@click.command()
+@click.option('-n', '--nr-variants', default=100000, show_default=True)
+def cli(nr_variants):
+    """Benchmark cytoband lookups of a batch of variants"""
+    cytobands = get_cytobands()
+    chroms, positions = random_positions(cytobands, nr_variants)
+    # Builds the genome wide arrays, this is done once per process
+    cytoband_names(chroms[:1], positions[:1])
+
+    start = time.time()
+    old_names = [cytoband_name(cytobands, chrom, pos)
+                 for chrom, pos in zip(chroms, positions)]
+    old_time = time.time() - start
+    click.echo("cytoband_name: {0:.3f}s, {1:.2f}us per variant".format(
+        old_time, old_time / nr_variants * 1e6))
+
+    start = time.time()
+    new_names = cytoband_names(chroms, positions)
+    new_time = time.time() - start
+    click.echo("cytoband_names: {0:.3f}s, {1:.2f}us per variant".format(
+        new_time, new_time / nr_variants * 1e6))
+
+    if old_names != new_names:
+        raise click.ClickException("The cytobands are not the same")
+    click.echo("Speedup: {0:.1f}x for {1} variants".format(
+        old_time / new_time if new_time else float('inf'), nr_variants))
+
+
+if __name__ == '__main__':
+    cli()
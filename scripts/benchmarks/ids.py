@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+ids.py
+
+Compare the time it takes to generate the variant and document ids with
+generate_md5_key, the old way, with the shared hash used by parse_ids and the
+reused key suffix used by parse_compounds.
+
+"""
+import random
+import time
+
+import click
+
+from scout.utils.md5 import (generate_md5_key, generate_md5_keys, md5_key_suffix,
+                             generate_suffixed_md5_key)
+
+CASE_ID = 'benchmark_case'
+VARIANT_TYPE = 'clinical'
+
+
+def random_variants(nr_variants):
+    """Return a list of (chrom, pos, ref, alt) with random values"""
+    return [
+        (random.choice(['1', '2', 'X']), str(random.randint(1, 100000000)),
+         random.choice('ACGT'), random.choice('ACGT'))
+        for _ in range(nr_variants)
+    ]
+
+
+def old_ids(variants):
+    """Generate the variant, document and compound ids with generate_md5_key"""
+    for chrom, pos, ref, alt in variants:
+        generate_md5_key([chrom, pos, ref, alt, VARIANT_TYPE])
+        generate_md5_key([chrom, pos, ref, alt, VARIANT_TYPE, CASE_ID])
+        generate_md5_key([chrom, pos, ref, alt, VARIANT_TYPE, CASE_ID])
+
+
+def new_ids(variants):
+    """Generate the variant, document and compound ids the new way"""
+    key_suffix = md5_key_suffix([VARIANT_TYPE, CASE_ID])
+    for chrom, pos, ref, alt in variants:
+        generate_md5_keys([chrom, pos, ref, alt, VARIANT_TYPE], CASE_ID)
+        generate_suffixed_md5_key('_'.join([chrom, pos, ref, alt]).replace('_', ' '),
+                                  key_suffix)
+
+
+@click.command()
+@click.option('-n', '--nr-variants', default=200000, show_default=True)
+def cli(nr_variants):
+    """Benchmark generation of variant ids"""
+    variants = random_variants(nr_variants)
+
+    start = time.time()
+    old_ids(variants)
+    old_time = time.time() - start
+    click.echo("generate_md5_key: {0:.2f}s".format(old_time))
+
+    start = time.time()
+    new_ids(variants)
+    new_time = time.time() - start
+    click.echo("Shared hash and suffix: {0:.2f}s".format(new_time))
+
+    click.echo("Speedup: {0:.1f}x for {1} variants".format(
+        old_time / new_time if new_time else float('inf'), nr_variants))
+
+
+if __name__ == '__main__':
+    cli()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+import_time.py
+
+Measure the time it takes to import a module, by default the command line
+entry point, with python -X importtime. Reports the median over a number of
+fresh interpreters and the imports that take the longest.
+
+Exits with an error if the median is above --max-ms, so it can be used to
+guard the start up time of the cli.
+
+"""
+import statistics
+import subprocess
+import sys
+
+import click
+
+
+def import_times(module):
+    """Import a module in a new interpreter
+
+    Returns:
+        times(dict): {<module>: <cumulative microseconds>}
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                           'import {0}'.format(module)],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+    if proc.returncode != 0:
+        raise click.ClickException(proc.stderr.strip().splitlines()[-1])
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@click.command()
+@click.argument('module', default='scout.commands.base')
+@click.option('-n', '--nr-runs', default=5, show_default=True)
+@click.option('-t', '--top', default=10, show_default=True,
+              help='Number of slow imports to show')
+@click.option('--max-ms', type=float, help='Fail if the median is above this')
+def cli(module, nr_runs, top, max_ms):
+    """Benchmark the import time of a module"""
+    runs = [import_times(module) for _ in range(nr_runs)]
+    median_ms = statistics.median(run[module] for run in runs) / 1000
+
+    click.echo("Slowest imports in the last run:")
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)
+    for name, cumulative in slowest[:top]:
+        click.echo("{0:>10.1f} ms  {1}".format(cumulative / 1000, name))
+    click.echo("import {0}: {1:.1f} ms (median of {2})".format(module, median_ms,
+                                                               nr_runs))
+
+    if max_ms and median_ms > max_ms:
+        click.echo("Import time is above {0} ms".format(max_ms), err=True)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    cli()
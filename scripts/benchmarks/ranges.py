@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+ranges.py
+
+Measure concurrent range requests against send_file_partial, the way the
+alignment viewer fetches a bam file. Serves a file with a local server and
+fetches random ranges from several threads, then reports the throughput and
+the peak memory of the process.
+
+Uses a temporary file of random bytes if no file is given.
+
+"""
+import logging
+import random
+import resource
+import tempfile
+import threading
+import time
+
+from multiprocessing.pool import ThreadPool
+from urllib.request import Request, urlopen
+
+import click
+from flask import Flask
+from werkzeug.serving import make_server
+
+from scout.server.blueprints.pileup.partial import send_file_partial
+
+
+def serve_file(path):
+    """Start a threaded server in the background that serves path
+
+    Returns:
+        server(werkzeug.serving.BaseWSGIServer)
+    """
+    app = Flask(__name__)
+
+    @app.route('/file')
+    def partial():
+        return send_file_partial(path)
+
+    # Do not log every request
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fetch(url, range_header):
+    """Fetch a range and return the number of bytes"""
+    nr_bytes = 0
+    with urlopen(Request(url, headers={'Range': range_header})) as resp:
+        while True:
+            chunk = resp.read(1024 * 1024)
+            if not chunk:
+                return nr_bytes
+            nr_bytes += len(chunk)
+
+
+def random_ranges(file_len, nr_requests, range_size):
+    """Return Range headers, every tenth is open ended like the viewer sends"""
+    headers = []
+    for request_nr in range(nr_requests):
+        first = random.randint(0, max(file_len - range_size, 0))
+        if request_nr % 10 == 0:
+            headers.append('bytes={0}-'.format(first))
+        else:
+            headers.append('bytes={0}-{1}'.format(first, first + range_size - 1))
+    return headers
+
+
+@click.command()
+@click.argument('bam_file', required=False, type=click.Path(exists=True))
+@click.option('-s', '--file-size', default=512, show_default=True,
+              help='Size in MB of the temporary file')
+@click.option('-n', '--nr-requests', default=200, show_default=True)
+@click.option('-c', '--concurrency', default=16, show_default=True)
+@click.option('-r', '--range-size', default=256 * 1024, show_default=True)
+def cli(bam_file, file_size, nr_requests, concurrency, range_size):
+    """Benchmark concurrent range requests"""
+    temp_file = None
+    if not bam_file:
+        temp_file = tempfile.NamedTemporaryFile(suffix='.bam')
+        chunk = bytes(bytearray(random.getrandbits(8) for _ in range(1024 * 1024)))
+        for _ in range(file_size):
+            temp_file.write(chunk)
+        temp_file.flush()
+        bam_file = temp_file.name
+
+    with open(bam_file, 'rb') as file_handle:
+        file_handle.seek(0, 2)
+        file_len = file_handle.tell()
+
+    server = serve_file(bam_file)
+    url = 'http://127.0.0.1:{0}/file'.format(server.server_port)
+    headers = random_ranges(file_len, nr_requests, range_size)
+
+    start_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.time()
+    pool = ThreadPool(concurrency)
+    nr_bytes = sum(pool.starmap(fetch, [(url, header) for header in headers]))
+    pool.close()
+    elapsed = time.time() - start
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    server.shutdown()
+    if temp_file:
+        temp_file.close()
+
+    click.echo("{0} requests, {1} concurrent: {2:.2f}s, {3:.1f} MB/s".format(
+        nr_requests, concurrency, elapsed, nr_bytes / elapsed / 1024 / 1024))
+    click.echo("Peak memory grew by {0:.1f} MB".format(
+        (peak_memory - start_memory) / 1024))
+
+
+if __name__ == '__main__':
+    cli()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# encoding: utf-8
+"""
+variant_rank.py
+
+Compare the time it takes to add variant ranks one document at a time with
+the bulk writes done by the adapter.
+
+The benchmark runs against a throw away database that is dropped afterwards.
+Use --mock to run against mongomock when no mongod is available, the numbers
+are then only useful for relative comparisons.
+
+"""
+import logging
+import random
+import time
+
+import click
+import pymongo
+
+from scout.adapter import MongoAdapter
+from scout.adapter.client import get_connection
+
+LOG = logging.getLogger(__name__)
+
+CASE_ID = 'benchmark_case'
+
+
+def seed_variants(adapter, nr_variants):
+    """Insert a number of minimal variants with random rank scores"""
+    adapter.variant_collection.insert_many([
+        {
+            '_id': 'variant_{}'.format(index),
+            'case_id': CASE_ID,
+            'category': 'snv',
+            'variant_type': 'clinical',
+            'rank_score': random.randint(-10, 30),
+        } for index in range(nr_variants)
+    ])
+
+
+def loop_variant_rank(adapter, case_obj, variant_type='clinical', category='snv'):
+    """Add the variant rank with one update per variant, the old way"""
+    variants = adapter.variant_collection.find(
+        {
+            'case_id': case_obj['_id'],
+            'category': category,
+            'variant_type': variant_type,
+        },
+        {'_id': 1}
+    ).sort('rank_score', pymongo.DESCENDING)
+
+    for index, variant in enumerate(variants):
+        adapter.variant_collection.find_one_and_update(
+            {'_id': variant['_id']},
+            {'$set': {'variant_rank': index + 1}}
+        )
+
+
+@click.command()
+@click.option('--uri', default='mongodb://localhost:27017', show_default=True)
+@click.option('--mock', is_flag=True, help='Use a mongomock database')
+@click.option('-n', '--nr-variants', default=20000, show_default=True)
+@click.option('-b', '--batch-size', type=int, help='Number of updates per bulk write')
+def cli(uri, mock, nr_variants, batch_size):
+    """Benchmark adding variant ranks"""
+    if mock:
+        from mongomock import MongoClient
+        client = MongoClient()
+    else:
+        client = get_connection(uri=uri)
+    database = client['scout-benchmark']
+    adapter = MongoAdapter(database)
+    case_obj = {'_id': CASE_ID}
+
+    try:
+        seed_variants(adapter, nr_variants)
+        adapter.variant_collection.create_index([('case_id', pymongo.ASCENDING),
+                                                 ('rank_score', pymongo.DESCENDING)])
+
+        start = time.time()
+        loop_variant_rank(adapter, case_obj)
+        loop_time = time.time() - start
+        click.echo("One update per variant: {0:.2f}s".format(loop_time))
+
+        start = time.time()
+        adapter.add_variant_rank(case_obj, batch_size=batch_size)
+        bulk_time = time.time() - start
+        click.echo("Bulk writes: {0:.2f}s".format(bulk_time))
+
+        click.echo("Speedup: {0:.1f}x for {1} variants".format(
+            loop_time / bulk_time if bulk_time else float('inf'), nr_variants))
+    finally:
+        client.drop_database('scout-benchmark')
+
+
+if __name__ == '__main__':
+    cli()
@@ -216,3 +216,27 @@ def test_update_case_rerun_status(panel_database, case_obj):
 
     ## THEN assert that 'rerun_requested' is set to False
     assert res['rerun_requested'] is False
+
+
+def test_case_statistics(panel_database, case_obj, institute_obj, user_obj):
+    adapter = panel_database
+    ## GIVEN a database with a case
+    adapter._add_case(case_obj)
+
+    ## WHEN computing the statistics
+    statistics = adapter.case_statistics()
+
+    ## THEN the case should be counted for its institute
+    stats = statistics[case_obj['owner']]
+    assert stats['cases'] == 1
+    assert stats['status'] == {case_obj['status']: 1}
+    assert sum(stats['analysis_types'].values()) == len(case_obj['individuals'])
+    ## THEN the statistics should be cached
+    assert adapter.case_statistics() is statistics
+
+    ## WHEN the status of the case is changed
+    case = adapter.case(case_obj['_id'])
+    adapter.archive_case(institute_obj, case, user_obj, 'archivelink')
+
+    ## THEN the statistics should be computed again
+    assert adapter.case_statistics()[case_obj['owner']]['status'] == {'archived': 1}
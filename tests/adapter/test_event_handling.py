@@ -467,6 +467,35 @@ def test_specific_comment(variant_database, institute_obj, case_obj, user_obj):
     event = adapter.event_collection.find_one()
     assert event['content'] == content
 
+def test_variants_comments(populated_database, institute_obj, case_obj, user_obj):
+    adapter = populated_database
+    adapter.load_variants(case_obj=case_obj, variant_type='clinical', category='snv')
+    # GIVEN a database with comments on two variants
+    variants = list(adapter.variant_collection.find().limit(3))
+    for variant, content in [(variants[0], 'first'), (variants[1], 'hello'),
+                             (variants[0], 'second')]:
+        adapter.comment(
+            institute=institute_obj,
+            case=case_obj,
+            user=user_obj,
+            link='commentlink',
+            variant=variant,
+            content=content,
+        )
+    variant_ids = [variant['variant_id'] for variant in variants]
+
+    # WHEN fetching the comments of all variants at once
+    comments = adapter.variants_comments(institute_obj, variant_ids)
+
+    # THEN each variant should get the same comments as from events
+    for variant_id in variant_ids:
+        events = adapter.events(institute_obj, case=case_obj,
+                                variant_id=variant_id, comments=True)
+        assert ([event['_id'] for event in comments[variant_id]] ==
+                [event['_id'] for event in events])
+    assert len(comments[variants[0]['variant_id']]) == 2
+    assert comments[variants[2]['variant_id']] == []
+
 def test_add_cohort(case_database, institute_obj, case_obj, user_obj):
     adapter = case_database
     logger.info("Testing assign a user to a case")
@@ -607,3 +636,71 @@ def test_update_default_panels(case_database, institute_obj, case_obj, user_obj)
     # # THEN a unassign event should be created
     # event = adapter.event_collection.find_one({'verb': 'unassign'})
     # assert event['link'] == 'unassignlink'
+
+
+def test_causative_index(populated_database, institute_obj, case_obj, user_obj):
+    adapter = populated_database
+    adapter.load_variants(case_obj=case_obj, variant_type='clinical', category='snv')
+    case = adapter.case(case_obj['_id'])
+    variant = adapter.variant_collection.find_one()
+    # GIVEN another case with the same variant
+    other_case = dict(case, _id='other_case', display_name='other_case', causatives=[])
+    adapter.case_collection.insert_one(other_case)
+    other_variant = dict(variant, _id='other_variant', case_id='other_case')
+    adapter.variant_collection.insert_one(other_variant)
+
+    # WHEN marking the variant causative in the first case
+    adapter.mark_causative(
+        institute=institute_obj,
+        case=case,
+        user=user_obj,
+        link='causativelink',
+        variant=variant,
+    )
+
+    # THEN the other case should find it from the index
+    causatives = list(adapter.other_causatives(other_case, other_variant))
+    assert [causative['_id'] for causative in causatives] == [variant['_id']]
+    assert [found['_id'] for found in adapter.check_causatives(case_obj=other_case)] == [
+        'other_variant']
+    # THEN the case where it is marked should not find it
+    assert list(adapter.other_causatives(case, variant)) == []
+    # THEN the index should be the same when rebuilt from the cases
+    indexed = list(adapter.causative_collection.find())
+    assert adapter.index_causatives() == 1
+    assert list(adapter.causative_collection.find()) == indexed
+
+    # WHEN unmarking the variant
+    adapter.unmark_causative(
+        institute=institute_obj,
+        case=case,
+        user=user_obj,
+        link='causativelink',
+        variant=variant,
+    )
+
+    # THEN it should be removed from the index
+    assert list(adapter.other_causatives(other_case, other_variant)) == []
+
+
+def test_causative_index_built_on_first_use(populated_database, institute_obj,
+                                            case_obj, user_obj):
+    adapter = populated_database
+    adapter.load_variants(case_obj=case_obj, variant_type='clinical', category='snv')
+    case = adapter.case(case_obj['_id'])
+    variant = adapter.variant_collection.find_one()
+    adapter.mark_causative(
+        institute=institute_obj,
+        case=case,
+        user=user_obj,
+        link='causativelink',
+        variant=variant,
+    )
+    # GIVEN a database from before the index, with causatives only in the cases
+    adapter.causative_collection.delete_many({})
+
+    # WHEN looking up the causatives of the institute
+    causatives = list(adapter.institute_causatives(case_obj['owner']))
+
+    # THEN the index should be built from the cases
+    assert [causative['_id'] for causative in causatives] == [variant['_id']]
@@ -283,3 +283,100 @@ def test_hgnc_symbol_to_gene(adapter):
     assert gene_obj['hgnc_symbol'] in res
     assert gene_obj2['hgnc_symbol'] in res
 
+
+def test_hgncid_to_gene_cached(adapter):
+    ##GIVEN a adapter with one gene
+    gene_obj = {
+        'hgnc_id': 1,
+        'hgnc_symbol': 'AAA',
+        'build': '37',
+    }
+    adapter.load_hgnc_gene(gene_obj)
+
+    ##WHEN fetching hgncid_to_gene twice
+    res = adapter.hgncid_to_gene()
+    ##THEN assert that the same dictionary is returned
+    assert adapter.hgncid_to_gene() is res
+    assert set(res) == set([1])
+
+    ##WHEN inserting a new gene
+    gene_obj2 = {
+        'hgnc_id': 2,
+        'hgnc_symbol': 'AA',
+        'build': '37',
+    }
+    adapter.load_hgnc_gene(gene_obj2)
+
+    ##THEN assert that the dictionary is rebuilt
+    assert set(adapter.hgncid_to_gene()) == set([1, 2])
+    ##THEN assert that the other build is cached separately
+    assert adapter.hgncid_to_gene(build='38') == {}
+
+def test_gene_lookup(adapter):
+    ##GIVEN a adapter with one gene
+    gene_obj = {
+        'hgnc_id': 1,
+        'hgnc_symbol': 'AAA',
+        'ensembl_id': 'ENSG1',
+        'description': 'A gene',
+        'build': '37',
+        'ad': True,
+        'transcripts': [{'ensembl_transcript_id': 'ENST1'}],
+    }
+    adapter.load_hgnc_gene(gene_obj)
+
+    ##WHEN fetching the gene lookup
+    res = adapter.gene_lookup()
+
+    ##THEN assert that the fields used when building variants are there
+    gene_record = res[1]
+    assert gene_record['hgnc_symbol'] == 'AAA'
+    assert gene_record['ensembl_id'] == 'ENSG1'
+    assert gene_record.get('ad') is True
+    assert gene_record.get('ar') is False
+    ##THEN assert that the transcripts are left out
+    assert gene_record.get('transcripts') is None
+
+
+def test_hgnc_symbols(adapter):
+    ##GIVEN a adapter with two genes in build 37 and one in 38
+    for hgnc_id, hgnc_symbol, build in [(1, 'AAA', '37'), (2, 'BBB', '37'),
+                                        (1, 'AAA38', '38')]:
+        adapter.load_hgnc_gene({
+            'hgnc_id': hgnc_id,
+            'hgnc_symbol': hgnc_symbol,
+            'build': build,
+        })
+
+    ##WHEN fetching the symbols of the genes together with a missing gene
+    symbols = adapter.hgnc_symbols([1, 2, 2, 3])
+
+    ##THEN assert that the symbols in build 37 are returned
+    assert symbols == {1: 'AAA', 2: 'BBB'}
+    assert adapter.hgnc_symbols([1], build='38') == {1: 'AAA38'}
+
+
+def test_hgnc_genes_by_id(adapter):
+    ##GIVEN a adapter with one gene
+    adapter.load_hgnc_gene({
+        'hgnc_id': 1,
+        'hgnc_symbol': 'AAA',
+        'build': '37',
+        'transcripts': [{'ensembl_transcript_id': 'ENST1'}],
+    })
+
+    ##WHEN fetching the gene together with a missing gene
+    genes = adapter.hgnc_genes_by_id([1, 2])
+
+    ##THEN assert that the transcripts are indexed and the missing gene is None
+    assert genes[1]['transcripts_dict'] == {'ENST1': {'ensembl_transcript_id': 'ENST1'}}
+    assert genes[2] is None
+
+    ##WHEN fetching the gene again
+    ##THEN assert that the cached gene is returned
+    assert adapter.hgnc_genes_by_id([1])[1] is genes[1]
+
+    ##WHEN inserting the missing gene
+    adapter.load_hgnc_gene({'hgnc_id': 2, 'hgnc_symbol': 'BBB', 'build': '37'})
+    ##THEN assert that it is found
+    assert adapter.hgnc_genes_by_id([2])[2]['hgnc_symbol'] == 'BBB'
@@ -22,6 +22,22 @@ def test_add_hpo_term(adapter):
     ## THEN assert that the term have been loaded
     assert len([term for term in adapter.hpo_terms()]) == 1
 
+def test_add_hpo_bulk(adapter):
+    ## GIVEN a empty adapter
+    hpo_terms = [dict(_id='HP{0}'.format(nr), hpo_id='HP{0}'.format(nr),
+                      description='Term {0}'.format(nr), genes=[1]) for nr in range(3)]
+
+    ## WHEN loading the hpo terms in bulk
+    assert adapter.load_hpo_bulk(hpo_terms) == 3
+
+    ## THEN assert that the terms have been loaded
+    assert len([term for term in adapter.hpo_terms()]) == 3
+
+    ## WHEN loading the same terms again
+    ## THEN assert that a IntegrityError is raised
+    with pytest.raises(IntegrityError):
+        adapter.load_hpo_bulk(hpo_terms)
+
 def test_add_hpo_term_twice(adapter):
     ## GIVEN a empty adapter
     assert len([term for term in adapter.hpo_terms()]) == 0
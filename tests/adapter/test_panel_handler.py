@@ -1,4 +1,5 @@
 import pytest
+import datetime
 
 from scout.exceptions import IntegrityError
 
@@ -236,3 +237,37 @@ def test_apply_pending_add_two_genes(real_panel_database):
     assert len(updated_panel['genes']) == 2
     for gene in updated_panel['genes']:
         assert gene['hgnc_id'] in hgnc_ids
+
+def test_gene_to_panels_invalidated(panel_database):
+    adapter = panel_database
+    ## GIVEN a adapter with one gene panel
+    panel_obj = adapter.panel_collection.find_one()
+    gene_to_panels = adapter.gene_to_panels()
+    hgnc_id = panel_obj['genes'][0]['hgnc_id']
+    assert gene_to_panels[hgnc_id] == set([panel_obj['panel_name']])
+    assert adapter.gene_to_panels() is gene_to_panels
+
+    ## WHEN renaming the panel
+    panel_obj['panel_name'] = 'new_name'
+    adapter.update_panel(panel_obj)
+
+    ## THEN assert that the gene to panels is rebuilt
+    assert adapter.gene_to_panels()[hgnc_id] == set(['new_name'])
+
+def test_gene_to_panels_replaced_elsewhere(panel_database, monkeypatch):
+    adapter = panel_database
+    ## GIVEN a adapter with one gene panel and a cached gene to panels
+    panel_obj = adapter.panel_collection.find_one()
+    hgnc_id = panel_obj['genes'][0]['hgnc_id']
+    adapter.gene_to_panels()
+
+    ## WHEN the genes are edited by another process, which does not
+    ## invalidate the cache of this one, and an older date is kept
+    monkeypatch.setattr('scout.adapter.mongo.panel.reference_cache.invalidate',
+                        lambda *args, **kwargs: None)
+    panel_obj['panel_name'] = 'new_name'
+    adapter.update_panel(panel_obj, version=panel_obj['version'],
+                         date_obj=panel_obj['date'] - datetime.timedelta(days=1))
+
+    ## THEN assert that the gene to panels is rebuilt
+    assert adapter.gene_to_panels()[hgnc_id] == set(['new_name'])
@@ -1,3 +1,5 @@
+from scout.adapter.mongo.planner import explain_summary
+
 
 def test_build_query(adapter):
     case_id = 'cust000'
@@ -224,6 +226,127 @@ def test_build_range(adapter):
     assert mongo_query['position'] == {'$lte': end}
     assert mongo_query['end'] == {'$gte': start}
 
+def test_plan_query_ranges(adapter):
+    case_id = 'cust000'
+    freq = 0.01
+    cadd = 10.0
+    query = {'thousand_genomes_frequency': freq, 'cadd_score': cadd,
+             'cadd_inclusive': True, 'clingen_ngi': 1}
+    mongo_query = adapter.build_query(case_id, query=query)
+
+    ## WHEN planning the query
+    planned_query, _ = adapter.plan_query(mongo_query)
+
+    ## THEN the '$or' filters should be ranges on top level
+    assert '$and' not in planned_query
+    assert planned_query['thousand_genomes_frequency'] == {'$not': {'$gte': freq}}
+    assert planned_query['cadd_score'] == {'$not': {'$lte': cadd}}
+    assert planned_query['clingen_ngi'] == {'$not': {'$gte': 2}}
+    assert planned_query['case_id'] == case_id
+
+def test_plan_query_only_rewrites_numeric_keys(adapter):
+    ## GIVEN a missing or range filter on a field that is not always a number
+    mongo_query = {'case_id': 'cust000', '$or': [
+        {'rank_score': {'$lt': 10}},
+        {'rank_score': {'$exists': False}},
+    ]}
+
+    ## WHEN planning the query
+    planned_query, _ = adapter.plan_query(mongo_query)
+
+    ## THEN the '$or' should be kept, {'$not': ...} would also match null
+    assert planned_query['$or'] == mongo_query['$or']
+
+def test_plan_query_keeps_clinsig_or(adapter):
+    case_id = 'cust000'
+    query = {'thousand_genomes_frequency': 0.01, 'clinsig': [4, 5],
+             'clinsig_confident_always_returned': True}
+    mongo_query = adapter.build_query(case_id, query=query)
+
+    ## WHEN planning a query with minor and major criteria
+    planned_query, _ = adapter.plan_query(mongo_query)
+
+    ## THEN the minor criteria should still be joined with the major ones
+    assert planned_query['$or'] == [
+        {'thousand_genomes_frequency': {'$not': {'$gte': 0.01}}},
+        mongo_query['$or'][1],
+    ]
+
+def test_plan_query_hint(adapter):
+    case_id = 'cust000'
+    sorting = [('variant_rank', 1)]
+    mongo_query = adapter.build_query(case_id, query={'gene_panels': ['panel1']})
+
+    ## GIVEN a database without indexes
+    ## WHEN planning a query
+    _, hint = adapter.plan_query(mongo_query, sorting)
+    ## THEN no index should be hinted
+    assert hint is None
+
+    ## GIVEN a database with the indexes
+    adapter.load_indexes()
+
+    ## WHEN planning a query on gene panels
+    _, hint = adapter.plan_query(mongo_query, sorting)
+    ## THEN the index on panels should be hinted
+    assert hint == 'caseid_category_varianttype_panels_variantrank'
+
+    ## WHEN planning a query on variant ids
+    mongo_query = adapter.build_query(case_id, variant_ids=['a', 'b'])
+    _, hint = adapter.plan_query(mongo_query, sorting)
+    ## THEN the index on variant id should be hinted
+    assert hint == 'caseid_variantid'
+
+    ## WHEN planning a query on a region
+    mongo_query = adapter.build_query(case_id, query={'chrom': '1', 'start': 10,
+                                                      'end': 100})
+    _, hint = adapter.plan_query(mongo_query, sorting)
+    ## THEN the index on chromosome and position should be hinted
+    assert hint == 'caseid_category_varianttype_chromosome_position'
+
+def test_planned_query_same_variants(populated_database, case_obj):
+    adapter = populated_database
+    case_id = case_obj['_id']
+    adapter.load_variants(case_obj=case_obj, variant_type='clinical',
+                          category='snv', rank_threshold=-100)
+    query = {'thousand_genomes_frequency': 0.01, 'cadd_score': 10,
+             'cadd_inclusive': True}
+    mongo_query = adapter.build_query(case_id, query=query)
+
+    ## WHEN fetching the variants with the planned query
+    planned_query, _ = adapter.plan_query(mongo_query)
+
+    ## THEN the same variants should be returned as with the built query
+    variant_ids = set(variant['_id'] for variant in
+                      adapter.variant_collection.find(mongo_query))
+    planned_ids = set(variant['_id'] for variant in
+                      adapter.variant_collection.find(planned_query))
+    assert variant_ids
+    assert planned_ids == variant_ids
+
+def test_explain_summary():
+    explanation = {
+        'queryPlanner': {
+            'winningPlan': {
+                'stage': 'LIMIT',
+                'inputStage': {
+                    'stage': 'FETCH',
+                    'inputStage': {
+                        'stage': 'IXSCAN',
+                        'indexName': 'caseid_category_varianttype_variantrank',
+                    },
+                },
+            },
+        },
+        'executionStats': {'totalDocsExamined': 50, 'nReturned': 10},
+    }
+
+    summary = explain_summary(explanation)
+
+    assert summary['stage'] == 'LIMIT'
+    assert summary['indexes'] == ['caseid_category_varianttype_variantrank']
+    assert summary['examined_ratio'] == 5
+
 def test_get_overlapping_variant(populated_database, parsed_case):
     """Add a couple of overlapping variants"""
     
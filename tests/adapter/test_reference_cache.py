@@ -0,0 +1,66 @@
+from scout.adapter.mongo.cache import (ReferenceCache, LRUCache)
+
+
+def test_invalidate_names():
+    ## GIVEN a cache with two maps
+    cache = ReferenceCache()
+    cache.get('testdb', 'gene_lookup', '37', (1, None), lambda: {1: 'gene'})
+    cache.get('testdb', 'gene_to_panels', None, (1, None), lambda: {})
+
+    ## WHEN invalidating with a string that is part of a name
+    cache.invalidate('testdb', 'gene')
+    ## THEN assert that nothing was removed
+    assert cache.get('testdb', 'gene_lookup', '37', (1, None), dict) == {1: 'gene'}
+
+    ## WHEN invalidating one map by name
+    cache.invalidate('testdb', 'gene_lookup')
+    ## THEN assert that only that map is rebuilt
+    assert cache.get('testdb', 'gene_lookup', '37', (1, None), dict) == {}
+    assert cache.get('testdb', 'gene_to_panels', None, (1, None), list) == {}
+
+
+def test_lru_cache_expires():
+    ## GIVEN a cache where the entries expire directly
+    cache = LRUCache(ttl=-1)
+    cache.set_many({('testdb', 'gene', 1): None})
+
+    ## WHEN fetching the entry
+    ## THEN assert that it is rebuilt
+    assert cache.get(('testdb', 'gene', 1), lambda: 'gene') == 'gene'
+    assert cache.get_many([('testdb', 'gene', 1)]) == {}
+
+
+def test_lru_cache_evicts_least_recently_used():
+    ## GIVEN a full cache with two entries
+    cache = LRUCache(max_size=2)
+    cache.set_many({('testdb', 1): 'a', ('testdb', 2): 'b'})
+
+    ## WHEN using the first entry and adding a third
+    assert cache.get_many([('testdb', 1)]) == {('testdb', 1): 'a'}
+    cache.set_many({('testdb', 3): 'c'})
+
+    ## THEN assert that the second entry was removed
+    assert cache.get_many([('testdb', 1), ('testdb', 2), ('testdb', 3)]) == {
+        ('testdb', 1): 'a', ('testdb', 3): 'c'}
+    ## THEN assert that entries are removed per database
+    cache.invalidate('otherdb')
+    assert len(cache.get_many([('testdb', 1), ('testdb', 3)])) == 2
+    cache.invalidate('testdb')
+    assert cache.get_many([('testdb', 1), ('testdb', 3)]) == {}
+
+
+def test_lru_cache_invalidated_while_building():
+    ## GIVEN a cache
+    cache = LRUCache()
+
+    ## WHEN the database is invalidated while a value is built
+    def build_value():
+        cache.invalidate('testdb')
+        return 'stale'
+    assert cache.get(('testdb', 1), build_value) == 'stale'
+
+    ## THEN assert that the value was not stored
+    assert cache.get_many([('testdb', 1)]) == {}
+    ## THEN assert that values stored after the invalidation are kept
+    cache.set_many({('testdb', 1): 'new'})
+    assert cache.get_many([('testdb', 1)]) == {('testdb', 1): 'new'}
@@ -24,4 +24,15 @@ def test_get_nonexisting_user(adapter):
     """docstring for test_get_nonexisting_user"""
     user_obj = adapter.user(email='john.doe@mail.com')
     assert user_obj == None
-    
\ No newline at end of file
+    
+
+def test_users_by_email(adapter):
+    ## GIVEN a database with two users
+    for email in ['clark.kent@mail.com', 'lois.lane@mail.com']:
+        adapter.add_user({'email': email, 'name': email, 'institutes': ['test-1']})
+
+    ## WHEN fetching one existing and one missing user
+    users = adapter.users_by_email(['clark.kent@mail.com', 'john.doe@mail.com'])
+
+    ## THEN assert that only the existing user is returned
+    assert list(users) == ['clark.kent@mail.com']
@@ -1,9 +1,17 @@
-import os
+import copy
 import logging
 
 import pytest
 
-TRAVIS = os.getenv('TRAVIS')
+from cyvcf2 import VCF
+
+from scout.adapter.mongo.variant import (build_variant_objs, new_load_stats,
+                                         variant_keyset)
+from scout.exceptions import VcfError
+from scout.utils.coordinates import genomic_bin
+from scout.parse.variant.csq import parse_csq_columns
+from scout.parse.variant.headers import (parse_rank_results_header,
+                                         parse_vep_header)
 
 log = logging.getLogger(__name__)
 
@@ -78,6 +86,339 @@ def test_load_all_variants(populated_database, variant_objs, case_obj):
 
     assert nr_loaded == result.count()
 
+def test_load_variant_bulk(populated_database, case_obj):
+    adapter = populated_database
+    case_id = case_obj['_id']
+    adapter.load_variants(case_obj=case_obj, variant_type='clinical', category='snv')
+    variants = list(adapter.variant_collection.find())
+
+    ## GIVEN a database where some of the variants already exists
+    for variant_obj in variants[5:]:
+        adapter.variant_collection.delete_one({'_id': variant_obj['_id']})
+
+    ## WHEN loading all variants in one batch
+    nr_inserted = adapter.load_variant_bulk(variants)
+
+    ## THEN only the new variants should be inserted and no error raised
+    assert nr_inserted == len(variants) - 5
+    result = adapter.variants(case_id=case_id, nr_of_variants=-1)
+    assert result.count() == len(variants)
+
+def test_load_variants_batch_size(populated_database, case_obj):
+    adapter = populated_database
+    case_id = case_obj['_id']
+
+    ## GIVEN the number of variants loaded with the default batch size
+    nr_loaded = adapter.load_variants(case_obj=case_obj, variant_type='clinical',
+                                      category='snv')
+    adapter.delete_variants(case_id, 'clinical')
+
+    ## WHEN loading the same variants with a small batch size
+    nr_batch_loaded = adapter.load_variants(case_obj=case_obj, variant_type='clinical',
+                                            category='snv', batch_size=7)
+
+    ## THEN the same variants should be loaded
+    result = adapter.variants(case_id=case_id, nr_of_variants=-1, category='snv')
+    assert nr_batch_loaded == nr_loaded
+    assert result.count() == nr_loaded
+
+def test_load_variants_workers(populated_database, case_obj):
+    adapter = populated_database
+    case_id = case_obj['_id']
+
+    ## GIVEN the variants loaded in one process
+    adapter.load_variants(case_obj=case_obj, variant_type='clinical', category='snv')
+    serial_variants = list(adapter.variant_collection.find().sort('_id'))
+    adapter.delete_variants(case_id, 'clinical')
+
+    ## WHEN loading the same vcf split on chromosomes in a pool of processes
+    nr_loaded = adapter.load_variants(case_obj=case_obj, variant_type='clinical',
+                                      category='snv', workers=2, batch_size=10)
+
+    ## THEN the variants should be identical to the ones loaded in one process
+    parallel_variants = list(adapter.variant_collection.find().sort('_id'))
+    assert nr_loaded == len(serial_variants)
+    assert parallel_variants == serial_variants
+
+def crash_after_batches(adapter, nr_batches):
+    """Make the adapter fail when inserting the batch after nr_batches"""
+    load_variant_bulk = adapter.load_variant_bulk
+    inserted_batches = []
+
+    def crashing_bulk(variant_objs):
+        if len(inserted_batches) == nr_batches:
+            raise RuntimeError("Lost connection")
+        inserted_batches.append(variant_objs)
+        return load_variant_bulk(variant_objs)
+
+    adapter.load_variant_bulk = crashing_bulk
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_resume_load_variants(populated_database, case_obj, workers):
+    adapter = populated_database
+    case_id = case_obj['_id']
+
+    ## GIVEN the variants loaded without interruption
+    adapter.load_variants(case_obj=case_obj, variant_type='clinical', category='snv')
+    loaded_variants = list(adapter.variant_collection.find().sort('_id'))
+    adapter.delete_variants(case_id, 'clinical')
+
+    ## GIVEN a load that crashes after two batches
+    crash_after_batches(adapter, 2)
+    with pytest.raises(RuntimeError):
+        adapter.load_variants(case_obj=case_obj, variant_type='clinical',
+                              category='snv', batch_size=10, workers=workers)
+    del adapter.load_variant_bulk
+
+    ## THEN the inserted variants should be kept together with a checkpoint
+    load_state = adapter.load_state(case_id, 'clinical', 'snv')
+    assert load_state['status'] == 'running'
+    assert load_state['batch'] == 2
+    nr_inserted = adapter.variant_collection.find().count()
+    assert nr_inserted == load_state['nr_inserted']
+
+    ## WHEN resuming the load
+    nr_loaded = adapter.load_variants(case_obj=case_obj, variant_type='clinical',
+                                      category='snv', batch_size=10,
+                                      workers=workers, resume=True)
+
+    ## THEN only the rest of the variants should be inserted
+    assert nr_loaded == len(loaded_variants) - nr_inserted
+    assert list(adapter.variant_collection.find().sort('_id')) == loaded_variants
+    assert adapter.load_state(case_id, 'clinical', 'snv')['status'] == 'done'
+
+    ## WHEN resuming a load that is done
+    nr_loaded = adapter.load_variants(case_obj=case_obj, variant_type='clinical',
+                                      category='snv', resume=True)
+
+    ## THEN nothing should be inserted
+    assert nr_loaded == 0
+
+
+def test_resume_changed_vcf(populated_database, case_obj):
+    adapter = populated_database
+    case_id = case_obj['_id']
+
+    ## GIVEN a load that has crashed after one batch
+    crash_after_batches(adapter, 1)
+    with pytest.raises(RuntimeError):
+        adapter.load_variants(case_obj=case_obj, variant_type='clinical',
+                              category='snv', batch_size=10)
+    del adapter.load_variant_bulk
+
+    ## WHEN the vcf does not have the last inserted variant where the
+    ## checkpoint says
+    load_state = adapter.load_state(case_id, 'clinical', 'snv')
+    load_state['position'] += 1
+    adapter.save_load_state(load_state)
+
+    ## THEN resuming the load should fail
+    with pytest.raises(VcfError):
+        adapter.load_variants(case_obj=case_obj, variant_type='clinical',
+                              category='snv', batch_size=10, resume=True)
+
+
+def test_delete_variants_deletes_load_state(populated_database, case_obj):
+    adapter = populated_database
+    case_id = case_obj['_id']
+
+    ## GIVEN a case with loaded variants
+    adapter.load_variants(case_obj=case_obj, variant_type='clinical', category='snv')
+    assert adapter.load_state(case_id, 'clinical', 'snv')
+
+    ## WHEN deleting the variants
+    adapter.delete_variants(case_id, 'clinical')
+
+    ## THEN the checkpoint should be deleted as well
+    assert adapter.load_state(case_id, 'clinical', 'snv') is None
+
+def test_resumable_load_state(populated_database, case_obj):
+    adapter = populated_database
+    case_id = case_obj['_id']
+    variant_file = case_obj['vcf_files']['vcf_snv']
+
+    ## GIVEN a load of the whole vcf that has crashed after one batch
+    crash_after_batches(adapter, 1)
+    with pytest.raises(RuntimeError):
+        adapter.load_variants(case_obj=case_obj, variant_type='clinical',
+                              category='snv', batch_size=10)
+    del adapter.load_variant_bulk
+
+    ## WHEN loading a region of the same vcf
+    first_variant = next(iter(VCF(variant_file)))
+    chrom = first_variant.CHROM
+    adapter.load_variants(case_obj=case_obj, variant_type='clinical', category='snv',
+                          chrom=chrom, start=1, end=first_variant.POS + 1)
+
+    ## THEN the region should have its own checkpoint
+    region = '{0}:1-{1}'.format(chrom, first_variant.POS + 1)
+    assert adapter.load_state(case_id, 'clinical', 'snv', region)['status'] == 'done'
+    assert adapter.resumable_load_state(case_id, 'clinical', 'snv', variant_file,
+                                        region) is None
+    ## THEN the load of the whole vcf can still be resumed, but not for another file
+    assert adapter.resumable_load_state(case_id, 'clinical', 'snv', variant_file)
+    assert adapter.resumable_load_state(case_id, 'clinical', 'snv',
+                                        'other.vcf.gz') is None
+
+def _build_args(adapter, case_obj, vcf_obj, rank_threshold):
+    """Return the build_args of build_variant_objs for a snv vcf"""
+    vep_header = parse_vep_header(vcf_obj)
+    return {
+        'case_obj': case_obj,
+        'variant_type': 'clinical',
+        'category': 'snv',
+        'rank_threshold': rank_threshold,
+        'rank_results_header': parse_rank_results_header(vcf_obj),
+        'vep_header': vep_header,
+        'csq_columns': parse_csq_columns(vep_header),
+        'individual_positions': {ind: i for i, ind in enumerate(vcf_obj.samples)},
+        'institute_id': case_obj['owner'],
+        'gene_to_panels': adapter.gene_to_panels(),
+        'hgncid_to_gene': adapter.gene_lookup(),
+        'sample_info': {},
+    }
+
+def test_build_variant_objs_stats(populated_database, case_obj):
+    adapter = populated_database
+    variant_file = case_obj['vcf_files']['vcf_snv']
+    vcf_obj = VCF(variant_file)
+    rank_threshold = 5
+    build_args = _build_args(adapter, case_obj, vcf_obj, rank_threshold)
+    nr_records = sum(1 for _ in VCF(variant_file))
+
+    ## WHEN filtering and building the variants
+    stats = new_load_stats()
+    variant_objs = [variant_obj for _, variant_obj in
+                    build_variant_objs(vcf_obj, build_args, stats)]
+
+    ## THEN every record should be either accepted or rejected
+    assert stats['accepted'] == len(variant_objs)
+    assert stats['rejected'] > 0
+    assert stats['accepted'] + stats['rejected'] == nr_records
+    ## THEN only variants above the threshold or on MT should be built
+    for variant_obj in variant_objs:
+        assert (variant_obj['rank_score'] > rank_threshold or
+                'MT' in variant_obj['chromosome'])
+    ## THEN the time spent should be counted
+    assert stats['filter_time'] > 0
+    assert stats['build_time'] > 0
+
+def test_build_variant_objs_batches(populated_database, case_obj, monkeypatch):
+    adapter = populated_database
+    variant_file = case_obj['vcf_files']['vcf_snv']
+    build_args = _build_args(adapter, case_obj, VCF(variant_file), 5)
+    ## GIVEN the record numbers of the variants built in one batch
+    expected = [nr_variants for nr_variants, _ in
+                build_variant_objs(VCF(variant_file), build_args)]
+
+    ## WHEN building the variants in batches of a few records
+    monkeypatch.setattr('scout.adapter.mongo.variant.PARSE_BATCH_SIZE', 7)
+    stats = new_load_stats()
+    built = [nr_variants for nr_variants, _ in
+             build_variant_objs(VCF(variant_file), build_args, stats)]
+
+    ## THEN the same records should be built with the same numbers
+    assert built == expected
+    assert stats['accepted'] == len(expected)
+
+def test_add_variant_rank(populated_database, case_obj):
+    adapter = populated_database
+    case_id = case_obj['_id']
+    ## GIVEN a database with variants where the ranks have been removed
+    nr_loaded = adapter.load_variants(case_obj=case_obj, variant_type='clinical',
+                                      category='snv')
+    adapter.variant_collection.update_many({}, {'$unset': {'variant_rank': ''}})
+
+    ## WHEN adding the variant rank in small batches
+    nr_ranked = adapter.add_variant_rank(case_obj, 'clinical', category='snv',
+                                         batch_size=3)
+
+    ## THEN all variants should be ranked in order of rank score
+    assert nr_ranked == nr_loaded
+    result = list(adapter.variants(case_id=case_id, nr_of_variants=-1))
+    assert [variant['variant_rank'] for variant in result] == list(range(1, nr_loaded + 1))
+    rank_scores = [variant['rank_score'] for variant in result]
+    assert rank_scores == sorted(rank_scores, reverse=True)
+
+@pytest.mark.parametrize('sort_key', ['variant_rank', 'rank_score'])
+def test_variants_keyset_pages(populated_database, case_obj, sort_key):
+    adapter = populated_database
+    case_id = case_obj['_id']
+
+    ## GIVEN a case with variants where some have the same rank score
+    adapter.load_variants(case_obj=case_obj, variant_type='clinical',
+                          category='snv', rank_threshold=-100)
+    all_variants = list(adapter.variants(case_id, nr_of_variants=-1,
+                                         sort_key=sort_key))
+    rank_scores = [variant['rank_score'] for variant in all_variants]
+    assert len(set(rank_scores)) < len(rank_scores)
+
+    ## WHEN fetching the variants in pages after the last variant of the
+    ## page before
+    paged_variants = []
+    after = None
+    while True:
+        page = list(adapter.variants(case_id, nr_of_variants=7, sort_key=sort_key,
+                                     after=after))
+        if not page:
+            break
+        paged_variants.extend(page)
+        after = variant_keyset(page[-1], sort_key)
+
+    ## THEN all variants should be fetched once in the same order
+    assert ([variant['_id'] for variant in paged_variants] ==
+            [variant['_id'] for variant in all_variants])
+
+def test_update_compounds_resolved(populated_database, case_obj):
+    adapter = populated_database
+    case_id = case_obj['_id']
+
+    ## GIVEN a case with variants that have compounds
+    adapter.load_variants(case_obj=case_obj, variant_type='clinical',
+                          category='snv', rank_threshold=-100)
+    variant_objs = [variant_obj for variant_obj in
+                    adapter.variants(case_id, nr_of_variants=-1)
+                    if variant_obj.get('compounds')]
+    assert variant_objs
+
+    ## WHEN fetching all compound variants with one query
+    compound_ids = [compound['variant'] for variant_obj in variant_objs
+                    for compound in variant_obj['compounds']]
+    compound_variants = adapter.compound_variants(compound_ids)
+
+    ## THEN the compounds should be updated as when they are fetched one by one
+    for variant_obj in variant_objs:
+        expected = adapter.update_compounds(copy.deepcopy(variant_obj))
+        resolved = adapter.update_compounds(copy.deepcopy(variant_obj),
+                                            compound_variants)
+        assert resolved == expected
+
+def test_load_variants_adds_compound_info(populated_database, case_obj):
+    adapter = populated_database
+    case_id = case_obj['_id']
+
+    ## WHEN loading variants that have compounds
+    adapter.load_variants(case_obj=case_obj, variant_type='clinical',
+                          category='snv', rank_threshold=-100)
+
+    ## THEN the compounds should have the information of the compound variants
+    variant_objs = [variant_obj for variant_obj in
+                    adapter.variants(case_id, nr_of_variants=-1)
+                    if variant_obj.get('compounds')]
+    assert variant_objs
+    nr_loaded = 0
+    for variant_obj in variant_objs:
+        for compound in variant_obj['compounds']:
+            compound_obj = adapter.variant_collection.find_one({'_id': compound['variant']})
+            assert compound['not_loaded'] == (compound_obj is None)
+            if compound_obj:
+                nr_loaded += 1
+                assert compound['rank_score'] == compound_obj['rank_score']
+                assert ([gene['hgnc_id'] for gene in compound['genes']] ==
+                        [gene['hgnc_id'] for gene in compound_obj['genes']])
+    assert nr_loaded
+
 def test_load_whole_gene(populated_database, variant_objs, case_obj):
     adapter = populated_database
     case_id = case_obj['_id']
@@ -129,23 +470,137 @@ def test_load_coordinates(populated_database, variant_objs, case_obj):
     ## Then assert that the other variants where loaded
     assert new_nr_variants_in_gene > nr_variants_in_gene
 
-@pytest.mark.skipif(TRAVIS,
-                    reason="Tempfiles seems to be problematic on travis")
 def test_get_region_vcf(populated_database, case_obj):
-    print('Travis', TRAVIS, type(TRAVIS))
     adapter = populated_database
-    case_id = case_obj['_id']
-
-    file_name = adapter.get_region_vcf(case_obj, chrom=None, start=None, end=None,
-                       gene_obj=None, variant_type='clinical', category='snv',
-                       rank_threshold=None)
-    ## GIVEN a populated database with variants in a certain gene
-    nr_variants = 0
-    with open(file_name, 'r') as f:
-        for line in f:
-            if not line.startswith('#'):
-                nr_variants += 1
-
-    os.remove(file_name)
 
-    assert nr_variants > 0
+    ## GIVEN a case with a tabix indexed vcf
+    ## WHEN fetching the vcf of a region
+    region_vcf = adapter.get_region_vcf(case_obj, chrom='1', start=1,
+                                        end=300000000)
+
+    ## THEN assert that the header and the variants of the region are returned
+    lines = region_vcf.splitlines()
+    assert lines[0].startswith('##fileformat')
+    records = [line for line in lines if not line.startswith('#')]
+    assert records
+    assert all(record.split('\t')[0] == '1' for record in records)
+
+    ## THEN assert that the region is cached
+    assert adapter.get_region_vcf(case_obj, chrom='1', start=1,
+                                  end=300000000) is region_vcf
+
+
+def test_get_region_vcf_not_indexed(adapter, case_obj):
+    ## GIVEN a case with a vcf that has no tabix index
+    case_obj = copy.deepcopy(case_obj)
+    case_obj['vcf_files']['vcf_sv'] = 'tests/parse/vcfs/one_cnvnator.vcf'
+
+    ## WHEN fetching the vcf of a region
+    ## THEN assert that it is refused instead of read without the index
+    with pytest.raises(SyntaxError):
+        adapter.get_region_vcf(case_obj, chrom='1', start=1, end=1000,
+                               category='sv')
+
+
+def test_overlapping(adapter, case_obj):
+    ## GIVEN a sv and snvs inside, next to and far away from it
+    def insert_variant(category, position, end, rank_score):
+        variant_obj = {
+            '_id': '{0}_{1}_{2}'.format(category, position, end),
+            'case_id': case_obj['_id'],
+            'category': category,
+            'variant_type': 'clinical',
+            'chromosome': '1',
+            'position': position,
+            'end': end,
+            'bin': genomic_bin(position, end),
+            'rank_score': rank_score,
+            'hgnc_ids': [],
+        }
+        adapter.variant_collection.insert_one(variant_obj)
+        return variant_obj
+
+    sv_obj = insert_variant('sv', 1000000, 1200000, 10)
+    inside = [insert_variant('snv', 1000000 + step * 1000, 1000000 + step * 1000, step)
+              for step in range(5)]
+    insert_variant('snv', 1200001, 1200001, 100)
+    insert_variant('snv', 50000000, 50000000, 100)
+
+    ## WHEN fetching the overlapping snvs two at a time
+    first_page = list(adapter.overlapping(sv_obj, limit=2))
+    rest = list(adapter.overlapping(sv_obj, limit=10,
+                                    after=variant_keyset(first_page[-1], 'rank_score')))
+
+    ## THEN assert that the snvs inside the sv are returned sorted on rank score
+    assert [variant['_id'] for variant in first_page + rest] == [
+        variant['_id'] for variant in reversed(inside)]
+
+    ## WHEN fetching the svs that overlap a snv
+    ## THEN assert that the sv is returned
+    assert [variant['_id'] for variant in adapter.overlapping(inside[0])] == [sv_obj['_id']]
+
+
+def test_overlapping_region(adapter, case_obj):
+    ## GIVEN a gene, a snv in the gene and a snv outside of it
+    adapter.hgnc_collection.insert_one({'hgnc_id': 1, 'build': '37', 'hgnc_symbol': 'A',
+                                        'chromosome': '1', 'start': 1000, 'end': 5000})
+    def insert_variant(category, position, end, hgnc_ids):
+        variant_obj = {
+            '_id': '{0}_{1}'.format(category, position),
+            'case_id': case_obj['_id'],
+            'category': category,
+            'variant_type': 'clinical',
+            'chromosome': '1',
+            'position': position,
+            'end': end,
+            'bin': genomic_bin(position, end),
+            'rank_score': 1,
+            'hgnc_ids': hgnc_ids,
+        }
+        adapter.variant_collection.insert_one(variant_obj)
+        return variant_obj
+
+    insert_variant('snv', 4000, 4000, [1])
+    insert_variant('snv', 90000, 90000, [])
+
+    ## WHEN fetching the snvs of a sv in the gene
+    sv_in_gene = insert_variant('sv', 1500, 2000, [1])
+    ## THEN assert that the snvs of the whole gene are returned
+    assert [variant['_id'] for variant in adapter.overlapping(sv_in_gene)] == ['snv_4000']
+
+    ## WHEN fetching the snvs of a sv outside of any gene
+    sv_outside = insert_variant('sv', 80000, 100000, [])
+    ## THEN assert that only the snvs in the sv are returned, not the whole
+    ## chromosome
+    assert [variant['_id'] for variant in adapter.overlapping(sv_outside)] == ['snv_90000']
+
+
+def test_add_variant_bins(adapter, case_obj):
+    ## GIVEN a variant without bin
+    adapter.variant_collection.insert_one({
+        '_id': 'variant', 'case_id': case_obj['_id'], 'position': 131073, 'end': 131073})
+
+    ## WHEN adding bins
+    assert adapter.add_variant_bins(case_obj['_id']) == 1
+
+    ## THEN assert that the variant got its bin
+    assert adapter.variant_collection.find_one()['bin'] == genomic_bin(131073, 131073)
+
+
+def test_variants_by_id(adapter, case_obj):
+    ## GIVEN a database with two variants
+    for position in [1000, 2000]:
+        adapter.variant_collection.insert_one({
+            '_id': 'variant_{0}'.format(position),
+            'case_id': case_obj['_id'],
+            'chromosome': '1',
+            'position': position,
+            'genes': [{'hgnc_id': 1}],
+        })
+
+    ## WHEN fetching the variants together with a missing one
+    variants = adapter.variants_by_id(['variant_1000', 'variant_2000', 'missing'])
+
+    ## THEN assert that the existing variants are returned with their information
+    assert set(variants) == {'variant_1000', 'variant_2000'}
+    assert variants['variant_1000']['genes'][0]['hgnc_id'] == 1
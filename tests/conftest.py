@@ -12,6 +12,7 @@ import pymongo
 # Adapter stuff
 from mongomock import MongoClient
 from scout.adapter.mongo import MongoAdapter as PymongoAdapter
+from scout.adapter.mongo.cache import gene_info_cache
 
 from scout.parse.case import parse_case
 from scout.parse.panel import parse_gene_panel
@@ -23,6 +24,7 @@ from scout.parse.exac import parse_exac_genes
 from scout.parse.hpo import (parse_hpo_phenotypes, parse_hpo_genes, parse_hpo_diseases)
 
 from scout.utils.link import link_genes
+from scout.utils.resource_cache import cached_resource
 from scout.log import init_log
 from scout.build import (build_institute, build_case, build_panel, build_variant)
 from scout.load import (load_hgnc_genes)
@@ -86,25 +88,28 @@ def test_gene(request, test_transcript):
 @pytest.fixture
 def genes(request, transcripts_file, hgnc_file, exac_file,
           mim2gene_file, genemap_file, hpo_genes_file):
-    """Get a dictionary with the linked genes"""
-    print('')
-    transcripts_handle = get_file_handle(transcripts_file)
-    hgnc_handle = get_file_handle(hgnc_file)
-    exac_handle = get_file_handle(exac_file)
-    mim2gene_handle = get_file_handle(mim2gene_file)
-    genemap_handle = get_file_handle(genemap_file)
-    hpo_genes_handle =  get_file_handle(hpo_genes_file)
-
-    gene_dict = link_genes(
-        ensembl_lines=transcripts_handle,
-        hgnc_lines=hgnc_handle,
-        exac_lines=exac_handle,
-        mim2gene_lines=mim2gene_handle,
-        genemap_lines=genemap_handle,
-        hpo_lines=hpo_genes_handle
-    )
+    """Get a dictionary with the linked genes
+
+    The genes are kept in the resource cache in the pytest cache directory
+    """
+    print('')
+    resource_files = [transcripts_file, hgnc_file, exac_file, mim2gene_file,
+                      genemap_file, hpo_genes_file]
+
+    def build_genes():
+        return link_genes(
+            ensembl_lines=get_file_handle(transcripts_file),
+            hgnc_lines=get_file_handle(hgnc_file),
+            exac_lines=get_file_handle(exac_file),
+            mim2gene_lines=get_file_handle(mim2gene_file),
+            genemap_lines=get_file_handle(genemap_file),
+            hpo_lines=get_file_handle(hpo_genes_file)
+        )
 
-    return gene_dict
+    if not getattr(request.config, 'cache', None):
+        return build_genes()
+    cache_dir = str(request.config.cache.makedir('resources'))
+    return cached_resource('test_genes', resource_files, build_genes, cache_dir=cache_dir)
 
 #############################################################
 ################# Hpo terms fixtures ########################
@@ -251,6 +256,8 @@ def pymongo_client(request):
         print('\n')
         logger.info("Deleting database")
         mock_client.drop_database(DATABASE)
+        # The next test uses a database with the same name
+        gene_info_cache.invalidate(DATABASE)
         logger.info("Database deleted")
         logger.info("Time to run test:{}".format(datetime.datetime.now()-start_time))
 
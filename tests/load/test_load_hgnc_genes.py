@@ -1,4 +1,5 @@
 from scout.load.hgnc_gene import load_hgnc_genes
+from scout.load.bulk import load_bulk
 
 def test_load_hgnc_genes(adapter, genes):
     # GIVEN a empty database
@@ -17,4 +18,21 @@ def test_load_hgnc_genes(adapter, genes):
     
     assert adapter.all_genes().count() == nr_genes
     
-    assert adapter.hgnc_gene(gene_info['hgnc_id'])
\ No newline at end of file
+    assert adapter.hgnc_gene(gene_info['hgnc_id'])
+
+def test_load_bulk_chunks(adapter):
+    # GIVEN a empty database and some genes
+    gene_objs = [{'hgnc_id': hgnc_id, 'build': '37'} for hgnc_id in range(10)]
+    chunks = []
+
+    def load_function(chunk):
+        chunks.append(len(chunk))
+        return adapter.load_hgnc_bulk(chunk)
+
+    # WHEN inserting them in chunks
+    nr_inserted = load_bulk(gene_objs, load_function, chunk_size=4)
+
+    # THEN assert all genes have been added in three chunks
+    assert nr_inserted == 10
+    assert chunks == [4, 4, 2]
+    assert adapter.all_genes().count() == 10
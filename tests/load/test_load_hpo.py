@@ -1,4 +1,5 @@
-from scout.load.hpo import (load_hpo, load_disease_terms, load_hpo_terms)
+from scout.load.hpo import (load_hpo, load_disease_terms, load_hpo_terms,
+                            parse_hpo_tables)
 
 def test_load_disease_terms(gene_database, genemap_handle, hpo_disease_handle):
     adapter = gene_database
@@ -57,4 +58,23 @@ def test_load_hpo(gene_database, hpo_terms_handle, genemap_handle, hpo_disease_h
     disease_objs = adapter.disease_terms()
 
     assert len([term for term in hpo_terms_objs]) > 0
-    assert len([disease for disease in disease_objs]) > 0
\ No newline at end of file
+    assert len([disease for disease in disease_objs]) > 0
+
+def test_load_hpo_parsed_tables(gene_database, hpo_terms_handle, genemap_handle,
+                                hpo_disease_handle):
+    adapter = gene_database
+    # GIVEN hpo and disease lines that are already parsed
+    hpo_tables = parse_hpo_tables(hpo_terms_handle, genemap_handle, hpo_disease_handle)
+
+    # WHEN loading the disease and hpo terms without the lines
+    load_hpo(
+        adapter=gene_database,
+        hpo_lines=None,
+        disease_lines=None,
+        hpo_disease_lines=None,
+        hpo_tables=hpo_tables,
+    )
+
+    # THEN make sure that all parsed terms are in the database
+    assert len([term for term in adapter.hpo_terms()]) == len(hpo_tables['hpo_terms'])
+    assert len([disease for disease in adapter.disease_terms()]) == len(hpo_tables['disease_terms'])
@@ -1,6 +1,10 @@
+import pytest
 from scout.parse.variant.ids import (parse_ids, parse_simple_id, parse_variant_id,
                                      parse_display_name, parse_document_id)
-from scout.utils.md5 import generate_md5_key
+from scout.utils.md5 import (generate_md5_key, generate_md5_keys)
+from scout.parse.variant.compound import parse_compounds
+
+import random
 
 
 def test_parse_simple_id():
@@ -74,3 +78,43 @@ def test_parse_ids():
     # THEN we should get a dictionary with all ids back
     assert isinstance(variant_ids, dict)
     assert variant_ids['simple_id'] == '_'.join([chrom, str(pos), ref, alt])
+
+
+def random_string(alphabet, max_length=10):
+    return ''.join(random.choice(alphabet) for _ in range(random.randint(0, max_length)))
+
+
+def test_ids_same_as_generate_md5_key():
+    random.seed(1)
+    for _ in range(1000):
+        # GIVEN random variant and case information
+        chrom = random.choice(['1', '22', 'X', 'MT', 'GL000192.1'])
+        pos = random.randint(1, 250000000)
+        ref = random_string('ACGTN')
+        alt = random_string('ACGTN<DEL*')
+        case_id = random_string('abc_-01äö')
+        variant_type = random.choice(['clinical', 'research'])
+
+        # WHEN parsing the variant ids
+        variant_ids = parse_ids(chrom, pos, ref, alt, case_id, variant_type)
+
+        # THEN the md5 keys should be identical to the ones from generate_md5_key
+        pos = str(pos)
+        assert variant_ids['variant_id'] == generate_md5_key(
+            [chrom, pos, ref, alt, variant_type])
+        assert variant_ids['document_id'] == generate_md5_key(
+            [chrom, pos, ref, alt, variant_type, case_id])
+
+        # THEN the compound ids should be identical as well
+        compound_name = '_'.join([chrom, pos, ref, alt])
+        compounds = parse_compounds("{0}:{1}>5".format(case_id, compound_name),
+                                    case_id, variant_type)
+        assert compounds[0]['variant'] == generate_md5_key(
+            compound_name.split('_') + [variant_type, case_id])
+
+
+def test_generate_md5_keys_checks_arguments():
+    # GIVEN an argument that is not a string
+    # THEN a SyntaxError should be raised, as with generate_md5_key
+    with pytest.raises(SyntaxError):
+        generate_md5_keys(['1', '10', 'A', 'G', 'clinical'], 1)
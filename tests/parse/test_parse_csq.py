@@ -0,0 +1,83 @@
+from scout.constants import MAX_GENE_INDEX
+from scout.parse.variant.csq import (parse_csq_columns, parse_csq_transcripts)
+from scout.parse.variant.transcript import parse_transcripts
+from scout.parse.variant.gene import parse_genes
+
+CSQ_HEADER = ("Allele|Consequence|IMPACT|SYMBOL|Gene|Feature_type|Feature|"
+              "BIOTYPE|EXON|INTRON|HGVSc|HGVSp|Existing_variation|STRAND|"
+              "HGNC_ID|SIFT|PolyPhen|AF|gnomAD_AF|gnomAD_NFE_AF|CLIN_SIG")
+
+CSQ_ENTRY = ("C|missense_variant|MODERATE|POC1A|ENSG00000164087|Transcript|"
+             "ENST00000296484|protein_coding|4/11||ENST00000296484.2:c.322A>G|"
+             "ENSP00000296484.2:p.Ser108Gly|rs1&COSM2|-1|HGNC:24488|"
+             "deleterious(0.01)|possibly_damaging(0.8)|0.01|0.02|0.03|benign,"
+             "C|intron_variant|MODIFIER|POC1A|ENSG00000164087|Transcript|"
+             "ENST00000394970|protein_coding||3/10|||||-1|HGNC:24488")
+
+
+def test_parse_csq_columns():
+    ## GIVEN a vep header
+    vep_header = CSQ_HEADER.split('|')
+    ## WHEN parsing the columns
+    csq_columns = {key: (position, variant_key) for key, position, variant_key
+                   in parse_csq_columns(vep_header)}
+    ## THEN assert that only the fields used for transcripts are kept
+    assert csq_columns['Consequence'] == (1, True)
+    assert csq_columns['gnomAD_NFE_AF'] == (19, True)
+    assert csq_columns['EXON'] == (8, False)
+    assert 'Allele' not in csq_columns
+    assert 'IMPACT' not in csq_columns
+
+
+def test_parse_csq_transcripts():
+    ## GIVEN a vep header and a CSQ entry with two transcripts
+    vep_header = CSQ_HEADER.split('|')
+    csq_columns = parse_csq_columns(vep_header)
+    raw_transcripts = [dict(zip(vep_header, transcript_info.split('|')))
+                       for transcript_info in CSQ_ENTRY.split(',')]
+
+    ## WHEN decoding the transcripts
+    csq_transcripts = list(parse_csq_transcripts(CSQ_ENTRY, csq_columns))
+
+    ## THEN assert that the parsed transcripts are the same as when all fields
+    ## are decoded
+    assert len(csq_transcripts) == 2
+    assert 'CLIN_SIG' not in csq_transcripts[1]
+    assert (list(parse_transcripts(csq_transcripts)) ==
+            list(parse_transcripts(raw_transcripts)))
+
+
+def test_parse_csq_transcripts_many_genes():
+    ## GIVEN a CSQ entry of a large SV with two transcripts in each of 40 genes
+    ## and a transcript without gene
+    vep_header = CSQ_HEADER.split('|')
+    csq_columns = parse_csq_columns(vep_header)
+    transcripts = []
+    for transcript_nr in range(2):
+        for gene_nr in range(1, 41):
+            transcripts.append(
+                "C|intron_variant|MODIFIER|GENE{0}|ENSG{0}|Transcript|ENST{0}{1}|"
+                "protein_coding||2/5|||rs{0}|1|HGNC:{0}|||0.0{1}|0.1|0.2|"
+                "benign".format(gene_nr, transcript_nr))
+    transcripts.append("C|intergenic_variant|MODIFIER|||||||||||||||0.3||")
+    csq_entry = ','.join(transcripts)
+    raw_transcripts = [dict(zip(vep_header, transcript_info.split('|')))
+                       for transcript_info in csq_entry.split(',')]
+
+    ## WHEN decoding the transcripts
+    csq_transcripts = list(parse_csq_transcripts(csq_entry, csq_columns))
+    genes = parse_genes(list(parse_transcripts(csq_transcripts)))
+    all_genes = parse_genes(list(parse_transcripts(raw_transcripts)))
+
+    ## THEN assert that the genes that are stored on a variant are complete
+    nr_stored = MAX_GENE_INDEX + 2
+    assert genes[:nr_stored] == all_genes[:nr_stored]
+    assert csq_transcripts[nr_stored - 1]['INTRON'] == '2/5'
+    ## THEN assert that the genes after the cap only have variant fields
+    assert 'INTRON' not in csq_transcripts[nr_stored]
+    assert csq_transcripts[nr_stored]['gnomAD_AF'] == '0.1'
+    assert 'BIOTYPE' not in csq_transcripts[-1]
+    assert csq_transcripts[-1]['AF'] == '0.3'
+    ## THEN assert that all genes are still found
+    assert ([gene['hgnc_id'] for gene in genes] ==
+            [gene['hgnc_id'] for gene in all_genes])
@@ -0,0 +1,94 @@
+import subprocess
+import sys
+
+import pytest
+
+from scout.parse.cytoband import (parse_cytoband, cytoband_name, cytoband_names)
+from scout.parse.variant.coordinates import (get_cytoband_coordinates,
+                                             annotate_cytobands)
+
+CYTOBAND_LINES = [
+    "chr1\t2300000\t5400000\tp36.32\tgpos25",
+    "chr1\t0\t2300000\tp36.33\tgneg",
+    "chrX\t0\t4300000\tp22.33\tgneg",
+]
+
+
+def test_parse_cytoband():
+    ## WHEN parsing cytoband lines that are not sorted
+    cytobands = parse_cytoband(CYTOBAND_LINES)
+
+    ## THEN assert that the bands are sorted on start
+    starts, ends, names = cytobands['1']
+    assert list(starts) == [0, 2300000]
+    assert list(ends) == [2300000, 5400000]
+    assert names == ['p36.33', 'p36.32']
+
+
+@pytest.mark.parametrize('chrom, pos, name', [
+    ('1', 0, 'p36.33'),
+    ('1', 2299999, 'p36.33'),
+    ('1', 2300000, 'p36.32'),
+    ('1', 5400000, ''),
+    ('X', 100, 'p22.33'),
+    ('MT', 100, ''),
+])
+def test_cytoband_name(chrom, pos, name):
+    cytobands = parse_cytoband(CYTOBAND_LINES)
+    assert cytoband_name(cytobands, chrom, pos) == name
+
+
+def test_cytoband_names():
+    ## GIVEN positions inside, between and outside of the bands
+    cytobands = parse_cytoband(CYTOBAND_LINES)
+    chroms = ['1', '1', '1', '1', 'X', 'X', 'MT']
+    positions = [0, 2299999, 2300000, 5400000, 100, 5400001, 100]
+
+    ## WHEN looking up all positions at once
+    names = cytoband_names(chroms, positions, cytobands)
+
+    ## THEN assert that the names are the same as one position at a time
+    assert names == [cytoband_name(cytobands, chrom, pos)
+                     for chrom, pos in zip(chroms, positions)]
+    assert names == ['p36.33', 'p36.33', 'p36.32', '', 'p22.33', '', '']
+
+
+def test_annotate_cytobands():
+    ## GIVEN parsed variants without cytobands, one a translocation
+    parsed_variants = [
+        {'chromosome': '1', 'position': 80000, 'end_chrom': '1', 'end': 80001},
+        {'chromosome': '1', 'position': 80000, 'end_chrom': '8', 'end': 101677777},
+    ]
+
+    ## WHEN adding the cytobands of the resource file
+    annotate_cytobands(parsed_variants)
+
+    ## THEN assert that the start and the end are in their bands
+    assert parsed_variants[0]['cytoband_start'] == 'p36.33'
+    assert parsed_variants[0]['cytoband_end'] == 'p36.33'
+    assert parsed_variants[1]['cytoband_end'] == 'q22.3'
+
+
+def test_get_cytoband_coordinates():
+    ## GIVEN the cytobands of the resource file
+    ## THEN assert that a position is found in its band
+    assert get_cytoband_coordinates('1', 80000) == 'p36.33'
+    assert get_cytoband_coordinates('8', 101677777) == 'q22.3'
+
+
+@pytest.mark.parametrize('module', ['scout.constants', 'scout.commands.base'])
+def test_import_does_not_parse_cytobands(module):
+    ## WHEN importing a module in a new interpreter with -X importtime
+    script = ("import {0}, sys\n"
+              "cytoband = sys.modules.get('scout.parse.cytoband')\n"
+              "sys.exit(1 if cytoband and cytoband._cytobands is not None else 0)"
+              .format(module))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', script],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+    if 'ModuleNotFoundError' in proc.stderr:
+        pytest.skip("Dependencies of {0} are missing".format(module))
+
+    ## THEN assert that the cytobands are not parsed
+    assert proc.returncode == 0, proc.stderr[-1000:]
+    assert '| {0}\n'.format(module) in proc.stderr
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import pytest
+from flask import Flask
+
+from scout.server.blueprints.pileup.partial import (parse_byte_ranges, send_file_partial)
+
+CONTENT = bytes(bytearray(range(256))) * 1000
+
+
+@pytest.fixture
+def partial_client(tmpdir):
+    file_path = tmpdir.join('alignment.bam')
+    file_path.write_binary(CONTENT)
+    app = Flask(__name__)
+
+    @app.route('/file')
+    def serve_file():
+        return send_file_partial(str(file_path))
+
+    return app.test_client()
+
+
+@pytest.mark.parametrize('range_header, byte_ranges', [
+    ('bytes=0-99', [(0, 99)]),
+    ('bytes=100-', [(100, 999)]),
+    ('bytes=-100', [(900, 999)]),
+    ('bytes=0-9, 990-2000', [(0, 9), (990, 999)]),
+    ('bytes=1000-', []),
+])
+def test_parse_byte_ranges(range_header, byte_ranges):
+    assert parse_byte_ranges(range_header, 1000) == byte_ranges
+
+
+@pytest.mark.parametrize('range_header', ['bytes=10-1', 'lines=0-1', 'bytes=-'])
+def test_parse_byte_ranges_invalid(range_header):
+    with pytest.raises(ValueError):
+        parse_byte_ranges(range_header, 1000)
+
+
+def test_send_range(partial_client):
+    ## GIVEN a file
+    ## WHEN requesting an open ended range
+    resp = partial_client.get('/file', headers={'Range': 'bytes=1000-'})
+
+    ## THEN assert that the rest of the file is returned
+    assert resp.status_code == 206
+    assert resp.data == CONTENT[1000:]
+    assert resp.headers['Content-Range'] == 'bytes 1000-255999/256000'
+    assert int(resp.headers['Content-Length']) == len(CONTENT) - 1000
+
+
+def test_send_multiple_ranges(partial_client):
+    ## GIVEN a file
+    ## WHEN requesting two ranges
+    resp = partial_client.get('/file', headers={'Range': 'bytes=0-9,100-109'})
+
+    ## THEN assert that both parts are returned in a multipart response
+    assert resp.status_code == 206
+    assert resp.mimetype == 'multipart/byteranges'
+    assert int(resp.headers['Content-Length']) == len(resp.data)
+    assert b'Content-Range: bytes 0-9/256000\r\n\r\n' + CONTENT[0:10] in resp.data
+    assert b'Content-Range: bytes 100-109/256000\r\n\r\n' + CONTENT[100:110] in resp.data
+
+
+def test_send_if_range(partial_client):
+    ## GIVEN the etag of a file
+    etag = partial_client.get('/file').headers['ETag']
+
+    ## WHEN requesting a range of the same version
+    resp = partial_client.get('/file', headers={'Range': 'bytes=0-9', 'If-Range': etag})
+    ## THEN assert that the range is returned
+    assert resp.status_code == 206
+
+    ## WHEN requesting a range of another version
+    resp = partial_client.get('/file', headers={'Range': 'bytes=0-9', 'If-Range': '"old"'})
+    ## THEN assert that the whole file is returned
+    assert resp.status_code == 200
+    assert resp.data == CONTENT
+
+    ## WHEN the client has the current version
+    resp = partial_client.get('/file', headers={'If-None-Match': etag})
+    ## THEN assert that it is not sent again
+    assert resp.status_code == 304
+
+
+def test_send_unsatisfiable_range(partial_client):
+    resp = partial_client.get('/file', headers={'Range': 'bytes=300000-'})
+    assert resp.status_code == 416
+    assert resp.headers['Content-Range'] == 'bytes */256000'
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from flask import Flask
+
+from scout.server.loader import request_loader
+
+
+def test_request_loader(adapter, user_obj):
+    ## GIVEN a database with a user
+    adapter.add_user(user_obj)
+    app = Flask(__name__)
+
+    with app.app_context():
+        loader = request_loader(adapter)
+        ## WHEN looking up the same user twice in a request
+        users = loader.users([user_obj['email'], 'john.doe@mail.com'])
+        adapter.user_collection.delete_many({})
+        again = request_loader(adapter).users([user_obj['email']])
+
+        ## THEN assert that the user is fetched once, and missing users are None
+        assert users['john.doe@mail.com'] is None
+        assert again[user_obj['email']]['_id'] == user_obj['email']
+
+    ## WHEN a new request starts
+    with app.app_context():
+        ## THEN assert that the users are fetched again
+        assert request_loader(adapter).users([user_obj['email']])[user_obj['email']] is None
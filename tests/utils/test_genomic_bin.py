@@ -0,0 +1,29 @@
+import random
+
+from scout.utils.coordinates import (genomic_bin, overlapping_bins)
+
+
+def test_genomic_bin():
+    ## GIVEN intervals of different sizes
+    ## THEN assert that they get the smallest bin that holds them
+    assert genomic_bin(1, 1) == 585
+    assert genomic_bin(131072, 131072) == 585
+    assert genomic_bin(131073, 131073) == 586
+    assert genomic_bin(131072, 131073) == 73
+    assert genomic_bin(1, 200000000) == 0
+    ## THEN assert that the order of start and end does not matter
+    assert genomic_bin(131073, 131072) == 73
+
+
+def test_overlapping_bins():
+    ## GIVEN random intervals and a region
+    random.seed(1)
+    region_start, region_end = 1000000, 1500000
+    bins = set(overlapping_bins(region_start, region_end))
+    for _ in range(1000):
+        start = random.randint(1, 5000000)
+        end = start + random.choice([0, 100, 100000, 3000000])
+
+        ## THEN assert that all overlapping intervals are in the bins
+        if start <= region_end and end >= region_start:
+            assert genomic_bin(start, end) in bins
@@ -1,4 +1,5 @@
-from scout.utils.link import link_genes
+from scout.utils.link import (link_genes, parse_reference_genes, link_builds)
+from scout.utils.handle import get_file_handle
 from pprint import pprint as pp
 
 def test_link_genes(transcripts_handle, hgnc_handle, exac_handle, 
@@ -14,3 +15,33 @@ def test_link_genes(transcripts_handle, hgnc_handle, exac_handle,
     )
     for hgnc_symbol in genes:
         assert genes[hgnc_symbol]['hgnc_symbol']
+
+
+def test_link_builds(transcripts_file, hgnc_file, exac_file, mim2gene_file,
+                     genemap_file, hpo_genes_file):
+    ## GIVEN the genes parsed once for all builds
+    gene_files = dict(
+        hgnc_lines=hgnc_file,
+        exac_lines=exac_file,
+        mim2gene_lines=mim2gene_file,
+        genemap_lines=genemap_file,
+        hpo_lines=hpo_genes_file,
+    )
+    reference_genes = parse_reference_genes(
+        **{key: get_file_handle(path) for key, path in gene_files.items()})
+    ## GIVEN the genes linked alone in this process, the order of the lists
+    ## built from sets differs from the cached genes of other processes
+    genes = link_genes(
+        ensembl_lines=get_file_handle(transcripts_file),
+        **{key: get_file_handle(path) for key, path in gene_files.items()})
+
+    ## WHEN linking the transcripts of two builds in worker processes
+    build_genes = link_builds(reference_genes, {'37': transcripts_file,
+                                                '38': transcripts_file}, workers=2)
+
+    ## THEN assert that each build gets the same genes as when linked alone
+    assert build_genes['37'] == genes
+    assert build_genes['38'] == genes
+    ## THEN assert that the builds do not share gene dictionaries
+    hgnc_id = next(iter(genes))
+    assert build_genes['37'][hgnc_id] is not build_genes['38'][hgnc_id]
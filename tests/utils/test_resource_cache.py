@@ -0,0 +1,56 @@
+from scout.utils import resource_cache
+from scout.utils.resource_cache import (cached_resource, resource_key)
+
+
+def test_cached_resource(tmpdir):
+    ## GIVEN a resource file and an empty cache
+    resource = tmpdir.join('genes.txt')
+    resource.write('ADK\n')
+    cache_dir = str(tmpdir.mkdir('cache'))
+    parsed = []
+
+    def parse():
+        parsed.append(resource.read())
+        return resource.read().split()
+
+    ## WHEN reading the resource twice
+    first = cached_resource('genes', [str(resource)], parse, cache_dir=cache_dir)
+    second = cached_resource('genes', [str(resource)], parse, cache_dir=cache_dir)
+
+    ## THEN assert that it was parsed once
+    assert first == second == ['ADK']
+    assert len(parsed) == 1
+
+    ## WHEN the resource file changes
+    resource.write('ADK\nPOT1\n')
+    third = cached_resource('genes', [str(resource)], parse, cache_dir=cache_dir)
+
+    ## THEN assert that it is parsed again and the old result is removed
+    assert third == ['ADK', 'POT1']
+    assert len(parsed) == 2
+    assert len(tmpdir.join('cache').listdir()) == 1
+
+
+def test_cached_resource_unwritable(tmpdir):
+    ## GIVEN a cache directory that can not be created
+    resource = tmpdir.join('genes.txt')
+    resource.write('ADK\n')
+    cache_dir = str(resource.join('cache'))
+
+    ## WHEN reading the resource
+    ## THEN assert that the parsed result is returned anyway
+    assert cached_resource('genes', [str(resource)], lambda: ['ADK'],
+                           cache_dir=cache_dir) == ['ADK']
+
+
+def test_resource_key_scout_version(tmpdir, monkeypatch):
+    ## GIVEN a resource file
+    resource = tmpdir.join('genes.txt')
+    resource.write('ADK\n')
+    key = resource_key('genes', [str(resource)])
+
+    ## WHEN the scout version changes
+    monkeypatch.setattr(resource_cache, '__version__', '0.0.0-other')
+
+    ## THEN assert that the key changes
+    assert resource_key('genes', [str(resource)]) != key
@@ -0,0 +1,37 @@
+from cyvcf2 import VCF
+
+from scout.utils.tabix import index_sequences
+from scout.demo import (clinical_snv_path, clinical_sv_path)
+
+
+def test_index_sequences():
+    ## GIVEN a vcf with a tabix index
+    records = {}
+    for variant in VCF(clinical_snv_path):
+        records[variant.CHROM] = records.get(variant.CHROM, 0) + 1
+
+    ## WHEN reading the sequences from the index
+    sequences = index_sequences(clinical_snv_path)
+
+    ## THEN assert that the names and number of records match the vcf
+    assert dict(sequences) == records
+
+
+def test_index_sequences_sv():
+    ## GIVEN a sv vcf with a tabix index
+    nr_records = sum(1 for _ in VCF(clinical_sv_path))
+
+    ## WHEN reading the sequences from the index
+    sequences = index_sequences(clinical_sv_path)
+
+    ## THEN assert that all records are counted
+    assert sum(nr for _, nr in sequences) == nr_records
+
+
+def test_index_sequences_no_index(tmpdir):
+    ## GIVEN a vcf without index
+    vcf_path = tmpdir.join('test.vcf.gz')
+    vcf_path.write('')
+
+    ## THEN assert that no sequences are found
+    assert index_sequences(str(vcf_path)) == []